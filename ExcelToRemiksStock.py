@@ -6,6 +6,11 @@ import os
 import pandas as pd
 import argparse
 import sys
+from batch_sync import resolve_excel_paths, prepare_files_in_parallel, merge_products_by_sku
+from excel_dtypes import compact_dataframe
+from http_session import create_session
+from pricing import PricingRules, frame_prices, price_list
+from sync_metrics import SyncMetrics, timed_run
 
 load_dotenv()
 
@@ -19,13 +24,25 @@ class ExcelToRemiksStock:
         self.remiks_url_login = "https://portal.platforma.services/api/rest/login_check"
         self.remiks_url_stock = os.getenv('remiks_url_stock')
 
-    def read_excel_file(self, excel_file_path):
-        """Čita Excel fajl i vraća DataFrame - koristi samo sheet UPISATI"""
+        # Direktorijum za payload fajlove
+        self.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+        self.session = create_session()
+        self.metrics = SyncMetrics()
+        self.metrics.attach(self.session)
+
+    def read_excel_file(self, excel_file_path, compact=True):
+        """Čita Excel fajl i vraća DataFrame - koristi samo sheet UPISATI
+
+        compact=True pretvara ponovljene kolone (BRAND, SIZE, WAREHOUSE...) u category dtype.
+        """
         try:
             # Eksplicitno čita sheet "UPISATI"
             df = pd.read_excel(excel_file_path, sheet_name="UPISATI")
             print(f"Učitano {len(df)} redova iz sheet-a 'UPISATI'")
             print(f"Kolone: {list(df.columns)}")
+            if compact:
+                df, _ = compact_dataframe(df)
             return df
         except Exception as e:
             print(f"Greška pri čitanju Excel fajla (sheet UPISATI): {e}")
@@ -43,23 +60,8 @@ class ExcelToRemiksStock:
             return default_value
 
     def calculate_prices(self, retail_price, special_price=None):
-        """Računa cene na osnovu retail cene - slično Informix logici"""
-        try:
-            retail = float(retail_price) if retail_price else 0
-            special = float(special_price) if special_price and pd.notna(special_price) else retail
-
-            # Informix logika:
-            # net_retail_price = get_maxcena * 1.2
-            # sale_price = get_cena (special ili retail)
-            # invoice_price = sale_price / 1.2 * 0.85
-
-            net_retail_price = round(retail , 0)
-            sale_price = special if special > 0 else retail
-            invoice_price = round(sale_price / 1.2 * 0.8, 3)
-
-            return net_retail_price, sale_price, invoice_price
-        except:
-            return 0, 0, 0
+        """Računa cene za jedan proizvod - ista pravila kao pricing.compute_prices za celu kolonu"""
+        return price_list([retail_price], [special_price], rules=PricingRules.for_source('excel_stock'))[0]
 
     def group_stock_by_sku(self, df):
         """Grupira stock podatke po SKU - isto kao Informix fetch_stock_data"""
@@ -99,7 +101,6 @@ class ExcelToRemiksStock:
 
     def prepare_remiks_stock_data(self, excel_file_path):
         """Priprema podatke za stock sync - slično prepare_data() iz Informix skripte"""
-        global product_type
         df = self.read_excel_file(excel_file_path)
         if df is None:
             return []
@@ -107,58 +108,29 @@ class ExcelToRemiksStock:
         # Grupiše stock podatke
         stock_data = self.group_stock_by_sku(df)
 
-        # Kreira proizvode sa cenama (jedan proizvod po SKU)
-        products_with_prices = {}
-
-        for _, row in df.iterrows():
+        # Cene i tip uzima iz prvog reda svakog SKU-a; cene se računaju za celu kolonu odjednom
+        prices = frame_prices(df, rules=PricingRules.for_source('excel_stock'))
+        first_rows = {}
+        for position, (_, row) in enumerate(df.iterrows()):
             sku = str(self.safe_get_value(row, 'SKU', '')).strip()
-            if not sku or sku in products_with_prices:
-                continue
-
-            retail_price = self.safe_get_value(row, 'RETAIL_PRICE', 0)
-            special_price = self.safe_get_value(row, 'SPECIAL_PRICE', None)
-
-            net_retail_price, sale_price, invoice_price = self.calculate_prices(retail_price, special_price)
-
-            products_with_prices[sku] = {
-                'retail_price': float(retail_price) if retail_price else 0,
-                'special_price': float(special_price) if special_price and pd.notna(special_price) else None,
-                'net_retail_price': net_retail_price,
-                'sale_price': sale_price,
-                'invoice_price': invoice_price
-            }
+            if sku and sku not in first_rows:
+                first_rows[sku] = (position, row)
 
         # Kreira finalni products_array - slično Informix strukturi
         products_array = []
 
         for sku in stock_data.keys():
-            if sku not in products_with_prices:
-                # Ako nema podatke o cenama, koristi default vrednosti
-                net_retail_price, sale_price, invoice_price = 0, 0, 0
-            else:
-                price_data = products_with_prices[sku]
-                net_retail_price = price_data['net_retail_price']
-                sale_price = price_data['sale_price']
-                invoice_price = price_data['invoice_price']
-
-                # Dobija tip proizvoda iz Excel-a ili postavlja default
-                product_type = 'simple'  # Default
-                if sku in products_with_prices:
-                    # Traži tip u originalnim podacima
-                    for _, row in df.iterrows():
-                        if str(self.safe_get_value(row, 'SKU', '')).strip() == sku:
-                            type_value = str(self.safe_get_value(row, 'TYPE', 'simple')).lower()
-                            if type_value in ['configurable', 'configurabile']:
-                                product_type = 'configurable'
-                            else:
-                                product_type = 'simple'
-                            break
+            position, row = first_rows[sku]
+            net_retail_price, sale_price, invoice_price = prices[position]
+
+            type_value = str(self.safe_get_value(row, 'TYPE', 'simple')).lower()
+            product_type = 'configurable' if type_value in ['configurable', 'configurabile'] else 'simple'
 
             # Struktura ista kao u Informix skripti
             product_info = {
                 'sku': sku,
                 'stock': stock_data[sku],
-                'type': product_type,  # Uvek configurable kao u Informix
+                'type': product_type,
                 'net_retail_price': net_retail_price,
                 'sale_price': sale_price,
                 # 'sale_price_start_date': datetime.now().strftime('%Y-%m-%d'),  # Danas
@@ -183,7 +155,7 @@ class ExcelToRemiksStock:
         }
 
         try:
-            response = requests.request("GET", self.remiks_url_login, headers=headers, data=payload)
+            response = self.session.request("GET", self.remiks_url_login, headers=headers, data=payload)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get('token')
@@ -205,7 +177,7 @@ class ExcelToRemiksStock:
         send_data = json.dumps(payload)
 
         try:
-            response = requests.request("POST", self.remiks_url_stock, headers=headers, data=send_data)
+            response = self.session.request("POST", self.remiks_url_stock, headers=headers, data=send_data)
             if response.status_code == 200:
                 data = response.json()
                 return data
@@ -229,9 +201,8 @@ class ExcelToRemiksStock:
     def save_json_payload(self, payload):
         """Čuva JSON payload u fajl - ista logika kao u Informix skripti"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = os.path.join(script_dir, f'payload_excel_stock_{timestamp}.json')
+            filename = os.path.join(self.output_dir, f'payload_excel_stock_{timestamp}.json')
 
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(payload, f, indent=4, ensure_ascii=False)
@@ -240,26 +211,28 @@ class ExcelToRemiksStock:
         except Exception as e:
             print(f"Greška pri čuvanju JSON payload-a: {e}")
 
+    @timed_run('excel_stock')
     def run_stock_sync(self, excel_file_path=None):
-        """Glavna funkcija za pokretanje stock sinhronizacije iz Excel fajla"""
+        """Glavna funkcija za pokretanje stock sinhronizacije iz Excel fajla - vraća True ako je uspelo"""
         print("Pokretanje Excel -> Remiks Stock sinhronizacije...")
 
         if excel_file_path is None:
             excel_file_path = self.select_excel_file()
             if not excel_file_path:
-                return
+                return False
 
         # Proverava da li fajl postoji
         if not os.path.exists(excel_file_path):
             print(f"Excel fajl nije pronađen: {excel_file_path}")
-            return
+            return False
 
         # Priprema podatke
-        payload = self.prepare_remiks_stock_data(excel_file_path)
+        with self.metrics.stage('read_transform'):
+            payload = self.prepare_remiks_stock_data(excel_file_path)
 
         if not payload:
             print("Nema proizvoda za stock sinhronizaciju")
-            return
+            return False
 
         print(f"Pripremljeno {len(payload)} proizvoda za stock sync")
 
@@ -274,20 +247,28 @@ class ExcelToRemiksStock:
             print(f"Invoice price: {sample['invoice_price']}")
             print(f"Stock struktura: {sample['stock']}")
 
+        return self.upload_payload(payload)
+
+    def upload_payload(self, payload):
+        """Čuva payload, dobija JWT token i šalje stock podatke u jednom zahtevu - vraća True ako je uspelo"""
         # Čuva payload
-        self.save_json_payload(payload)
+        with self.metrics.stage('json_dump'):
+            self.save_json_payload(payload)
 
         # Dobija JWT token
-        jwt_token = self.get_jwt_token()
+        with self.metrics.stage('login'):
+            jwt_token = self.get_jwt_token()
         if not jwt_token:
             print("Nije moguće dobiti JWT token")
-            return
+            return False
 
         # Šalje podatke na remiks
-        response = self.send_request_to_remiks(payload, jwt_token)
+        with self.metrics.stage('upload'):
+            response = self.send_request_to_remiks(payload, jwt_token)
 
+        success = bool(response) and not response.get('errors', [])
         if response:
-            if not response.get('errors', []):
+            if success:
                 print("Uspešno poslano na remiks stock servis!")
             else:
                 print("Remiks stock servis vratio greške:")
@@ -296,6 +277,28 @@ class ExcelToRemiksStock:
                     print(f"  - {error}")
         else:
             print("Greška pri slanju na remiks stock servis")
+        return success
+
+    @timed_run('excel_stock_batch')
+    def run_batch_stock_sync(self, excel_paths, workers=None):
+        """Stock sinhronizacija više Excel fajlova - paralelna obrada, jedan login i jedan upload"""
+        print(f"Pokretanje batch Excel -> Remiks Stock sinhronizacije za {len(excel_paths)} fajlova...")
+
+        with self.metrics.stage('prepare_files'):
+            results = prepare_files_in_parallel(prepare_stock_from_file, excel_paths, workers)
+        for excel_path, products in results:
+            print(f"  {os.path.basename(excel_path)}: {len(products)} proizvoda")
+
+        with self.metrics.stage('merge'):
+            payload, duplicates = merge_products_by_sku(results)
+
+        if not payload:
+            print("Nema proizvoda za stock sinhronizaciju")
+            return False
+
+        print(f"Spojeno {len(payload)} jedinstvenih proizvoda (duplikata SKU između fajlova: {duplicates})")
+
+        return self.upload_payload(payload)
 
     def find_excel_files_in_data_folder(self):
         """Pronalazi sve Excel fajlove u 'podaci' folderu"""
@@ -389,12 +392,20 @@ class ExcelToRemiksStock:
                     print(f"  Veličina {size} u {warehouse}: {qty} kom")
 
 
+def prepare_stock_from_file(excel_file_path):
+    """Worker za batch mod - priprema stock podatke iz jednog fajla u zasebnom procesu"""
+    return excel_file_path, ExcelToRemiksStock().prepare_remiks_stock_data(excel_file_path)
+
+
 if __name__ == "__main__":
     # Kreiranje argument parser-a
     parser = argparse.ArgumentParser(description='Excel to Remiks Stock Sync Script')
-    parser.add_argument('--file', '-f', type=str, help='Putanja do Excel fajla')
+    parser.add_argument('--file', '-f', type=str,
+                        help='Putanja do Excel fajla, direktorijuma ili glob pattern (npr. "podaci/*.xlsx")')
     parser.add_argument('--sync', '-s', action='store_true', help='Pokreni stock sinhronizaciju direktno')
     parser.add_argument('--analyze', '-a', action='store_true', help='Analiziraj stock podatke')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Broj procesa za batch obradu (default: broj CPU jezgara)')
 
     args = parser.parse_args()
 
@@ -415,21 +426,22 @@ if __name__ == "__main__":
                 print(f"Default fajl {default_path} nije pronađen")
                 sys.exit(1)
 
-        # Proverava da li fajl postoji
-        if not os.path.exists(excel_file):
+        # Fajl, direktorijum ili glob pattern
+        excel_files = resolve_excel_paths(excel_file)
+        if not excel_files:
             print(f"Fajl nije pronađen: {excel_file}")
             sys.exit(1)
 
-        if args.sync:
-            print(f"Pokretanje stock sinhronizacije sa fajlom: {excel_file}")
-            sync.run_stock_sync(excel_file)
-        elif args.analyze:
-            print(f"Analiza stock podataka: {excel_file}")
-            sync.analyze_stock_data(excel_file)
+        if args.analyze and not args.sync:
+            for excel_file in excel_files:
+                print(f"Analiza stock podataka: {excel_file}")
+                sync.analyze_stock_data(excel_file)
+        elif len(excel_files) > 1:
+            # Batch mod - svi fajlovi se šalju kroz jedan login i jedan zahtev
+            sync.run_batch_stock_sync(excel_files, workers=args.workers)
         else:
-            # Ako je samo specificiran fajl bez akcije, pokreni sync
-            print(f"Pokretanje stock sinhronizacije sa fajlom: {excel_file}")
-            sync.run_stock_sync(excel_file)
+            print(f"Pokretanje stock sinhronizacije sa fajlom: {excel_files[0]}")
+            sync.run_stock_sync(excel_files[0])
     else:
         # Interaktivni meni ako nema argumenata
         print("=== EXCEL TO REMIKS STOCK SYNC ===")
@@ -4,11 +4,19 @@ import json
 from dotenv import load_dotenv
 import os
 from requests.auth import HTTPBasicAuth
-import pandas as pd
+from http_session import create_session, JwtTokenCache
+from sync_metrics import SyncMetrics, timed_run
+from remiks_model import StockEntry, WcProduct, WcVariation, dumps_payload, iter_payload, stock_levels
+from wc_taxonomy import TaxonomyCache
+from wc_transform import ProductMapper, transform_product, transform_products, wc_prices
 load_dotenv()
 
+# Projekcija (_fields) za stock-only sinhronizaciju - bez opisa, slika, kategorija i meta podataka
+STOCK_PRODUCT_FIELDS = 'id,sku,type,stock_quantity,price,regular_price,sale_price,attributes'
+STOCK_VARIATION_FIELDS = 'id,sku,stock_quantity,attributes'
 
-class WooCommerceToRemiks:
+
+class WooCommerceToRemiks(ProductMapper):
     def __init__(self):
         # WooCommerce API kredencijali
         self.wc_site_url = os.getenv('WC_SITE_URL', 'https://www.bambini.rs')
@@ -23,9 +31,26 @@ class WooCommerceToRemiks:
         self.remiks_password = os.getenv('remiks_password')
         self.remiks_url_login = os.getenv('remiks_url_login')
         self.remiks_url_product = os.getenv('remiks_url_product')
+        self.remiks_url_stock = os.getenv('remiks_url_stock')
+
+        # Direktorijum za payload fajlove
+        self.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # Sesija i token ostaju aktivni između sinhronizacija (daemon/webhook mod)
+        self.session = create_session()
+        self.token_cache = JwtTokenCache(self.get_jwt_token)
+        # Kategorije i tagovi se dobijaju jednom i mapiraju po ID-u (osvežavaju se posle WC_TAXONOMY_TTL sekundi)
+        self.taxonomy_cache = TaxonomyCache(self.fetch_taxonomy, ttl=int(os.getenv('WC_TAXONOMY_TTL', '3600')))
 
-    def fetch_woocommerce_products(self):
-        """Dobija sve proizvode iz WooCommerce-a"""
+        # Broj procesa za transformaciju kataloga (1 = u istom procesu)
+        self.transform_workers = int(os.getenv('WC_TRANSFORM_WORKERS', '1'))
+
+        # Merenje faza i HTTP zahteva
+        self.metrics = SyncMetrics()
+        self.metrics.attach(self.session)
+
+    def fetch_woocommerce_products(self, fields=None):
+        """Dobija sve proizvode iz WooCommerce-a kao WcProduct (fields: samo navedena polja, WooCommerce _fields)"""
         all_products = []
         page = 1
         per_page = 100
@@ -39,9 +64,11 @@ class WooCommerceToRemiks:
                 'page': page,
                 'status': 'publish'
             }
+            if fields:
+                params['_fields'] = fields
 
             try:
-                response = requests.get(url, auth=self.wc_auth, params=params)
+                response = self.session.get(url, auth=self.wc_auth, params=params)
                 response.raise_for_status()
 
                 products = response.json()
@@ -49,7 +76,8 @@ class WooCommerceToRemiks:
                 if not products:
                     break
 
-                all_products.extend(products)
+                # Ostatak API odgovora (opisi varijanti, meta_data, _links...) se ne čuva posle stranice
+                all_products.extend(WcProduct.from_api(product) for product in products)
                 page += 1
 
             except requests.RequestException as e:
@@ -59,286 +87,153 @@ class WooCommerceToRemiks:
         print(f"Ukupno dobijeno {len(all_products)} proizvoda iz WooCommerce-a")
         return all_products
 
-    def fetch_product_variations(self, product_id):
-        """Dobija varijante proizvoda"""
-        url = f"{self.wc_api_url}/products/{product_id}/variations"
+    def fetch_product(self, product_id, fields=None):
+        """Dobija jedan proizvod po ID-u (fields: _fields projekcija, npr. STOCK_PRODUCT_FIELDS)"""
+        url = f"{self.wc_api_url}/products/{product_id}"
+        params = {'_fields': fields} if fields else None
 
         try:
-            response = requests.get(url, auth=self.wc_auth)
+            response = self.session.get(url, auth=self.wc_auth, params=params)
             response.raise_for_status()
-            return response.json()
+            return WcProduct.from_api(response.json())
         except requests.RequestException as e:
-            print(f"Greška pri dobijanju varijanti za proizvod {product_id}: {e}")
-            return []
-
-    def map_gender_from_categories(self, categories):
-        """Mapira pol na osnovu kategorija - precizno za srpski"""
-        # Kombinuje sve kategorije u jedan string
-        all_categories = '; '.join([cat['name'] for cat in categories])
-        category_text = all_categories.lower()
-
-        print(f"Debug - kategorije: {all_categories}")
-
-        if 'dečaci' in category_text or 'decaci' in category_text:
-            return 'M'  # Muško
-        elif 'devojčice' in category_text or 'devojcice' in category_text:
-            return 'F'  # Žensko
-        elif any(term in category_text for term in ['unisex', 'baby', 'bebe', 'novorođenče', 'novorodenche']):
-            return 'U'  # Unisex
-        else:
-            return 'U'  # Default unisex
-
-    def extract_brand_from_name(self, product_name):
-        """Izvlači brend iz naziva proizvoda - precizno za bambini.rs"""
-        name_upper = product_name.upper()
-
-        print(f"Debug - naziv proizvoda: {product_name}")
-
-        # Lista brendova sa tačnim formatom
-        brand_patterns = [
-            'JACK & JONES',
-            'REEBOK',
-            'MESSI',
-            'VINGINO'
-        ]
+            print(f"Greška pri dobijanju proizvoda {product_id}: {e}")
+            return None
 
-        # Traži brendove u redosledu (duži prvi)
-        for brand in brand_patterns:
-            if brand in name_upper:
-                print(f"Debug - pronađen brend: {brand}")
-                return brand
-
-        print(f"Debug - brend nije pronađen, koristi se GENERIC")
-        return 'GENERIC'  # Default brend
-
-    def map_product_category(self, product_name, categories):
-        """Mapira kategoriju na osnovu naziva proizvoda i kategorija"""
-        product_name_lower = product_name.lower()
-        all_categories = '; '.join([cat['name'] for cat in categories])
-        categories_lower = all_categories.lower()
-
-        print(f"Debug - kategorije za mapiranje: {all_categories}")
-        print(f"Debug - naziv za mapiranje: {product_name}")
-
-        # Mapiranje na osnovu naziva proizvoda (prioritet)
-        if any(term in product_name_lower for term in ['set', 'komplet']):
-            return 'SETOVI'
-        elif any(term in product_name_lower for term in ['duks', 'hoodie', 'džemper', 'dzemper']):
-            return 'DUKSEVI'
-        elif any(term in product_name_lower for term in ['majica', 't-shirt', 'tshirt']):
-            return 'MAJICE'
-        elif any(term in product_name_lower for term in ['šorc', 'sorc', 'shorts', 'bermude']):
-            return 'ŠORCEVI'
-        elif any(term in product_name_lower for term in ['pantalone', 'pants', 'farmerke']):
-            return 'PANTALONE'
-        elif any(term in product_name_lower for term in ['jakna', 'jacket']):
-            return 'JAKNE'
-        elif any(term in product_name_lower for term in ['trenerk', 'komplet']):
-            return 'TRENERKE'
-
-        # Ako nije pronađeno u nazivu, traži u kategorijama
-        if any(term in categories_lower for term in ['setovi', 'kompleti']):
-            return 'SETOVI'
-        elif any(term in categories_lower for term in ['duksevi', 'džemperi', 'dzemper']):
-            return 'DUKSEVI'
-        elif 'majice' in categories_lower:
-            return 'MAJICE'
-        elif any(term in categories_lower for term in ['šorcevi', 'sorcevi', 'bermude']):
-            return 'ŠORCEVI'
-        elif 'pantalone' in categories_lower:
-            return 'PANTALONE'
-        elif 'jakne' in categories_lower:
-            return 'JAKNE'
-        elif any(term in categories_lower for term in ['trenerke', 'kompleti']):
-            return 'TRENERKE'
-
-        print(f"Debug - kategorija nije prepoznata, koristi se OSTALO")
-        return 'OSTALO'  # Default kategorija
-
-    def map_category_to_code(self, category_name, gender):
-        """Mapira kategoriju i pol u numerički kod"""
-        category_mapping = {
-            # Muške kategorije (1xxx)
-            'M': {
-                'TRENERKE': '1001',
-                'DUKSEVI': '1002',
-                'MAJICE': '1003',
-                'ŠORCEVI': '1004',
-                'PANTALONE': '1005',
-                'JAKNE': '1006',
-                'SETOVI': '1007',
-                'OSTALO': '1099'
-            },
-            # Ženske kategorije (2xxx)
-            'F': {
-                'TRENERKE': '2001',
-                'DUKSEVI': '2002',
-                'MAJICE': '2003',
-                'ŠORCEVI': '2004',
-                'PANTALONE': '2005',
-                'JAKNE': '2006',
-                'SETOVI': '2007',
-                'OSTALO': '2099'
-            },
-            # Unisex kategorije (3xxx)
-            'U': {
-                'TRENERKE': '3001',
-                'DUKSEVI': '3002',
-                'MAJICE': '3003',
-                'ŠORCEVI': '3004',
-                'PANTALONE': '3005',
-                'JAKNE': '3006',
-                'SETOVI': '3007',
-                'OSTALO': '3099'
-            }
-        }
+    def fetch_product_variations(self, product_id, fields=None):
+        """Dobija sve varijante proizvoda (po 100 po stranici, isto za product i stock sync)"""
+        url = f"{self.wc_api_url}/products/{product_id}/variations"
+        variations = []
+        page = 1
 
-        code = category_mapping.get(gender, {}).get(category_name, '9999')
-        print(f"Debug - mapiranje kategorije: {category_name} + {gender} -> {code}")
-        return code
+        while True:
+            params = {'per_page': 100, 'page': page}
+            if fields:
+                params['_fields'] = fields
+            try:
+                response = self.session.get(url, auth=self.wc_auth, params=params)
+                response.raise_for_status()
+                batch = response.json()
+            except requests.RequestException as e:
+                print(f"Greška pri dobijanju varijanti za proizvod {product_id}: {e}")
+                return []
 
-    def extract_size_from_variation_attributes(self, variation):
-        """Izvlači veličinu iz atributa varijacije - format 'Veličina: 6' -> '6'"""
-        for attribute in variation.get('attributes', []):
-            attr_name = attribute.get('name', '').lower()
-            attr_option = attribute.get('option', '')
+            variations.extend(WcVariation.from_api(variation) for variation in batch)
+            if len(batch) < params['per_page']:
+                return variations
+            page += 1
 
-            # Proverava da li je atribut veličina
-            if any(size_term in attr_name for size_term in ['veličina', 'velicina', 'size']):
-                # Čisti veličinu - uklanja sve što nije broj/slovo
-                size_clean = attr_option.strip()
-                print(f"Debug - pronađena veličina: '{attr_option}' -> '{size_clean}'")
-                return size_clean
+    def fetch_taxonomy_terms(self, endpoint):
+        """Dobija sve kategorije ili tagove (id, name, parent) - None ako zahtev ne uspe"""
+        terms = []
+        page = 1
 
-        return None
+        while True:
+            params = {'per_page': 100, 'page': page, '_fields': 'id,name,parent'}
+            try:
+                response = self.session.get(f"{self.wc_api_url}/products/{endpoint}", auth=self.wc_auth,
+                                            params=params)
+                response.raise_for_status()
+                batch = response.json()
+            except requests.RequestException as e:
+                print(f"Greška pri dobijanju {endpoint}: {e}")
+                return None
 
-    def get_product_sizes_from_variations(self, variations):
-        """Dobija sve veličine iz varijanti proizvoda"""
-        sizes = []
+            terms.extend(batch)
+            if len(batch) < params['per_page']:
+                return terms
+            page += 1
+
+    def fetch_taxonomy(self):
+        """Dobija kategorije i tagove za TaxonomyCache"""
+        categories = self.fetch_taxonomy_terms('categories')
+        tags = self.fetch_taxonomy_terms('tags')
+        if categories is None or tags is None:
+            print("Taksonomija nije dostupna - mapiranje po nazivima kategorija")
+            return None
 
-        for variation in variations:
-            size = self.extract_size_from_variation_attributes(variation)
-            if size and size not in sizes:
-                sizes.append(size)
+        print(f"Dobijeno {len(categories)} kategorija i {len(tags)} tagova iz WooCommerce-a")
+        return categories, tags
 
-        print(f"Debug - sve pronađene veličine: {sizes}")
-        return sizes
+    def build_stock_product(self, wc_product, prices=None):
+        """Stock zapis (sku, stock, type, cene) iz proizvoda dobijenog sa STOCK_PRODUCT_FIELDS projekcijom
 
-    def get_stock_data_from_variations(self, variations):
-        """Dobija podatke o stanju zaliha iz varijanti"""
+        Zalihe i cene se računaju isto kao u build_remiks_product, samo bez mapiranja kategorija i slika.
+        """
+        net_retail_price, sale_price, invoice_price = prices or wc_prices([wc_product])[0]
         stock_data = {}
 
-        for variation in variations:
-            # Dobija veličinu pomoću nove funkcije
-            size = self.extract_size_from_variation_attributes(variation)
-
-            if size:
-                stock_qty = variation.get('stock_quantity', 0) or 0
-                # Simulira magacin (možete prilagoditi prema vašim potrebama)
-                stock_data[size] = {
-                    '10-GLAVNI MAGACIN': stock_qty
-                }
-                print(f"Debug - stock za veličinu {size}: {stock_qty}")
-
-        return stock_data
-
-    def extract_season_from_categories_or_tags(self, categories, tags):
-        """Izvlači sezonu iz kategorija ili tagova"""
-        all_terms = [cat['name'].lower() for cat in categories] + [tag['name'].lower() for tag in tags]
-
-        if any('leto' in term or 'summer' in term or 'spring' in term or 'proleće' in term for term in all_terms):
-            return 'LETO 2025'
-        elif any('zima' in term or 'winter' in term or 'jesen' in term or 'autumn' in term for term in all_terms):
-            return 'ZIMA 2025'
+        if wc_product.type == 'variable':
+            with self.metrics.stage('fetch_variations'):
+                variations = self.fetch_product_variations(wc_product.id, fields=STOCK_VARIATION_FIELDS)
+            stock_data = self.get_stock_data_from_variations(variations)
         else:
-            return 'UNIVERZALNO'
+            for attribute in wc_product.attributes:
+                if 'size' in attribute.name.lower():
+                    stock_qty = wc_product.stock_quantity or 0
+                    stock_data = {size: {'10-GLAVNI MAGACIN': stock_qty} for size in attribute.options}
+                    break
+
+        return StockEntry(
+            sku=wc_product.sku,
+            stock=stock_levels(stock_data),
+            type='configurable' if wc_product.type == 'variable' else 'simple',
+            net_retail_price=net_retail_price,
+            sale_price=sale_price,
+            invoice_price=invoice_price,
+        )
+
+    def prepare_stock_data(self):
+        """Priprema samo stock podatke - proizvodi i varijante se dobijaju sa _fields projekcijom"""
+        with self.metrics.stage('fetch_products'):
+            wc_products = self.fetch_woocommerce_products(fields=STOCK_PRODUCT_FIELDS)
+
+        stock_entries = []
+        with self.metrics.stage('transform'):
+            for wc_product, prices in zip(wc_products, wc_prices(wc_products)):
+                if not wc_product.sku:
+                    print(f"Proizvod {wc_product.id} nema SKU - preskače se")
+                    continue
+                stock_entries.append(self.build_stock_product(wc_product, prices))
+
+        return stock_entries
+
+    def build_remiks_product(self, wc_product):
+        """Pretvara jedan WcProduct u RemiksProduct (dobija varijante ako je potrebno)"""
+        variations = []
+        if wc_product.type == 'variable':
+            with self.metrics.stage('fetch_variations'):
+                variations = self.fetch_product_variations(wc_product.id)
+        return transform_product(wc_product, variations, self.taxonomy_cache.get())
 
     def prepare_remiks_data(self):
         """Priprema podatke za slanje na remiks servis"""
-        wc_products = self.fetch_woocommerce_products()
-        products_array = []
-        product_skus = []
-
-        for wc_product in wc_products:
-            # Proverava da li proizvod ima SKU
-            sku = wc_product.get('sku')
-            if not sku:
-                print(f"Proizvod {wc_product['name']} nema SKU - preskače se")
-                continue
-
-            product_skus.append(sku)
-
-            # Dobija varijante ako je varijabilni proizvod
-            variations = []
-            product_sizes = []
-            stock_data = {}
-
-            if wc_product.get('type') == 'variable':
-                variations = self.fetch_product_variations(wc_product['id'])
-                product_sizes = self.get_product_sizes_from_variations(variations)
-                stock_data = self.get_stock_data_from_variations(variations)
-            else:
-                # Jednostavan proizvod - pokušava da pronađe veličinu u atributima
-                for attribute in wc_product.get('attributes', []):
-                    if 'size' in attribute.get('name', '').lower():
-                        product_sizes = attribute.get('options', [])
-                        break
-
-                # Stock za jednostavan proizvod
-                if product_sizes:
-                    stock_qty = wc_product.get('stock_quantity', 0) or 0
-                    for size in product_sizes:
-                        stock_data[size] = {'10-GLAVNI MAGACIN': stock_qty}
-
-            # Mapira podatke
-            categories = wc_product.get('categories', [])
-            tags = wc_product.get('tags', [])
-
-            # Mapiranje pomoću novih funkcija
-            gender = self.map_gender_from_categories(categories)
-            brand = self.extract_brand_from_name(wc_product['name'])
-            product_category = self.map_product_category(wc_product['name'], categories)
-            category_code = self.map_category_to_code(product_category, gender)
-
-            # Dobija slike
-            images = []
-            for img in wc_product.get('images', []):
-                images.append(img['src'])
-
-            # Dodaje placeholder slike ako nema dovoljno
-            while len(images) < 4:
-                images.append('')
-
-            # Formira finalni objekat
-            product_info = {
-                'sku': sku,
-                'gender': gender,
-                'product_name': wc_product['name'].replace('š', 's').replace('ž', 'z').replace('č', 'c').replace('ć',
-                                                                                                                 'c'),
-                'stock': stock_data,
-                'type': 'configurable' if wc_product.get('type') == 'variable' else 'simple',
-                'net_retail_price': float(wc_product.get('regular_price', 0) or wc_product.get('price', 0) or 0),
-                'active': 1 if wc_product.get('status') == 'publish' else 0,
-                'brand': brand,
-                'category_code': category_code,
-                'product_category_name': product_category,  # Dodano za debug
-                'product_variation': 'size' if product_sizes else 'none',
-                'product_variations': product_sizes,
-                'sale_price': float(wc_product.get('sale_price', 0) or wc_product.get('price', 0) or 0),
-                'invoice_price': float(wc_product.get('price', 0) or 0) * 0.8333 * 0.82,  # Kao u originalnom kodu
-                'weight': "0.2",
-                'vat': "20",
-                'vat symbol': "Đ",
-                'season': self.extract_season_from_categories_or_tags(categories, tags),
-                'images': images[:4],
-                'description':wc_product.get('description', ''),
-            }
-
-            # Dodaje EAN kodove ako su dostupni u meta podacima (opciono)
-            # product_info['ean_variations'] = {}  # Implementirati ako je potrebno
+        with self.metrics.stage('fetch_products'):
+            wc_products = self.fetch_woocommerce_products()
+        with self.metrics.stage('fetch_taxonomy'):
+            taxonomy = self.taxonomy_cache.get()
 
-            products_array.append(product_info)
-            print(f"Obrađen proizvod: {product_info['product_name'][:50]}...")
+        items = []
+        product_skus = []
+        with self.metrics.stage('fetch_variations'):
+            for wc_product in wc_products:
+                # Proverava da li proizvod ima SKU
+                sku = wc_product.sku
+                if not sku:
+                    print(f"Proizvod {wc_product.name} nema SKU - preskače se")
+                    continue
+
+                product_skus.append(sku)
+                variations = []
+                if wc_product.type == 'variable':
+                    variations = self.fetch_product_variations(wc_product.id)
+                items.append((wc_product, variations))
+
+        # Čista transformacija (bez mreže) - sa WC_TRANSFORM_WORKERS > 1 u process pool-u, redosled ostaje isti
+        with self.metrics.stage('transform'):
+            products_array = transform_products(items, taxonomy, workers=self.transform_workers)
+        for product_info in products_array:
+            print(f"Obrađen proizvod: {product_info.product_name[:50]}...")
 
         return products_array, product_skus
 
@@ -354,7 +249,7 @@ class WooCommerceToRemiks:
         }
 
         try:
-            response = requests.request("GET", self.remiks_url_login, headers=headers, data=payload)
+            response = self.session.request("GET", self.remiks_url_login, headers=headers, data=payload)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get('token')
@@ -367,16 +262,16 @@ class WooCommerceToRemiks:
             return None
 
     def send_request_to_remiks(self, payload, token):
-        """Šalje podatke na remiks servis"""
+        """Šalje podatke na remiks servis (payload: RemiksProduct zapisi, u dict se pretvaraju tek ovde)"""
         headers = {
             'Content-Type': 'application/json',
             'Authorization': 'Bearer ' + token
         }
 
-        send_data = json.dumps(payload)
+        send_data = dumps_payload(payload)
 
         try:
-            response = requests.request("POST", self.remiks_url_product, headers=headers, data=send_data)
+            response = self.session.request("POST", self.remiks_url_product, headers=headers, data=send_data)
             if response.status_code == 200:
                 data = response.json()
                 return data
@@ -387,6 +282,27 @@ class WooCommerceToRemiks:
             print("Error:", e)
             return None
 
+    def send_stock_to_remiks(self, payload, token):
+        """Šalje samo stock podatke na remiks stock servis"""
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': 'Bearer ' + token
+        }
+
+        send_data = dumps_payload(payload)
+
+        try:
+            response = self.session.request("POST", self.remiks_url_stock, headers=headers, data=send_data)
+            if response.status_code == 200:
+                data = response.json()
+                return data
+            else:
+                print(f"Greška pri slanju na remiks stock servis: {response.status_code} - {response.text}")
+                return None
+        except Exception as e:
+            print("Error:", e)
+            return None
+
     def log_errors(self, response_json):
         """Loguje greške u fajl"""
         if response_json and response_json.get('errors', []):
@@ -397,15 +313,14 @@ class WooCommerceToRemiks:
                 for error in response_json['errors']:
                     log_file.write(f"{timestamp}: {error}\n")
 
-    def save_json_payload(self, payload):
+    def save_json_payload(self, payload, prefix='payload_wc_to_remiks'):
         """Čuva JSON payload u fajl"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = os.path.join(script_dir, f'payload_wc_to_remiks_{timestamp}.json')
+            filename = os.path.join(self.output_dir, f'{prefix}_{timestamp}.json')
 
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, indent=4, ensure_ascii=False)
+                f.writelines(iter_payload(payload, indent=4, ensure_ascii=False))
 
             print(f"JSON payload sačuvan u {filename}")
         except Exception as e:
@@ -424,7 +339,7 @@ class WooCommerceToRemiks:
                 url = f"{self.wc_api_url}/products"
                 params = {'sku': sku}
 
-                response = requests.get(url, auth=self.wc_auth, params=params)
+                response = self.session.get(url, auth=self.wc_auth, params=params)
                 if response.status_code == 200:
                     products = response.json()
                     if products:
@@ -441,12 +356,13 @@ class WooCommerceToRemiks:
                             ]
                         }
 
-                        requests.put(update_url, auth=self.wc_auth, json=update_data)
+                        self.session.put(update_url, auth=self.wc_auth, json=update_data)
             except Exception as e:
                 print(f"Greška pri ažuriranju sync status za SKU {sku}: {e}")
 
+    @timed_run('wc_products')
     def run_sync(self):
-        """Glavna funkcija za pokretanje sinhronizacije"""
+        """Glavna funkcija za pokretanje sinhronizacije - vraća True ako je Remiks prihvatio payload"""
         print("Pokretanje WooCommerce -> Remiks sinhronizacije...")
 
         # Priprema podatke
@@ -454,27 +370,34 @@ class WooCommerceToRemiks:
 
         if not payload:
             print("Nema proizvoda za sinhronizaciju")
-            return
+            return False
 
         print(f"Pripremljeno {len(payload)} proizvoda za slanje")
 
         # Čuva payload
-        self.save_json_payload(payload)
+        with self.metrics.stage('json_dump'):
+            self.save_json_payload(payload)
 
-        # Dobija JWT token
-        jwt_token = self.get_jwt_token()
+        # Dobija JWT token (ponovo koristi keširani ako nije istekao)
+        with self.metrics.stage('login'):
+            jwt_token = self.token_cache.get()
         if not jwt_token:
             print("Nije moguće dobiti JWT token")
-            return
+            return False
 
         # Šalje podatke na remiks
-        response = self.send_request_to_remiks(payload, jwt_token)
+        with self.metrics.stage('upload'):
+            response = self.send_request_to_remiks(payload, jwt_token)
+        if not response:
+            self.token_cache.invalidate()
 
+        success = bool(response) and not response.get('errors', [])
         if response:
-            if not response.get('errors', []):
+            if success:
                 print("Uspešno poslano na remiks servis!")
                 # Označava proizvode kao sinhronizovane
-                self.update_woocommerce_sync_status(product_skus)
+                with self.metrics.stage('wc_sync_status'):
+                    self.update_woocommerce_sync_status(product_skus)
             else:
                 print("Remiks servis vratio greške:")
                 self.log_errors(response)
@@ -482,6 +405,46 @@ class WooCommerceToRemiks:
                     print(f"  - {error}")
         else:
             print("Greška pri slanju na remiks servis")
+        return success
+
+    @timed_run('wc_stock')
+    def run_stock_sync(self):
+        """Stock-only sinhronizacija: WooCommerce zalihe i cene -> Remiks stock servis - vraća True ako je uspelo"""
+        print("Pokretanje WooCommerce -> Remiks stock sinhronizacije...")
+
+        payload = self.prepare_stock_data()
+        if not payload:
+            print("Nema proizvoda za stock sinhronizaciju")
+            return False
+
+        print(f"Pripremljeno {len(payload)} stock zapisa za slanje")
+
+        with self.metrics.stage('json_dump'):
+            self.save_json_payload(payload, prefix='payload_wc_stock')
+
+        with self.metrics.stage('login'):
+            jwt_token = self.token_cache.get()
+        if not jwt_token:
+            print("Nije moguće dobiti JWT token")
+            return False
+
+        with self.metrics.stage('upload'):
+            response = self.send_stock_to_remiks(payload, jwt_token)
+        if not response:
+            self.token_cache.invalidate()
+
+        success = bool(response) and not response.get('errors', [])
+        if response:
+            if success:
+                print("Stock uspešno poslat na remiks servis!")
+            else:
+                print("Remiks stock servis vratio greške:")
+                self.log_errors(response)
+                for error in response.get('errors', []):
+                    print(f"  - {error}")
+        else:
+            print("Greška pri slanju na remiks stock servis")
+        return success
 
     def format_stock_for_excel(self, stock_data):
         """Formatira stock podatke u string format: size:qty;size:qty"""
@@ -528,8 +491,12 @@ class WooCommerceToRemiks:
         print(f"Najnoviji JSON fajl: {json_files[0][0]}")
         return latest_file
 
-    def convert_json_to_excel(self, json_file_path=None):
-        """Konvertuje JSON u Excel sa custom formatiranjem"""
+    def convert_json_to_excel(self, json_file_path=None, columnar=None):
+        """Konvertuje JSON u Excel sa custom formatiranjem
+
+        Sa columnar='parquet' ili 'csv' (ili EXPORT_COLUMNAR) pored Excel-a upisuje i tabele
+        proizvoda, zaliha (sku, size, warehouse, qty), slika i varijanti.
+        """
         try:
             import pandas as pd
         except ImportError:
@@ -591,30 +558,18 @@ class WooCommerceToRemiks:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_filename = os.path.join(script_dir, f'woocommerce_products_{timestamp}.xlsx')
 
-        # Eksportuje u Excel
-        with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Products', index=False)
-
-            # Dobija worksheet za formatiranje
-            worksheet = writer.sheets['Products']
-
-            # Auto-adjust kolona width
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
+        # Eksportuje u Excel (write-only, širine kolona iz DataFrame-a)
+        from excel_export import write_dataframe
+        write_dataframe(df, excel_filename, 'Products')
 
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
+        print(f"Excel fajl kreiran: {excel_filename}")
 
-                # Ograničava maksimalnu širinu
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        columnar = columnar or os.getenv('EXPORT_COLUMNAR')
+        if columnar:
+            from columnar_export import payload_tables, write_tables
+            for path in write_tables(payload_tables(products_data), os.path.splitext(excel_filename)[0], columnar):
+                print(f"Kolonarni fajl kreiran: {path}")
 
-        print(f"Excel fajl kreiran: {excel_filename}")
         print(f"Broj proizvoda: {len(excel_data)}")
         print(f"Broj kolona: {len(df.columns)}")
 
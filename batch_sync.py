@@ -0,0 +1,88 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+
+def resolve_excel_paths(path_or_pattern):
+    """Vraća sortiranu listu Excel fajlova za zadati fajl, direktorijum ili glob pattern"""
+    if os.path.isdir(path_or_pattern):
+        candidates = [os.path.join(path_or_pattern, name) for name in os.listdir(path_or_pattern)]
+    elif glob.has_magic(path_or_pattern):
+        candidates = glob.glob(path_or_pattern)
+    else:
+        # Eksplicitno zadat fajl se prihvata bez obzira na ekstenziju (kao ranije)
+        return [path_or_pattern] if os.path.isfile(path_or_pattern) else []
+
+    excel_paths = []
+    for path in candidates:
+        filename = os.path.basename(path)
+        # Preskače Excel lock fajlove (~$fajl.xlsx) koji postoje dok je fajl otvoren
+        if filename.startswith('~$') or os.path.splitext(filename)[1].lower() not in EXCEL_EXTENSIONS:
+            continue
+        if os.path.isfile(path):
+            excel_paths.append(path)
+
+    return sorted(excel_paths)
+
+
+def prepare_files_in_parallel(prepare_file, excel_paths, workers=None):
+    """Priprema svaki fajl u process pool-u i vraća rezultate u redosledu fajlova
+
+    prepare_file mora biti funkcija na nivou modula (pickle) koja vraća (putanja, proizvodi).
+    """
+    if not excel_paths:
+        return []
+
+    if workers is None:
+        workers = min(len(excel_paths), os.cpu_count() or 1)
+
+    # Za jedan fajl ili jedan worker nema smisla podizati procese
+    if workers <= 1 or len(excel_paths) == 1:
+        return [prepare_file(path) for path in excel_paths]
+
+    print(f"Paralelna obrada {len(excel_paths)} fajlova sa {workers} procesa...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(prepare_file, excel_paths))
+
+
+def map_in_chunks(process_chunk, items, workers=1, chunk_size=500, *args):
+    """Deli items na delove od chunk_size i obrađuje ih u process pool-u - rezultati u ulaznom redosledu
+
+    process_chunk(chunk, *args) mora biti funkcija na nivou modula (pickle) koja vraća listu.
+    Deo po deo (a ne element po element) drži broj pickle poruka između procesa malim.
+    """
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        results = [process_chunk(chunk, *args) for chunk in chunks]
+    else:
+        print(f"Paralelna obrada {len(items)} stavki u {len(chunks)} delova sa {workers} procesa...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(process_chunk, chunks, *[[arg] * len(chunks) for arg in args]))
+
+    return [item for chunk_result in results for item in chunk_result]
+
+
+def merge_products_by_sku(results):
+    """Spaja proizvode iz više fajlova u jednu listu bez duplikata SKU
+
+    Prednost ima fajl koji je kasniji u sortiranom redosledu - isto kao kada se
+    fajlovi šalju jedan po jedan u petlji, pa poslednji upis pregazi prethodne.
+    """
+    merged = {}
+    sources = {}
+    duplicates = 0
+
+    for excel_path, products in results:
+        for product in products:
+            sku = product['sku']
+            if sku in merged:
+                duplicates += 1
+                print(f"Duplikat SKU {sku}: {os.path.basename(sources[sku])} -> "
+                      f"{os.path.basename(excel_path)} (koristi se {os.path.basename(excel_path)})")
+            merged[sku] = product
+            sources[sku] = excel_path
+
+    return list(merged.values()), duplicates
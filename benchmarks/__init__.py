@@ -0,0 +1 @@
+"""Benchmark suite za sync pipeline - pokreće se sa `python -m benchmarks.run_benchmarks`"""
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import random
+
+BRANDS = ['REEBOK', 'JACK & JONES', 'MESSI', 'VINGINO', 'BENETTON', 'MINOTI']
+PRODUCT_TYPES = [
+    ('Majica', 'Majice'),
+    ('Duks', 'Duksevi'),
+    ('Pantalone', 'Pantalone'),
+    ('Jakna', 'Jakne'),
+    ('Šorc', 'Šorcevi'),
+    ('Trenerka', 'Trenerke'),
+    ('Komplet', 'Setovi'),
+    ('Haljina', 'Ostalo'),
+]
+GENDERS = [('za dečake', 'Dečaci'), ('za devojčice', 'Devojčice'), ('za bebe', 'Bebe')]
+SEASONS = ['Leto', 'Zima', 'Proleće', 'Jesen']
+SIZES = ['2', '4', '6', '8', '10', '12', '14', '16']
+WAREHOUSES = ['Bambini-10-GLAVNI MAGACIN', 'MAGACIN 2', 'MAGACIN 3']
+DESCRIPTION = 'Pamučni materijal, udobno za svakodnevno nošenje. ' * 4
+
+UPISATI_COLUMNS = [
+    'SKU', 'NAME', 'BRAND', 'CATEGORY', 'SIZE', 'QTY', 'EAN', 'IMAGES', 'VARIATION', 'TYPE',
+    'RETAIL_PRICE', 'SPECIAL_PRICE', 'VAT_SYMBOL', 'VAT', 'WEIGHT', 'PACKING_TIME',
+    'PACKING_TIME_TYPE', 'WAREHOUSE', 'DESCRIPTION',
+]
+
+
+def generate_catalog(count, seed=42):
+    """Generiše `count` sintetičkih proizvoda (isti seed -> isti katalog)"""
+    rng = random.Random(seed)
+    items = []
+
+    for index in range(count):
+        brand = rng.choice(BRANDS)
+        type_name, type_category = rng.choice(PRODUCT_TYPES)
+        gender_words, gender_category = rng.choice(GENDERS)
+        season = rng.choice(SEASONS)
+
+        first_size = rng.randrange(len(SIZES) - 2)
+        sizes = SIZES[first_size:first_size + rng.randint(1, 5)]
+        retail_price = rng.randrange(990, 9990, 100)
+        special_price = retail_price - 500 if rng.random() < 0.3 else None
+
+        items.append({
+            'id': index + 1,
+            'sku': f"BN{index + 1:07d}",
+            'name': f"{brand} {type_name} {gender_words} {rng.randrange(100, 999)}",
+            'brand': brand,
+            'categories': [gender_category, type_category],
+            'season': season,
+            'variable': len(sizes) > 1,
+            'sizes': sizes,
+            'stock': {size: rng.randrange(0, 12) for size in sizes},
+            'warehouse': rng.choice(WAREHOUSES),
+            'retail_price': retail_price,
+            'special_price': special_price,
+            'images': [f"https://www.bambini.rs/wp-content/uploads/bn{index + 1}_{n}.jpg"
+                       for n in range(rng.randint(1, 4))],
+        })
+
+    return items
+
+
+def _category_id(name):
+    """Stabilan ID kategorije na osnovu imena"""
+    return sum(ord(ch) for ch in name)
+
+
+def to_woocommerce(items):
+    """Pretvara katalog u WooCommerce REST format: (proizvodi, {product_id: varijante})"""
+    products = []
+    variations = {}
+
+    for item in items:
+        price = item['special_price'] or item['retail_price']
+        product = {
+            'id': item['id'],
+            'name': item['name'],
+            'sku': item['sku'],
+            'type': 'variable' if item['variable'] else 'simple',
+            'status': 'publish',
+            'price': str(price),
+            'regular_price': str(item['retail_price']),
+            'sale_price': str(item['special_price'] or ''),
+            'stock_quantity': sum(item['stock'].values()),
+            'attributes': [{'id': 1, 'name': 'Veličina', 'options': item['sizes']}],
+            'categories': [{'id': _category_id(name), 'name': name} for name in item['categories']],
+            'tags': [{'id': _category_id(item['season']), 'name': item['season']}],
+            'images': [{'id': n, 'src': src} for n, src in enumerate(item['images'])],
+            'description': DESCRIPTION,
+        }
+        if not item['variable']:
+            # Jednostavni proizvodi u WooCommerce-u imaju atribut 'Size' sa opcijama
+            product['attributes'] = [{'id': 1, 'name': 'Size', 'options': item['sizes']}]
+        products.append(product)
+
+        if item['variable']:
+            variations[item['id']] = [{
+                'id': item['id'] * 100 + n,
+                'sku': f"{item['sku']}-{size}",
+                'price': str(price),
+                'stock_quantity': item['stock'][size],
+                'attributes': [{'id': 1, 'name': 'Veličina', 'option': size}],
+            } for n, size in enumerate(item['sizes'])]
+
+    return products, variations
+
+
+def upisati_rows(items):
+    """Redovi za UPISATI sheet - jedan red po SKU i veličini"""
+    rows = []
+    for item in items:
+        for size in item['sizes']:
+            rows.append({
+                'SKU': item['sku'],
+                'NAME': item['name'],
+                'BRAND': item['brand'],
+                'CATEGORY': '; '.join(item['categories']),
+                'SIZE': size,
+                'QTY': item['stock'][size],
+                'EAN': f"860{item['id']:07d}{size.zfill(3)}",
+                'IMAGES': ', '.join(item['images']),
+                'VARIATION': 'SIZE',
+                'TYPE': 'configurabile' if item['variable'] else 'simple',
+                'RETAIL_PRICE': item['retail_price'],
+                'SPECIAL_PRICE': item['special_price'],
+                'VAT_SYMBOL': 'Đ',
+                'VAT': 20,
+                'WEIGHT': 0.2,
+                'PACKING_TIME': 2,
+                'PACKING_TIME_TYPE': 'Dan',
+                'WAREHOUSE': item['warehouse'],
+                'DESCRIPTION': DESCRIPTION,
+            })
+    return rows
+
+
+def zalihe_rows(items):
+    """Redovi za zalihe/zalihe.xlsx (SKU, SIZE, WAREHOUSE, QTY)"""
+    return [{'SKU': item['sku'], 'SIZE': size, 'WAREHOUSE': item['warehouse'], 'QTY': qty}
+            for item in items for size, qty in item['stock'].items()]
+
+
+def stock_products_json(items):
+    """Proizvodi u formatu payload_wc_to_remiks_*.json koji StockUpdateScript koristi za cene"""
+    from pricing import PricingRules, price_list
+
+    prices = price_list([item['retail_price'] for item in items], [item['special_price'] for item in items],
+                        rules=PricingRules.for_source('woocommerce'))
+    products = []
+    for item, (net_retail_price, sale_price, invoice_price) in zip(items, prices):
+        products.append({
+            'sku': item['sku'],
+            'type': 'configurable' if item['variable'] else 'simple',
+            'net_retail_price': net_retail_price,
+            'sale_price': sale_price,
+            'invoice_price': invoice_price,
+        })
+    return products
+
+
+def write_workbook(rows, path, sheet_name, columns=None):
+    """Upisuje redove u Excel fajl (atomično, da prekinut upis ne ostavi pokvaren keš)"""
+    import pandas as pd
+
+    tmp_path = path + '.tmp.xlsx'
+    pd.DataFrame(rows, columns=columns).to_excel(tmp_path, sheet_name=sheet_name, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def generator_version():
+    """Kratak hash ovog fajla - izmena generatora ne sme da koristi fixture iz starog keša"""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:10]
+
+
+def fixture_path(cache_dir, kind, count, seed):
+    """Putanja fixture-a u kešu - ime sadrži i generator_version()"""
+    extension = 'json' if kind == 'products_json' else 'xlsx'
+    return os.path.join(cache_dir, f"{kind}_{count}_{seed}_{generator_version()}.{extension}")
+
+
+def cached_fixture(cache_dir, kind, count, seed, items):
+    """Vraća putanju do generisanog fajla - generiše ga samo ako ne postoji u kešu
+
+    kind je 'upisati', 'zalihe' ili 'products_json'.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = fixture_path(cache_dir, kind, count, seed)
+    if os.path.exists(path):
+        return path
+
+    if kind == 'upisati':
+        return write_workbook(upisati_rows(items), path, 'UPISATI', UPISATI_COLUMNS)
+    if kind == 'zalihe':
+        return write_workbook(zalihe_rows(items), path, 'Sheet1')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stock_products_json(items), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,110 @@
+"""Ponašanje sync skripti pod kvarovima: kašnjenje, 429, 5xx, prekinute konekcije, Remiks timeout
+
+    python -m benchmarks.fault_scenarios --size 300
+    python -m benchmarks.fault_scenarios --size 300 --faults wc_throttle,wc_disconnects --syncs wc_products
+
+Za svaki scenario kvara (benchmarks/faults.py) i svaku sync skriptu meri ukupno vreme,
+amplifikaciju zahteva (broj zahteva / broj zahteva bez kvarova) i kompletnost podataka
+(koliko SKU je stiglo do Remiks-a sa svim veličinama iz kataloga).
+Izveštaj ide u benchmarks/results/faults_<vreme>.json.
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+from benchmarks.faults import SCENARIOS as FAULT_SCENARIOS
+from benchmarks.run_benchmarks import RESULTS_DIR, SCENARIOS, BenchmarkContext, git_revision, run_scenario
+from benchmarks.stand_ins import StandInProcess
+
+DEFAULT_SYNCS = 'wc_products,excel_products,stock_update'
+
+
+def print_report(results):
+    print(f"\n{'kvar':<18}{'sync':<16}{'wall s':>9}{'zahteva':>9}{'ampl.':>7}{'SKU':>7}{'kompletno':>11}"
+          f"  ubačeni kvarovi / greška")
+    for result in results:
+        injected = ', '.join(f"{action} {count}" for action, count in result['injected'].items()) or '-'
+        amplification = f"{result['amplification']:.2f}" if result['amplification'] is not None else '-'
+        print(f"{result['fault']:<18}{result['sync']:<16}{result['wall_seconds']:>9.2f}{result['http_requests']:>9}"
+              f"{amplification:>7}{result['received']:>7}{result['completeness'] * 100:>10.0f}%  {injected}"
+              + (f" / {result['error']}" if result['error'] else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sync skripte pod ubačenim kvarovima i kašnjenjem')
+    parser.add_argument('--size', default=300, type=int, help='Broj SKU u sintetičkom katalogu')
+    parser.add_argument('--faults', default=','.join(FAULT_SCENARIOS),
+                        help=f"Scenariji kvarova ({', '.join(FAULT_SCENARIOS)})")
+    parser.add_argument('--syncs', default=DEFAULT_SYNCS, help=f"Sync scenariji ({', '.join(SCENARIOS)})")
+    parser.add_argument('--seed', type=int, default=42, help='Seed kataloga i kvarova')
+    parser.add_argument('--output-dir', default=RESULTS_DIR, help='Direktorijum za JSON izveštaj')
+    parser.add_argument('--verbose', action='store_true', help='Prikaži izlaz sync skripti')
+    args = parser.parse_args(argv)
+
+    faults = [name.strip() for name in args.faults.split(',')]
+    syncs = [name.strip() for name in args.syncs.split(',')]
+    unknown = ([name for name in faults if name not in FAULT_SCENARIOS]
+               + [name for name in syncs if name not in SCENARIOS])
+    if unknown:
+        parser.error(f"Nepoznati scenariji: {', '.join(unknown)}")
+
+    # Baseline je uvek prvi - amplifikacija se računa u odnosu na njega
+    if 'baseline' in faults:
+        faults.remove('baseline')
+    faults.insert(0, 'baseline')
+
+    context = BenchmarkContext(args.size, args.seed)
+    baseline_requests = {}
+    results = []
+
+    for fault in faults:
+        print(f"▶️  {fault}: {FAULT_SCENARIOS[fault]['description']}", flush=True)
+        stand_in = StandInProcess(args.size, args.seed, faults=FAULT_SCENARIOS[fault]['rules']).start()
+        try:
+            for sync in syncs:
+                run = run_scenario(sync, context, stand_in, args.verbose)
+                if fault == 'baseline':
+                    baseline_requests[sync] = run['http_requests']
+
+                expected_requests = baseline_requests.get(sync)
+                results.append({
+                    'fault': fault,
+                    'sync': sync,
+                    'wall_seconds': run['wall_seconds'],
+                    'http_requests': run['http_requests'],
+                    'http_errors': run['http_errors'],
+                    'amplification': (round(run['http_requests'] / expected_requests, 3)
+                                      if expected_requests else None),
+                    'received': run['received'],
+                    'received_complete': run['received_complete'],
+                    'expected': run['expected'],
+                    'completeness': (round(run['received_complete'] / run['expected'], 4)
+                                     if run['expected'] else 0.0),
+                    'injected': run['injected'],
+                    'error': run['error'],
+                })
+        finally:
+            stand_in.stop()
+
+    print_report(results)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_path = os.path.join(args.output_dir, f"faults_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'git_revision': git_revision(),
+                'size': args.size,
+                'seed': args.seed,
+                'faults': {name: FAULT_SCENARIOS[name] for name in faults},
+            },
+            'results': results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nIzveštaj sačuvan u {report_path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
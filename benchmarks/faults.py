@@ -0,0 +1,106 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+
+# Scenariji kvarova: lista pravila, svako pravilo važi za zahteve čiji 'METODA putanja' odgovara regex-u.
+# Polja pravila (sva opciona):
+#   latency       {'dist': 'fixed', 'value': s} | {'dist': 'uniform', 'min': s, 'max': s}
+#                 | {'dist': 'lognormal', 'median': s, 'sigma': x}
+#   error_rate    udeo zahteva koji dobija error_status (default 502)
+#   rate_limit    maksimalno zahteva u sekundi - višak dobija 429 sa Retry-After
+#   disconnect_rate  udeo odgovora koji se prekida na pola tela
+#   hang_rate     udeo zahteva koji visi hang_seconds pa vraća 504 (timeout bez klijentskog timeout-a)
+SCENARIOS = {
+    'baseline': {
+        'description': 'Bez kvarova - referenca za amplifikaciju zahteva',
+        'rules': [],
+    },
+    'slow_woocommerce': {
+        'description': 'WooCommerce odgovara sporo (lognormal, medijana 50ms)',
+        'rules': [{'match': r'^GET /wp-json/', 'latency': {'dist': 'lognormal', 'median': 0.05, 'sigma': 0.6}}],
+    },
+    'wc_throttle': {
+        'description': 'WooCommerce vraća 429 iznad 20 zahteva u sekundi',
+        'rules': [{'match': r' /wp-json/', 'rate_limit': 20, 'retry_after': 1}],
+    },
+    'wc_errors': {
+        'description': '5% zahteva za varijante i stranice proizvoda vraća 502',
+        'rules': [{'match': r'^GET /wp-json/wc/v3/products', 'error_rate': 0.05, 'error_status': 502}],
+    },
+    'wc_disconnects': {
+        'description': '2% WooCommerce odgovora se prekida usred tela',
+        'rules': [{'match': r'^GET /wp-json/', 'disconnect_rate': 0.02}],
+    },
+    'remiks_timeout': {
+        'description': 'Remiks upload visi 15s pa vraća 504',
+        'rules': [{'match': r'^POST /remiks/(product|stock)', 'hang_rate': 1.0, 'hang_seconds': 15}],
+    },
+}
+
+
+def sample_latency(spec, rng):
+    """Jedno kašnjenje u sekundama po specifikaciji raspodele"""
+    if not spec:
+        return 0.0
+    dist = spec.get('dist', 'fixed')
+    if dist == 'fixed':
+        return spec['value']
+    if dist == 'uniform':
+        return rng.uniform(spec['min'], spec['max'])
+    if dist == 'lognormal':
+        return spec['median'] * rng.lognormvariate(0, spec.get('sigma', 0.5))
+    raise ValueError(f"Nepoznata raspodela kašnjenja: {dist}")
+
+
+class FaultInjector:
+    """Odlučuje šta stand-in radi sa zahtevom: kašnjenje i (opciono) kvar
+
+    Odluke koriste sopstveni seed, pa isti scenario daje isti niz kvarova.
+    """
+
+    def __init__(self, rules=None, seed=0):
+        self.rules = [dict(rule, pattern=re.compile(rule['match'])) for rule in rules or []]
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.windows = {}  # indeks pravila -> deque vremena zahteva (rate limit)
+        self.injected = {}
+
+    def match(self, method, path):
+        key = f"{method} {path}"
+        for index, rule in enumerate(self.rules):
+            if rule['pattern'].search(key):
+                return index, rule
+        return None, None
+
+    def decide(self, method, path):
+        """Vraća (kašnjenje, akcija, parametri) - akcija je None, 'error', 'throttle', 'disconnect' ili 'hang'"""
+        index, rule = self.match(method, path)
+        if rule is None:
+            return 0.0, None, {}
+
+        with self.lock:
+            delay = sample_latency(rule.get('latency'), self.rng)
+            action, params = self._choose_action(index, rule)
+            if action:
+                self.injected[action] = self.injected.get(action, 0) + 1
+        return delay, action, params
+
+    def _choose_action(self, index, rule):
+        if rule.get('rate_limit'):
+            now = time.monotonic()
+            window = self.windows.setdefault(index, deque())
+            while window and now - window[0] > 1.0:
+                window.popleft()
+            if len(window) >= rule['rate_limit']:
+                return 'throttle', {'retry_after': rule.get('retry_after', 1)}
+            window.append(now)
+
+        if self.rng.random() < rule.get('hang_rate', 0):
+            return 'hang', {'seconds': rule.get('hang_seconds', 30)}
+        if self.rng.random() < rule.get('error_rate', 0):
+            return 'error', {'status': rule.get('error_status', 502)}
+        if self.rng.random() < rule.get('disconnect_rate', 0):
+            return 'disconnect', {}
+        return None, {}
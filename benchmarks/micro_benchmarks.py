@@ -0,0 +1,243 @@
+"""Micro-benchmark funkcija za mapiranje i transformaciju sa regression gate-om
+
+    python -m benchmarks.micro_benchmarks                      # poređenje sa baseline-om
+    python -m benchmarks.micro_benchmarks --update-baseline    # upis novog baseline-a
+    python -m benchmarks.micro_benchmarks --threshold 0.4 --only map_product_category
+
+Ulazi su realni nazivi, kategorije i varijante iz woocommerce_products.json.
+Izlazi sa kodom 1 ako je propusnost neke funkcije pala više od --threshold u odnosu na
+benchmarks/micro_baseline.json. Gate poredi propusnost relativno prema referentnom
+Python opterećenju merenom naizmenično u istom run-u, tako da razlike u brzini mašine
+i šum na deljenom CPU-u ne obaraju gate. Debug ispis funkcija ide u /dev/null, ali se
+i dalje meri - i u pravom run-u se plaća.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+SAMPLES_FILE = os.path.join(REPO_DIR, 'woocommerce_products.json')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'micro_baseline.json')
+
+PACKING_TIMES = [(2, 'Dan'), ('3', 'dani'), (1, 'sat'), (24, 'hours'), (1, 'mesec'), (None, None), ('x', 'dan')]
+CATEGORY_CODES = ['1003', '2002', '3005', '4001', '5099']
+REFERENCE_NAMES = ['REEBOK Set majica i šorc za bebe dečake', 'VINGINO Pantalone za devojčice'] * 25
+
+
+def reference_workload():
+    """Fiksno opterećenje sličnog tipa (lower, in, f-string) - meri trenutnu brzinu mašine"""
+    for name in REFERENCE_NAMES:
+        lower = name.lower()
+        found = 'majica' in lower or 'pantalone' in lower
+        f"{name}: {found}"
+
+
+def load_samples(path=SAMPLES_FILE):
+    """Pravi ulaze za svaku funkciju iz izvezenih WooCommerce proizvoda"""
+    from remiks_model import Term, WcVariation
+
+    with open(path, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    samples = {'names': [], 'categories': [], 'category_values': [], 'variations': [], 'prices': []}
+    for product in products:
+        name = product.get('name', '')
+        category_names = [c.strip() for c in product.get('categories', '').split(';') if c.strip()]
+
+        samples['names'].append(name)
+        samples['categories'].append([Term.from_api({'name': c}) for c in category_names])
+        samples['category_values'].append('; '.join(category_names))
+        samples['prices'].append((product.get('regular_price') or product.get('price'), product.get('sale_price')))
+
+        # U starijim exportima varijante su Python repr lista; atributi su uvek 'Veličina: 24m'
+        variations = product.get('variations') or []
+        if isinstance(variations, str):
+            try:
+                variations = ast.literal_eval(variations)
+            except (ValueError, SyntaxError):
+                variations = []
+        for variation in variations:
+            attributes = []
+            for attribute in str(variation.get('attributes', '')).split(','):
+                if ':' in attribute:
+                    attr_name, option = attribute.split(':', 1)
+                    attributes.append({'name': attr_name.strip(), 'option': option.strip()})
+            samples['variations'].append(WcVariation.from_api({'id': variation.get('id'), 'attributes': attributes}))
+
+    # Deo Excel kategorija je već numerička šifra
+    samples['category_values'] += CATEGORY_CODES
+    return samples
+
+
+def build_benchmarks(samples):
+    """Vraća {ime: (funkcija koja obradi sve uzorke, broj poziva po prolazu)}"""
+    from WooCommerceToRemiks import WooCommerceToRemiks
+    from excel_to_remiks import ExcelToRemiks
+    from pricing import PricingRules, price_list
+
+    wc = WooCommerceToRemiks()
+    excel = ExcelToRemiks()
+
+    names = samples['names']
+    named_categories = list(zip(names, samples['categories']))
+    category_values = [(value, names[i % len(names)]) for i, value in enumerate(samples['category_values'])]
+    variations = samples['variations']
+    prices = samples['prices']
+
+    def map_product_category():
+        for name, categories in named_categories:
+            wc.map_product_category(name, categories)
+
+    def get_category_code():
+        for value, name in category_values:
+            excel.get_category_code(value, name)
+
+    def extract_brand_from_name():
+        for name in names:
+            wc.extract_brand_from_name(name)
+
+    def extract_brand_from_name_excel():
+        for name in names:
+            excel.extract_brand_from_name('', name)
+
+    def extract_size_from_variation_attributes():
+        for variation in variations:
+            wc.extract_size_from_variation_attributes(variation)
+
+    retail_prices = [retail_price for retail_price, _ in prices]
+    special_prices = [special_price for _, special_price in prices]
+    stock_rules = PricingRules.for_source('excel_stock')
+
+    def calculate_prices():
+        # Cene se računaju za celu kolonu odjednom (pricing.py), kao u Excel i WooCommerce sync-u
+        price_list(retail_prices, special_prices, rules=stock_rules)
+
+    def parse_packing_time():
+        for packing_time, packing_time_type in PACKING_TIMES:
+            excel.parse_packing_time(packing_time, packing_time_type)
+
+    return {
+        'map_product_category': (map_product_category, len(named_categories)),
+        'get_category_code': (get_category_code, len(category_values)),
+        'extract_brand_from_name': (extract_brand_from_name, len(names)),
+        'extract_brand_from_name_excel': (extract_brand_from_name_excel, len(names)),
+        'extract_size_from_variation_attributes': (extract_size_from_variation_attributes, len(variations)),
+        'calculate_prices': (calculate_prices, len(prices)),
+        'parse_packing_time': (parse_packing_time, len(PACKING_TIMES)),
+    }
+
+
+def calibrate(timer, min_time):
+    """Broj prolaza tako da jedno merenje traje bar min_time sekundi"""
+    passes = 1
+    while timer.timeit(passes) < min_time:
+        passes *= 2
+    return passes
+
+
+def measure(func, calls_per_pass, repeat=7, min_time=0.2):
+    """Vraća (poziva u sekundi, relativna propusnost prema referentnom opterećenju)
+
+    Funkcija i referenca se mere naizmenično, pa svaki par vidi isto stanje mašine;
+    uzima se medijana odnosa.
+    """
+    timer = timeit.Timer(func)
+    reference = timeit.Timer(reference_workload)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        passes = calibrate(timer, min_time)
+        reference_passes = calibrate(reference, min_time)
+
+        throughputs = []
+        ratios = []
+        for _ in range(repeat):
+            reference_rate = reference_passes / reference.timeit(reference_passes)
+            throughput = calls_per_pass * passes / timer.timeit(passes)
+            throughputs.append(throughput)
+            ratios.append(throughput / reference_rate)
+    return max(throughputs), statistics.median(ratios)
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmark funkcija za mapiranje sa regression gate-om')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='JSON fajl sa baseline propusnošću')
+    parser.add_argument('--update-baseline', action='store_true', help='Upiši izmerene vrednosti kao novi baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Dozvoljen pad relativne propusnosti (0.25 = 25%%) pre nego što gate padne')
+    parser.add_argument('--repeat', type=int, default=7, help='Broj merenja po funkciji (uzima se medijana)')
+    parser.add_argument('--only', help='Samo navedene funkcije, odvojene zarezom')
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks(load_samples())
+    if args.only:
+        selected = [name.strip() for name in args.only.split(',')]
+        unknown = [name for name in selected if name not in benchmarks]
+        if unknown:
+            parser.error(f"Nepoznate funkcije: {', '.join(unknown)}")
+        benchmarks = {name: benchmarks[name] for name in selected}
+
+    baseline = load_baseline(args.baseline)
+    baseline_results = baseline['results'] if baseline else {}
+
+    results = {}
+    regressions = []
+    print(f"{'funkcija':<40}{'poziva/s':>14}{'relativno':>12}{'baseline':>12}{'promena':>10}")
+    for name, (func, calls_per_pass) in benchmarks.items():
+        calls_per_second, relative = measure(func, calls_per_pass, args.repeat)
+        results[name] = {'calls_per_second': round(calls_per_second, 1), 'relative': round(relative, 4)}
+
+        line = f"{name:<40}{calls_per_second:>14,.0f}{relative:>12.3f}"
+        previous = baseline_results.get(name, {}).get('relative')
+        if previous:
+            change = (relative - previous) / previous
+            line += f"{previous:>12.3f}{change * 100:>+9.1f}%"
+            if change < -args.threshold:
+                regressions.append(name)
+                line += '  ❌'
+        print(line)
+
+    if args.update_baseline:
+        if args.only and baseline:
+            # Delimično merenje ažurira samo izmerene funkcije
+            results = {**baseline_results, **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                },
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\nBaseline sačuvan u {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nBaseline ne postoji ({args.baseline}) - pokreni sa --update-baseline")
+        return 0
+
+    if regressions:
+        print(f"\n❌ Pad propusnosti veći od {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+
+    print(f"\n✅ Nema regresija (prag {args.threshold * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""End-to-end benchmark sync skripti nad sintetičkim katalogom i lokalnim stand-in servisima
+
+    python -m benchmarks.run_benchmarks --sizes 1k,10k
+    python -m benchmarks.run_benchmarks --sizes 1k --latency 0.05 --compare benchmarks/results/bench_X.json
+
+Svaki scenario se pokreće u privremenom direktorijumu (payload, izveštaji i metrike ne
+završavaju u repozitorijumu), a rezultati se upisuju u benchmarks/results/bench_<vreme>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from benchmarks.catalog import cached_fixture, fixture_path, generate_catalog
+from benchmarks.stand_ins import StandInProcess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+CACHE_DIR = os.path.join(BENCH_DIR, '.cache')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+def point_to_stand_in(sync, stand_in, workdir):
+    """Preusmerava sve URL-ove i izlazne fajlove sync objekta na stand-in i privremeni direktorijum"""
+    sync.remiks_url_login = stand_in.remiks_url('login')
+    if hasattr(sync, 'remiks_url_product'):
+        sync.remiks_url_product = stand_in.remiks_url('product')
+    if hasattr(sync, 'remiks_url_stock'):
+        sync.remiks_url_stock = stand_in.remiks_url('stock')
+    if hasattr(sync, 'wc_api_url'):
+        sync.wc_api_url = stand_in.wc_api_url
+    if hasattr(sync, 'output_dir'):
+        sync.output_dir = workdir
+
+
+def scenario_wc_products(context):
+    from WooCommerceToRemiks import WooCommerceToRemiks
+
+    sync = WooCommerceToRemiks()
+    return sync, sync.run_sync, 'product'
+
+
+def scenario_wc_stock(context):
+    from WooCommerceToRemiks import WooCommerceToRemiks
+
+    sync = WooCommerceToRemiks()
+    return sync, sync.run_stock_sync, 'stock'
+
+
+def scenario_excel_products(context):
+    from excel_to_remiks import ExcelToRemiks
+
+    excel_path = context.fixture('upisati')
+    sync = ExcelToRemiks()
+    return sync, lambda: sync.run_sync(excel_path), 'product'
+
+
+def scenario_excel_stock(context):
+    from ExcelToRemiksStock import ExcelToRemiksStock
+
+    excel_path = context.fixture('upisati')
+    sync = ExcelToRemiksStock()
+    return sync, lambda: sync.run_stock_sync(excel_path), 'stock'
+
+
+def scenario_stock_update(context):
+    from stock_update import StockUpdateScript
+
+    os.makedirs(os.path.join(context.workdir, 'zalihe'), exist_ok=True)
+    shutil.copy(context.fixture('zalihe'), os.path.join(context.workdir, 'zalihe', 'zalihe.xlsx'))
+    shutil.copy(context.fixture('products_json'),
+                os.path.join(context.workdir, 'payload_wc_to_remiks_benchmark.json'))
+
+    sync = StockUpdateScript()
+    sync.project_root = context.workdir
+    return sync, sync.run_stock_update, 'stock'
+
+
+SCENARIOS = {
+    'wc_products': scenario_wc_products,
+    'wc_stock': scenario_wc_stock,
+    'excel_products': scenario_excel_products,
+    'excel_stock': scenario_excel_stock,
+    'stock_update': scenario_stock_update,
+}
+
+
+class BenchmarkContext:
+    """Katalog jedne veličine i putanje do generisanih fajlova za scenarije"""
+
+    def __init__(self, count, seed, workdir=None):
+        self.count = count
+        self.seed = seed
+        self.workdir = workdir
+        self.items = None
+
+    def fixture(self, kind):
+        # Katalog se generiše tek kada fajl nije u kešu
+        if self.items is None and not os.path.exists(fixture_path(CACHE_DIR, kind, self.count, self.seed)):
+            self.items = generate_catalog(self.count, self.seed)
+        return cached_fixture(CACHE_DIR, kind, self.count, self.seed, self.items)
+
+
+def run_scenario(name, context, stand_in, verbose=False):
+    """Pokreće jedan scenario u privremenom direktorijumu i vraća izmerene vrednosti"""
+    previous_cwd = os.getcwd()
+    previous_metrics_dir = os.environ.get('METRICS_DIR')
+
+    with tempfile.TemporaryDirectory(prefix=f'bench_{name}_') as workdir:
+        context.workdir = workdir
+        os.environ['METRICS_DIR'] = os.path.join(workdir, 'metrics')
+        os.chdir(workdir)  # log fajlovi grešaka se pišu u tekući direktorijum
+        try:
+            sync, run, endpoint = SCENARIOS[name](context)
+            point_to_stand_in(sync, stand_in, workdir)
+            stand_in.reset_counters()
+
+            error = None
+            with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+                wall_started = time.perf_counter()
+                cpu_started = time.process_time()
+                try:
+                    run()
+                except Exception as e:
+                    # Neuhvaćen izuzetak sync skripte je rezultat, ne greška benchmark-a
+                    error = f"{type(e).__name__}: {e}"
+                cpu_seconds = time.process_time() - cpu_started
+                wall_seconds = time.perf_counter() - wall_started
+
+            summary = sync.metrics.summary()
+            server_stats = stand_in.stats()
+        finally:
+            os.chdir(previous_cwd)
+            if previous_metrics_dir is None:
+                os.environ.pop('METRICS_DIR', None)
+            else:
+                os.environ['METRICS_DIR'] = previous_metrics_dir
+
+    return {
+        'wall_seconds': round(wall_seconds, 4),
+        'cpu_seconds': round(cpu_seconds, 4),
+        'stages': {stage: stats['seconds'] for stage, stats in summary['stages'].items()},
+        'http_requests': server_stats['requests'],
+        'http_errors': sum(stats['errors'] for stats in summary['http'].values()),
+        'injected': server_stats.get('injected', {}),
+        'received': server_stats['received'][endpoint],
+        'received_complete': server_stats['received_complete'][endpoint],
+        'expected': context.count,
+        'error': error,
+    }
+
+
+def aggregate(name, count, runs):
+    """Spaja ponavljanja jednog scenarija - medijana vremena, stage-ovi iz medijanskog run-a"""
+    walls = [run['wall_seconds'] for run in runs]
+    median_run = sorted(runs, key=lambda run: run['wall_seconds'])[(len(runs) - 1) // 2]
+    return {
+        'scenario': name,
+        'size': count,
+        'repeat': len(runs),
+        'wall_seconds': round(statistics.median(walls), 4),
+        'wall_min_seconds': min(walls),
+        'cpu_seconds': round(statistics.median(run['cpu_seconds'] for run in runs), 4),
+        'items_per_second': round(count / statistics.median(walls), 1) if statistics.median(walls) else None,
+        'http_requests': median_run['http_requests'],
+        'received': median_run['received'],
+        'complete': all(run['received_complete'] == run['expected'] for run in runs),
+        'stages': median_run['stages'],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    baseline_walls = {}
+    if baseline:
+        baseline_walls = {(r['scenario'], r['size']): r['wall_seconds'] for r in baseline['results']}
+
+    meta = report['meta']
+    print(f"\n📊 Benchmark ({meta['git_revision'] or 'bez git-a'}, latency {meta['latency']}s, "
+          f"page size {meta['page_size']}, ponavljanja {meta['repeat']})")
+    print(f"{'scenario':<16}{'size':>8}{'wall s':>10}{'cpu s':>10}{'SKU/s':>10}{'HTTP':>9}{'kompletno':>11}"
+          + ('   vs baseline' if baseline else ''))
+
+    for result in report['results']:
+        line = (f"{result['scenario']:<16}{result['size']:>8}{result['wall_seconds']:>10.3f}"
+                f"{result['cpu_seconds']:>10.3f}{result['items_per_second'] or 0:>10.0f}"
+                f"{result['http_requests']:>9}{'DA' if result['complete'] else 'NE':>11}")
+        previous = baseline_walls.get((result['scenario'], result['size']))
+        if previous:
+            line += f"   {(result['wall_seconds'] - previous) / previous * 100:+.1f}%"
+        print(line)
+
+        slowest = sorted(result['stages'].items(), key=lambda item: item[1], reverse=True)[:3]
+        print(' ' * 16 + 'najsporije faze: ' + ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in slowest))
+
+
+def parse_size(value):
+    """'1k' -> 1000, '100k' -> 100000"""
+    value = value.strip().lower()
+    if value.endswith('k'):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='End-to-end benchmark sync skripti (offline)')
+    parser.add_argument('--sizes', default='1k', help='Veličine kataloga, npr. 1k,10k,100k')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Scenariji odvojeni zarezom ({', '.join(SCENARIOS)})")
+    parser.add_argument('--latency', type=float, default=0.0, help='Kašnjenje stand-in servisa po zahtevu (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Dodatno slučajno kašnjenje do N sekundi')
+    parser.add_argument('--page-size', type=int, default=100, help='Maksimalan per_page WooCommerce stand-in-a')
+    parser.add_argument('--repeat', type=int, default=1, help='Broj ponavljanja svakog scenarija')
+    parser.add_argument('--seed', type=int, default=42, help='Seed generatora kataloga')
+    parser.add_argument('--output-dir', default=RESULTS_DIR, help='Direktorijum za JSON izveštaj')
+    parser.add_argument('--compare', help='Prethodni JSON izveštaj za poređenje')
+    parser.add_argument('--verbose', action='store_true', help='Prikaži izlaz sync skripti')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    scenarios = [name.strip() for name in args.scenarios.split(',')]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Nepoznati scenariji: {', '.join(unknown)}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'page_size': args.page_size,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': [],
+    }
+
+    for count in sizes:
+        context = BenchmarkContext(count, args.seed)
+        stand_in = StandInProcess(count, args.seed, args.latency, args.jitter, args.page_size).start()
+        try:
+            for name in scenarios:
+                print(f"▶️  {name} ({count} SKU)...", flush=True)
+                runs = [run_scenario(name, context, stand_in, args.verbose) for _ in range(args.repeat)]
+                report['results'].append(aggregate(name, count, runs))
+        finally:
+            stand_in.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_path = os.path.join(args.output_dir, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nIzveštaj sačuvan u {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
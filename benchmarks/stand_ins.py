@@ -0,0 +1,293 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.faults import FaultInjector
+
+WC_PREFIX = '/wp-json/wc/v3'
+REMIKS_PREFIX = '/remiks'
+CONTROL_PREFIX = '/_bench'
+
+_PRODUCT_PATH = re.compile(r'^/wp-json/wc/v3/products/(\d+)$')
+_VARIATIONS_PATH = re.compile(r'^/wp-json/wc/v3/products/(\d+)/variations$')
+
+
+def project_fields(data, fields):
+    """WooCommerce _fields: odgovor sadrži samo navedena polja najvišeg nivoa"""
+    if isinstance(data, list):
+        return [project_fields(item, fields) for item in data]
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def make_jwt(ttl=3600):
+    """Nepotpisan JWT sa exp poljem - dovoljan za JwtTokenCache"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'exp': int(time.time()) + ttl})}.bench"
+
+
+class StandInServer:
+    """Lokalni WooCommerce REST API i Remiks login/product/stock endpoint-i za benchmark
+
+    Svaki odgovor kasni `latency` sekundi (+ slučajno do `jitter`), a stranice proizvoda
+    su ograničene na `max_page_size` kao na pravom WooCommerce-u. Remiks endpoint-i
+    broje primljene proizvode i one čije se veličine u stock-u poklapaju sa katalogom,
+    da bi benchmark video i tiho izgubljene varijante, ne samo izgubljene SKU.
+    Pravila iz `faults` (vidi benchmarks/faults.py) dodaju kašnjenja i kvarove po endpoint-u.
+    """
+
+    def __init__(self, products=None, variations=None, latency=0.0, jitter=0.0, max_page_size=100,
+                 host='127.0.0.1', faults=None, fault_seed=0):
+        self.products = products or []
+        self.products_by_id = {product['id']: product for product in self.products}
+        self.products_by_sku = {product['sku']: product for product in self.products}
+        self.variations = variations or {}
+        # /products/categories i /products/tags - termini koje koriste proizvodi kataloga
+        self.terms = {
+            endpoint: sorted({term['id']: {'id': term['id'], 'name': term['name'], 'parent': 0}
+                              for product in self.products for term in product.get(field, [])}.values(),
+                             key=lambda term: term['id'])
+            for endpoint, field in (('categories', 'categories'), ('tags', 'tags'))
+        }
+        self.expected_sizes = {product['sku']: set(product['attributes'][0]['options'])
+                               for product in self.products if product.get('attributes')}
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.host = host
+        self.faults = FaultInjector(faults, fault_seed)
+        self.server = None
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.received = {'product': 0, 'stock': 0}
+            self.received_complete = {'product': 0, 'stock': 0}
+            self.faults.injected.clear()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.server.server_port}"
+
+    @property
+    def wc_api_url(self):
+        return self.url + WC_PREFIX
+
+    def remiks_url(self, endpoint):
+        return f"{self.url}{REMIKS_PREFIX}/{endpoint}"
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 zbog keep-alive konekcija - kao pravi servisi
+            protocol_version = 'HTTP/1.1'
+            # Zaglavlja i telo idu u dva write-a - bez ovoga delayed ACK dodaje ~40ms po zahtevu
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in.handle(self, 'GET')
+
+            def do_POST(self):
+                stand_in.handle(self, 'POST')
+
+            def do_PUT(self):
+                stand_in.handle(self, 'PUT')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def stats(self):
+        with self.lock:
+            return {'requests': self.requests, 'received': dict(self.received),
+                    'received_complete': dict(self.received_complete),
+                    'injected': dict(self.faults.injected)}
+
+    def handle(self, handler, method):
+        body = handler.rfile.read(int(handler.headers.get('Content-Length', 0) or 0))
+        parsed = urlparse(handler.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+        # Kontrolni endpoint-i za benchmark se ne broje i ne kasne
+        if parsed.path.startswith(CONTROL_PREFIX):
+            if parsed.path == CONTROL_PREFIX + '/reset':
+                self.reset_counters()
+            self.respond(handler, 200, self.stats(), {})
+            return
+
+        with self.lock:
+            self.requests += 1
+
+        fault_delay, action, params = self.faults.decide(method, parsed.path)
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0) + fault_delay
+        if delay > 0:
+            time.sleep(delay)
+
+        if action == 'hang':
+            time.sleep(params['seconds'])
+            self.respond(handler, 504, {'code': 'gateway_timeout'}, {})
+            return
+        if action == 'throttle':
+            self.respond(handler, 429, {'code': 'too_many_requests'}, {'Retry-After': str(params['retry_after'])})
+            return
+        if action == 'error':
+            self.respond(handler, params['status'], {'code': 'injected_error'}, {})
+            return
+
+        if parsed.path.startswith(REMIKS_PREFIX):
+            status, data, headers = self.handle_remiks(parsed.path[len(REMIKS_PREFIX):], body)
+        else:
+            status, data, headers = self.handle_woocommerce(method, parsed.path, query)
+            if '_fields' in query and status == 200:
+                data = project_fields(data, query['_fields'].split(','))
+        self.respond(handler, status, data, headers, truncate=action == 'disconnect')
+
+    def respond(self, handler, status, data, headers, truncate=False):
+        out = json.dumps(data).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(out)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+
+        if truncate:
+            # Content-Length obećava celo telo, a konekcija se zatvara posle polovine
+            handler.wfile.write(out[:len(out) // 2])
+            handler.close_connection = True
+            return
+        handler.wfile.write(out)
+
+    def handle_woocommerce(self, method, path, query):
+        if path == WC_PREFIX + '/products':
+            if 'sku' in query:
+                product = self.products_by_sku.get(query['sku'])
+                return 200, [product] if product else [], {}
+
+            per_page = min(int(query.get('per_page', 10)), self.max_page_size)
+            page = int(query.get('page', 1))
+            total_pages = (len(self.products) + per_page - 1) // per_page
+            start = (page - 1) * per_page
+            headers = {'X-WP-Total': str(len(self.products)), 'X-WP-TotalPages': str(total_pages)}
+            return 200, self.products[start:start + per_page], headers
+
+        if path in (WC_PREFIX + '/products/categories', WC_PREFIX + '/products/tags'):
+            terms = self.terms[path.rsplit('/', 1)[-1]]
+            per_page = min(int(query.get('per_page', 10)), self.max_page_size)
+            start = (int(query.get('page', 1)) - 1) * per_page
+            return 200, terms[start:start + per_page], {'X-WP-Total': str(len(terms))}
+
+        match = _VARIATIONS_PATH.match(path)
+        if match:
+            # Kao WooCommerce: podrazumevano 10 varijanti po stranici
+            variations = self.variations.get(int(match.group(1)), [])
+            per_page = min(int(query.get('per_page', 10)), self.max_page_size)
+            start = (int(query.get('page', 1)) - 1) * per_page
+            return 200, variations[start:start + per_page], {'X-WP-Total': str(len(variations))}
+
+        match = _PRODUCT_PATH.match(path)
+        if match:
+            product = self.products_by_id.get(int(match.group(1)))
+            if product is None:
+                return 404, {'code': 'woocommerce_rest_product_invalid_id'}, {}
+            # PUT (meta_data remiks_synced) samo vraća proizvod - stand-in ne čuva izmene
+            return 200, product, {}
+
+        return 404, {'code': 'rest_no_route'}, {}
+
+    def handle_remiks(self, path, body):
+        if path == '/login':
+            return 200, {'token': make_jwt()}, {}
+
+        endpoint = path.strip('/')
+        if endpoint in self.received:
+            try:
+                items = json.loads(body or b'[]')
+            except ValueError:
+                return 400, {'errors': ['invalid json']}, {}
+            complete = sum(1 for item in items
+                           if set(item.get('stock') or {}) == self.expected_sizes.get(item.get('sku')))
+            with self.lock:
+                self.received[endpoint] += len(items)
+                self.received_complete[endpoint] += complete
+            return 200, {'errors': []}, {}
+
+        return 404, {'errors': ['not found']}, {}
+
+
+def _serve(port_queue, count, seed, latency, jitter, max_page_size, faults):
+    """Ulazna tačka procesa sa stand-in serverom - katalog se generiše u samom procesu"""
+    from benchmarks.catalog import generate_catalog, to_woocommerce
+
+    products, variations = to_woocommerce(generate_catalog(count, seed))
+    stand_in = StandInServer(products, variations, latency, jitter, max_page_size,
+                             faults=faults, fault_seed=seed).start()
+    port_queue.put(stand_in.server.server_port)
+    threading.Event().wait()
+
+
+class StandInProcess:
+    """StandInServer u zasebnom procesu - server ne troši CPU i GIL procesa koji se meri"""
+
+    def __init__(self, count, seed=42, latency=0.0, jitter=0.0, max_page_size=100, host='127.0.0.1',
+                 faults=None):
+        self.args = (count, seed, latency, jitter, max_page_size, faults)
+        self.host = host
+        self.port = None
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def wc_api_url(self):
+        return self.url + WC_PREFIX
+
+    def remiks_url(self, endpoint):
+        return f"{self.url}{REMIKS_PREFIX}/{endpoint}"
+
+    def start(self, timeout=600):
+        import multiprocessing
+
+        port_queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve, args=(port_queue,) + self.args, daemon=True)
+        self.process.start()
+        self.port = port_queue.get(timeout=timeout)
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def _control(self, action):
+        import requests
+
+        return requests.get(f"{self.url}{CONTROL_PREFIX}/{action}", timeout=10).json()
+
+    def stats(self):
+        return self._control('stats')
+
+    def reset_counters(self):
+        return self._control('reset')
@@ -0,0 +1,83 @@
+import importlib.util
+import json
+
+import pandas as pd
+
+FORMATS = ('parquet', 'csv')
+
+# Kolone payload-a koje se u Excel-u spajaju u string, a ovde idu u zasebne duge tabele
+NESTED_COLUMNS = ('stock', 'product_variations', 'images')
+
+
+def parquet_available():
+    return any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet'))
+
+
+def product_table(products, nested=NESTED_COLUMNS):
+    """Jedan red po proizvodu, bez ugnježdenih kolona (preostale liste/dict-ovi idu kao JSON string)"""
+    rows = []
+    for product in products:
+        row = {}
+        for key, value in product.items():
+            if key in nested:
+                continue
+            row[key] = json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def stock_table(products):
+    """Duga tabela zaliha: sku, size, warehouse, qty"""
+    rows = [(product.get('sku'), str(size), warehouse, qty)
+            for product in products
+            for size, warehouses in (product.get('stock') or {}).items()
+            for warehouse, qty in (warehouses or {}).items()]
+    df = pd.DataFrame(rows, columns=['sku', 'size', 'warehouse', 'qty'])
+    df['qty'] = pd.to_numeric(df['qty'], errors='coerce').astype('Int64')
+    df['size'] = df['size'].astype('category')
+    df['warehouse'] = df['warehouse'].astype('category')
+    return df
+
+
+def list_table(products, field, value_column):
+    """Duga tabela liste iz payload-a (slike, varijante): sku, position, vrednost"""
+    rows = [(product.get('sku'), position, str(value))
+            for product in products
+            for position, value in enumerate(product.get(field) or [], start=1)
+            if str(value).strip()]
+    df = pd.DataFrame(rows, columns=['sku', 'position', value_column])
+    df['position'] = df['position'].astype('int32')
+    return df
+
+
+def payload_tables(products):
+    """Tabele za WooCommerce -> Remiks payload: proizvodi, zalihe, slike i varijante"""
+    return {
+        'products': product_table(products),
+        'stock': stock_table(products),
+        'images': list_table(products, 'images', 'url'),
+        'variations': list_table(products, 'product_variations', 'variation'),
+    }
+
+
+def write_tables(tables, base_path, fmt='parquet'):
+    """Upisuje tabele kao <base_path>_<ime>.parquet ili .csv.gz - vraća listu putanja
+
+    Bez pyarrow/fastparquet Parquet prelazi na kompresovani CSV.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Nepoznat format: {fmt} (dozvoljeno: {', '.join(FORMATS)})")
+    if fmt == 'parquet' and not parquet_available():
+        print("⚠️  Parquet zahteva pyarrow (pip install pyarrow) - koristi se csv.gz")
+        fmt = 'csv'
+
+    paths = []
+    for name, df in tables.items():
+        if fmt == 'parquet':
+            path = f"{base_path}_{name}.parquet"
+            df.to_parquet(path, index=False)
+        else:
+            path = f"{base_path}_{name}.csv.gz"
+            df.to_csv(path, index=False, compression='gzip')
+        paths.append(path)
+    return paths
@@ -0,0 +1,264 @@
+import gzip
+import json
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urlparse
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CrawlFrontier:
+    """Deduplicirani red URL-ova i rezultati crawl-a u sqlite fajlu
+
+    Svaki URL ulazi jednom (bez #fragmenta). URL-ovi koji su bili u obradi kada je crawl
+    prekinut vraćaju se u red pri sledećem otvaranju, pa se crawl nastavlja gde je stao.
+    Za URL-ove iz sitemap-a pamti se lastmod poslednjeg scrape-a (schedule()).
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                seq INTEGER,
+                lastmod TEXT,
+                scraped_lastmod TEXT
+            );
+            CREATE INDEX IF NOT EXISTS frontier_status ON frontier (status, seq);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                scraped_at REAL NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(frontier)")}
+        with self.conn:
+            # Stanje iz verzije bez sitemap-a
+            for column in ('lastmod', 'scraped_lastmod'):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE frontier ADD COLUMN {column} TEXT")
+            self.conn.execute("UPDATE frontier SET status = ? WHERE status = ?", (PENDING, IN_PROGRESS))
+
+    @staticmethod
+    def normalize(url):
+        return urldefrag(url)[0]
+
+    def add(self, urls, kind):
+        """Dodaje URL-ove koji još nisu viđeni - vraća broj novih"""
+        rows = [(self.normalize(url), kind) for url in urls]
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, kind, seq) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM frontier))", rows)
+            return self.conn.total_changes - before
+
+    def schedule(self, lastmods, kind):
+        """Dodaje URL-ove sa lastmod-om i vraća u red one čiji se lastmod pomerio od poslednjeg scrape-a
+
+        lastmods mapira URL -> lastmod (ili None). URL bez lastmod-a se scrape-uje samo prvi put.
+        Vraća (broj novih, broj promenjenih).
+        """
+        rows = [(self.normalize(url), kind, lastmod) for url, lastmod in lastmods.items()]
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, kind, lastmod, seq) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM frontier))", rows)
+            new = self.conn.total_changes - before
+
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "UPDATE frontier SET lastmod = ?, status = ?, attempts = 0 "
+                "WHERE url = ? AND status IN (?, ?) AND ? IS NOT NULL "
+                "AND (scraped_lastmod IS NULL OR scraped_lastmod != ?)",
+                [(lastmod, PENDING, url, DONE, FAILED, lastmod, lastmod) for url, _, lastmod in rows])
+            changed = self.conn.total_changes - before
+        return new, changed
+
+    def claim(self, limit, kinds=None):
+        """Uzima do limit URL-ova iz reda (listing stranice prve) i označava ih kao u obradi
+
+        kinds ograničava vrste URL-ova (npr. samo 'product' za sitemap run) - ostali ostaju u redu.
+        """
+        kind_filter, params = '', ()
+        if kinds is not None:
+            kinds = tuple(kinds)
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params = kinds
+        with self.lock, self.conn:
+            rows = self.conn.execute(
+                f"SELECT url, kind FROM frontier WHERE status = ?{kind_filter} "
+                "ORDER BY kind = 'listing' DESC, seq LIMIT ?", (PENDING, *params, limit)).fetchall()
+            self.conn.executemany("UPDATE frontier SET status = ? WHERE url = ?",
+                                  [(IN_PROGRESS, url) for url, _ in rows])
+        return rows
+
+    def complete(self, url, result=None):
+        """Označava URL kao obrađen i odmah upisuje rezultat (ako postoji)"""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE frontier SET status = ?, scraped_lastmod = lastmod WHERE url = ?", (DONE, url))
+            if result is not None:
+                self.conn.execute("INSERT OR REPLACE INTO results (url, data, scraped_at) VALUES (?, ?, ?)",
+                                  (url, json.dumps(result, ensure_ascii=False), time.time()))
+
+    def fail(self, url):
+        """Vraća URL u red dok ne potroši max_attempts pokušaja"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET attempts = attempts + 1, "
+                "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END WHERE url = ?",
+                (self.max_attempts, FAILED, PENDING, url))
+
+    def reset(self):
+        """Briše red i rezultate - sledeći crawl kreće od početka"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM frontier")
+            self.conn.execute("DELETE FROM results")
+
+    def counts(self):
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall())
+
+    def results(self):
+        """Svi sačuvani rezultati redom kojim su URL-ovi otkriveni"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT r.data FROM results r LEFT JOIN frontier f ON f.url = r.url ORDER BY f.seq").fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def parse_sitemap(content):
+    """Vraća ('index' ili 'urlset', [(loc, lastmod)]) - prihvata i .xml.gz"""
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    root = ET.fromstring(content)
+    kind = 'index' if root.tag.rsplit('}', 1)[-1] == 'sitemapindex' else 'urlset'
+
+    entries = []
+    for node in root:
+        fields = {child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in node}
+        if fields.get('loc'):
+            entries.append((fields['loc'], fields.get('lastmod') or None))
+    return kind, entries
+
+
+def discover_sitemap_urls(fetch, sitemap_urls, include=None):
+    """Prolazi sitemap index-e i njihove sitemap-e i vraća {url: lastmod}
+
+    fetch(url) vraća bajtove ili None. Iz index-a se prate samo sitemap-i proizvoda
+    (WooCommerce/Yoast: 'product' u imenu), a ako takvih nema - svi. include(url)
+    odbacuje URL-ove koji nisu stranice proizvoda (npr. /prodavnica/ u sitemap-u proizvoda).
+    """
+    queue = list(sitemap_urls)
+    seen = set()
+    found = {}
+    while queue:
+        url = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+
+        content = fetch(url)
+        if not content:
+            continue
+        try:
+            kind, entries = parse_sitemap(content)
+        except (ET.ParseError, OSError) as e:
+            print(f"Neispravan sitemap {url}: {e}")
+            continue
+
+        if kind == 'index':
+            children = [loc for loc, _ in entries]
+            queue.extend([loc for loc in children if 'product' in loc] or children)
+        else:
+            for loc, lastmod in entries:
+                if include is None or include(loc):
+                    found[loc] = lastmod
+    return found
+
+
+class HostPoliteness:
+    """Najviše per_host istovremenih zahteva i najmanje delay sekundi između početaka zahteva ka istom hostu"""
+
+    def __init__(self, delay=0.5, per_host=2):
+        self.delay = delay
+        self.per_host = per_host
+        self.lock = threading.Lock()
+        self.hosts = {}  # host -> [semafor, najranije vreme sledećeg zahteva]
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            state = self.hosts.setdefault(host, [threading.BoundedSemaphore(self.per_host), 0.0])
+        state[0].acquire()
+
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, state[1])
+            state[1] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+        return host
+
+    def release(self, host):
+        self.hosts[host][0].release()
+
+
+def crawl(frontier, handlers, workers=4, progress_every=25):
+    """Obrađuje frontier dok ne ostane prazan
+
+    handlers mapira vrstu URL-a na funkciju handler(url) -> (uspeh, rezultat);
+    handler sam dodaje nove URL-ove u frontier (npr. paginaciju i proizvode).
+    Uzimaju se samo vrste za koje postoji handler - ostale čekaju run koji ih obrađuje.
+    """
+    in_flight = {}
+    finished = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            free = workers - len(in_flight)
+            if free > 0:
+                for url, kind in frontier.claim(free, handlers):
+                    in_flight[executor.submit(handlers[kind], url)] = url
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                try:
+                    ok, result = future.result()
+                except Exception as e:
+                    print(f"Error processing {url}: {e}")
+                    ok, result = False, None
+
+                if ok:
+                    frontier.complete(url, result)
+                else:
+                    frontier.fail(url)
+
+                finished += 1
+                if finished % progress_every == 0:
+                    counts = frontier.counts()
+                    print(f"Crawl: {counts.get(DONE, 0)} obrađeno, {counts.get(PENDING, 0)} u redu, "
+                          f"{counts.get(FAILED, 0)} neuspešno")
+
+    return frontier.counts()
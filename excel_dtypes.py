@@ -0,0 +1,65 @@
+import importlib.util
+
+import pandas as pd
+
+# Kolone sa malo različitih vrednosti koje se ponavljaju u svakom redu (red = SKU + veličina)
+CATEGORICAL_COLUMNS = (
+    'BRAND', 'CATEGORY', 'WAREHOUSE', 'VAT_SYMBOL', 'TYPE', 'SIZE', 'VARIATION', 'PACKING_TIME_TYPE',
+    'Jedinica mere', 'Zemlja proizvodnje', 'Poslovno ime uvoznika', 'Poslovno ime proizvođača',
+)
+# SKU se ponavlja jednom po veličini, EAN je jedinstven po redu
+STRING_COLUMNS = ('SKU', 'EAN')
+
+# Kategorija se isplati samo kada je različitih vrednosti bar duplo manje od redova
+MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_string_dtype():
+    """Arrow string dtype (jedan bafer za sve stringove kolone) ako je pyarrow instaliran"""
+    return 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else None
+
+
+def is_low_cardinality(series, max_ratio=MAX_UNIQUE_RATIO):
+    return len(series) > 0 and series.nunique(dropna=True) <= len(series) * max_ratio
+
+
+def compact_dataframe(df, categorical_columns=CATEGORICAL_COLUMNS, string_columns=STRING_COLUMNS,
+                      max_ratio=MAX_UNIQUE_RATIO):
+    """Pretvara ponovljene kolone u category, a SKU/EAN u kompaktne stringove
+
+    Vraća (df, izveštaj) - izveštaj je {kolona: (bajtova pre, bajtova posle, novi dtype)}
+    samo za promenjene kolone. Vrednosti ostaju iste (NaN ostaje NaN), menja se samo zapis.
+    """
+    string_dtype = compact_string_dtype()
+    report = {}
+
+    for column in df.columns:
+        if column not in categorical_columns and column not in string_columns:
+            continue
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+
+        if is_low_cardinality(series, max_ratio):
+            converted = series.astype('category')
+        elif (column in string_columns and string_dtype and pd.api.types.is_string_dtype(series.dtype)
+              and str(series.dtype) != string_dtype):
+            converted = series.astype(string_dtype)
+        else:
+            continue
+
+        report[column] = (int(series.memory_usage(index=False, deep=True)),
+                          int(converted.memory_usage(index=False, deep=True)), str(converted.dtype))
+        df[column] = converted
+
+    return df, report
+
+
+def print_memory_report(before_bytes, after_bytes, report):
+    """Ispis uštede memorije za analyze_excel_file"""
+    saved = before_bytes - after_bytes
+    percent = saved / before_bytes * 100 if before_bytes else 0
+    print(f"Memorija DataFrame-a: {before_bytes / 1024 ** 2:.2f} MB -> {after_bytes / 1024 ** 2:.2f} MB "
+          f"(ušteda {saved / 1024 ** 2:.2f} MB, {percent:.1f}%)")
+    for column, (before, after, dtype) in sorted(report.items(), key=lambda item: item[1][1] - item[1][0]):
+        print(f"  {column:<28} {before / 1024:>10.1f} KB -> {after / 1024:>8.1f} KB  ({dtype})")
@@ -0,0 +1,61 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+MAX_COLUMN_WIDTH = 50
+
+# Isti izgled zaglavlja kao pandas to_excel
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                        top=Side(style='thin'), bottom=Side(style='thin'))
+_HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='top')
+
+
+def column_widths(df, max_width=MAX_COLUMN_WIDTH):
+    """Širina svake kolone iz najduže string vrednosti (i zaglavlja) + 2, najviše max_width"""
+    widths = []
+    for column in df.columns:
+        longest = len(str(column))
+        if len(df):
+            # Prazne vrednosti mogu ostati NaN i posle astype(str) (string dtype)
+            longest = max(longest, int(df[column].astype(str).str.len().fillna(0).max()))
+        widths.append(min(longest + 2, max_width))
+    return widths
+
+
+def cell_value(value):
+    """Vrednosti koje openpyxl ne ume da upiše (liste, dict-ovi) idu kao tekst"""
+    if isinstance(value, (list, tuple, dict, set)):
+        return str(value)
+    return value
+
+
+def write_dataframe(df, path, sheet_name, max_width=MAX_COLUMN_WIDTH):
+    """Upisuje DataFrame u xlsx write-only openpyxl workbook-om
+
+    Širine kolona se računaju iz DataFrame-a pre upisa, a redovi se upisuju jedan po jedan
+    bez modela celog workbook-a u memoriji (nema naknadnog prolaza kroz ćelije).
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+
+    for index, width in enumerate(column_widths(df, max_width), start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+
+    header = []
+    for column in df.columns:
+        cell = WriteOnlyCell(worksheet, value=str(column))
+        cell.font = _HEADER_FONT
+        cell.border = _HEADER_BORDER
+        cell.alignment = _HEADER_ALIGNMENT
+        header.append(cell)
+    worksheet.append(header)
+
+    # NaN/None -> prazna ćelija, kao pandas to_excel
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        worksheet.append([cell_value(value) for value in row])
+
+    workbook.save(path)
+    return path
@@ -7,6 +7,11 @@ from requests.auth import HTTPBasicAuth
 import pandas as pd
 import argparse
 import sys
+from batch_sync import resolve_excel_paths, prepare_files_in_parallel, merge_products_by_sku
+from excel_dtypes import compact_dataframe, print_memory_report
+from http_session import create_session
+from pricing import PricingRules, frame_prices
+from sync_metrics import SyncMetrics, timed_run
 
 load_dotenv()
 
@@ -20,13 +25,25 @@ class ExcelToRemiks:
         self.remiks_url_login = os.getenv('remiks_url_login')
         self.remiks_url_product = os.getenv('remiks_url_product')
 
-    def read_excel_file(self, excel_file_path):
-        """Čita Excel fajl i vraća DataFrame - koristi samo sheet UPISATI"""
+        # Direktorijum za payload fajlove
+        self.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+        self.session = create_session()
+        self.metrics = SyncMetrics()
+        self.metrics.attach(self.session)
+
+    def read_excel_file(self, excel_file_path, compact=True):
+        """Čita Excel fajl i vraća DataFrame - koristi samo sheet UPISATI
+
+        compact=True pretvara ponovljene kolone (BRAND, SIZE, WAREHOUSE...) u category dtype.
+        """
         try:
             # Eksplicitno čita sheet "UPISATI"
             df = pd.read_excel(excel_file_path, sheet_name="UPISATI")
             print(f"Učitano {len(df)} redova iz sheet-a 'UPISATI'")
             print(f"Kolone: {list(df.columns)}")
+            if compact:
+                df, _ = compact_dataframe(df)
             return df
         except Exception as e:
             print(f"Greška pri čitanju Excel fajla (sheet UPISATI): {e}")
@@ -308,8 +325,10 @@ class ExcelToRemiks:
     def group_products_by_sku(self, df):
         """Grupira proizvode po SKU i priprema strukturu za Remiks"""
         products_dict = {}
+        # Cene za sve redove odjednom (pricing.py), a red ih uzima po poziciji
+        prices = frame_prices(df, rules=PricingRules.for_source('excel'))
 
-        for _, row in df.iterrows():
+        for position, (_, row) in enumerate(df.iterrows()):
             sku = str(self.safe_get_value(row, 'SKU', '')).strip()
             if not sku:
                 continue
@@ -338,8 +357,7 @@ class ExcelToRemiks:
 
                 # Dobija sve dostupne kolone
                 variation_type = str(self.safe_get_value(row, 'VARIATION', 'SIZE'))
-                retail_price = float(self.safe_get_value(row, 'RETAIL_PRICE', 0) or 0)
-                special_price = float(self.safe_get_value(row, 'SPECIAL_PRICE', 0) or retail_price)
+                net_retail_price, sale_price, invoice_price = prices[position]
                 vat_symbol = str(self.safe_get_value(row, 'VAT_SYMBOL', 'Đ'))
                 vat = float(self.safe_get_value(row, 'VAT', 20))
                 weight = float(self.safe_get_value(row, 'WEIGHT', 0.2))
@@ -370,15 +388,15 @@ class ExcelToRemiks:
                     'type': 'configurable' if str(
                         self.safe_get_value(row, 'TYPE', '')).lower() == 'configurabile' else 'simple',
                     'variation_type': variation_type,
-                    'net_retail_price': retail_price,
+                    'net_retail_price': net_retail_price,
                     'active': 1,
                     'brand': brand,
                     'category_code': category_code,
                     'product_category_name': product_category,
                     'product_variation': variation_type.lower() if variation_type else 'size',
                     'product_variations': [],
-                    'sale_price': special_price,
-                    'invoice_price': round(special_price * 0.8333 * 0.8, 2),
+                    'sale_price': sale_price,
+                    'invoice_price': invoice_price,
                     'weight': str(weight),
                     'vat': 20,
                     'vat_symbol': vat_symbol,
@@ -448,7 +466,7 @@ class ExcelToRemiks:
         }
 
         try:
-            response = requests.request("GET", self.remiks_url_login, headers=headers, data=payload)
+            response = self.session.request("GET", self.remiks_url_login, headers=headers, data=payload)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get('token')
@@ -470,7 +488,7 @@ class ExcelToRemiks:
         send_data = json.dumps(payload)
 
         try:
-            response = requests.request("POST", self.remiks_url_product, headers=headers, data=send_data)
+            response = self.session.request("POST", self.remiks_url_product, headers=headers, data=send_data)
             if response.status_code == 200:
                 data = response.json()
                 return data
@@ -494,9 +512,8 @@ class ExcelToRemiks:
     def save_json_payload(self, payload):
         """Čuva JSON payload u fajl - ista logika kao originalna skripta"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = os.path.join(script_dir, f'payload_excel_to_remiks_{timestamp}.json')
+            filename = os.path.join(self.output_dir, f'payload_excel_to_remiks_{timestamp}.json')
 
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(payload, f, indent=4, ensure_ascii=False)
@@ -505,26 +522,28 @@ class ExcelToRemiks:
         except Exception as e:
             print(f"Greška pri čuvanju JSON payload-a: {e}")
 
+    @timed_run('excel_products')
     def run_sync(self, excel_file_path=None):
-        """Glavna funkcija za pokretanje sinhronizacije iz Excel fajla"""
+        """Glavna funkcija za pokretanje sinhronizacije iz Excel fajla - vraća True ako je Remiks prihvatio payload"""
         print("Pokretanje Excel -> Remiks sinhronizacije...")
 
         if excel_file_path is None:
             excel_file_path = self.select_excel_file()
             if not excel_file_path:
-                return
+                return False
 
         # Proverava da li fajl postoji
         if not os.path.exists(excel_file_path):
             print(f"Excel fajl nije pronađen: {excel_file_path}")
-            return
+            return False
 
         # Priprema podatke
-        payload, product_skus = self.prepare_remiks_data(excel_file_path)
+        with self.metrics.stage('read_transform'):
+            payload, product_skus = self.prepare_remiks_data(excel_file_path)
 
         if not payload:
             print("Nema proizvoda za sinhronizaciju")
-            return
+            return False
 
         print(f"Pripremljeno {len(payload)} proizvoda za slanje")
 
@@ -542,20 +561,28 @@ class ExcelToRemiks:
             print(f"Stock: {sample['stock']}")
             print(f"Images: {'DA' if 'images' in sample else 'NEMA'}")
 
+        return self.upload_payload(payload)
+
+    def upload_payload(self, payload):
+        """Čuva payload, dobija JWT token i šalje sve proizvode u jednom zahtevu - vraća True ako je uspelo"""
         # Čuva payload
-        self.save_json_payload(payload)
+        with self.metrics.stage('json_dump'):
+            self.save_json_payload(payload)
 
         # Dobija JWT token
-        jwt_token = self.get_jwt_token()
+        with self.metrics.stage('login'):
+            jwt_token = self.get_jwt_token()
         if not jwt_token:
             print("Nije moguće dobiti JWT token")
-            return
+            return False
 
         # Šalje podatke na remiks
-        response = self.send_request_to_remiks(payload, jwt_token)
+        with self.metrics.stage('upload'):
+            response = self.send_request_to_remiks(payload, jwt_token)
 
+        success = bool(response) and not response.get('errors', [])
         if response:
-            if not response.get('errors', []):
+            if success:
                 print("Uspešno poslano na remiks servis!")
             else:
                 print("Remiks servis vratio greške:")
@@ -564,6 +591,28 @@ class ExcelToRemiks:
                     print(f"  - {error}")
         else:
             print("Greška pri slanju na remiks servis")
+        return success
+
+    @timed_run('excel_products_batch')
+    def run_batch_sync(self, excel_paths, workers=None):
+        """Sinhronizuje više Excel fajlova odjednom - paralelna obrada, jedan login i jedan upload"""
+        print(f"Pokretanje batch Excel -> Remiks sinhronizacije za {len(excel_paths)} fajlova...")
+
+        with self.metrics.stage('prepare_files'):
+            results = prepare_files_in_parallel(prepare_products_from_file, excel_paths, workers)
+        for excel_path, products in results:
+            print(f"  {os.path.basename(excel_path)}: {len(products)} proizvoda")
+
+        with self.metrics.stage('merge'):
+            payload, duplicates = merge_products_by_sku(results)
+
+        if not payload:
+            print("Nema proizvoda za sinhronizaciju")
+            return False
+
+        print(f"Spojeno {len(payload)} jedinstvenih proizvoda (duplikata SKU između fajlova: {duplicates})")
+
+        return self.upload_payload(payload)
 
     def find_excel_files_in_data_folder(self):
         """Pronalazi sve Excel fajlove u 'podaci' folderu"""
@@ -617,13 +666,18 @@ class ExcelToRemiks:
             if not excel_file_path:
                 return
 
-        df = self.read_excel_file(excel_file_path)
+        df = self.read_excel_file(excel_file_path, compact=False)
         if df is None:
             return
 
         print(f"Ukupno redova: {len(df)}")
         print(f"Ukupno kolona: {len(df.columns)}")
 
+        # Ponovljene kolone kao category - ostatak analize (nunique, unique) radi nad kompaktnim kolonama
+        memory_before = int(df.memory_usage(index=False, deep=True).sum())
+        df, memory_report = compact_dataframe(df)
+        print_memory_report(memory_before, int(df.memory_usage(index=False, deep=True).sum()), memory_report)
+
         # Analizira dostupne kolone
         available_columns = list(df.columns)
         print(f"Dostupne kolone: {available_columns}")
@@ -792,13 +846,22 @@ class ExcelToRemiks:
                 print(json.dumps(sample_product, indent=2, ensure_ascii=False))
 
 
+def prepare_products_from_file(excel_file_path):
+    """Worker za batch mod - priprema proizvode iz jednog fajla u zasebnom procesu"""
+    products_array, _ = ExcelToRemiks().prepare_remiks_data(excel_file_path)
+    return excel_file_path, products_array
+
+
 if __name__ == "__main__":
     # Kreiranje argument parser-a
     parser = argparse.ArgumentParser(description='Excel to Remiks Sync Script - Improved Version')
-    parser.add_argument('--file', '-f', type=str, help='Putanja do Excel fajla')
+    parser.add_argument('--file', '-f', type=str,
+                        help='Putanja do Excel fajla, direktorijuma ili glob pattern (npr. "podaci/*.xlsx")')
     parser.add_argument('--sync', '-s', action='store_true', help='Pokreni sinhronizaciju direktno')
     parser.add_argument('--analyze', '-a', action='store_true', help='Analiziraj Excel fajl')
     parser.add_argument('--compare', '-c', action='store_true', help='Poredi sa originalnom implementacijom')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Broj procesa za batch obradu (default: broj CPU jezgara)')
 
     args = parser.parse_args()
 
@@ -821,24 +884,27 @@ if __name__ == "__main__":
                 print(f"Default fajl {default_path} nije pronađen")
                 sys.exit(1)
 
-        # Proverava da li fajl postoji
-        if not os.path.exists(excel_file):
+        # Fajl, direktorijum ili glob pattern
+        excel_files = resolve_excel_paths(excel_file)
+        if not excel_files:
             print(f"Fajl nije pronađen: {excel_file}")
             sys.exit(1)
 
-        if args.sync:
-            print(f"Pokretanje sinhronizacije sa fajlom: {excel_file}")
-            sync.run_sync(excel_file)
+        if args.sync or not (args.analyze or args.compare):
+            if len(excel_files) > 1:
+                # Batch mod - svi fajlovi se šalju kroz jedan login i jedan zahtev
+                sync.run_batch_sync(excel_files, workers=args.workers)
+            else:
+                print(f"Pokretanje sinhronizacije sa fajlom: {excel_files[0]}")
+                sync.run_sync(excel_files[0])
         elif args.analyze:
-            print(f"Analiza fajla: {excel_file}")
-            sync.analyze_excel_file(excel_file)
-        elif args.compare:
-            print(f"Poređenje implementacije za fajl: {excel_file}")
-            sync.compare_with_original_implementation(excel_file)
+            for excel_file in excel_files:
+                print(f"Analiza fajla: {excel_file}")
+                sync.analyze_excel_file(excel_file)
         else:
-            # Ako je samo specificiran fajl bez akcije, pokreni sync
-            print(f"Pokretanje sinhronizacije sa fajlom: {excel_file}")
-            sync.run_sync(excel_file)
+            for excel_file in excel_files:
+                print(f"Poređenje implementacije za fajl: {excel_file}")
+                sync.compare_with_original_implementation(excel_file)
     else:
         # Interaktivni meni ako nema argumenata
         print("=== EXCEL TO REMIKS SYNC - IMPROVED VERSION ===")
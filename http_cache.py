@@ -0,0 +1,181 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+# Zaglavlja koja više ne važe kada se telo čuva već dekodirano
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'set-cookie', 'connection'}
+_CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+def cache_key(request):
+    """URL sa query parametrima + hash Authorization zaglavlja (različiti kredencijali se ne mešaju)"""
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return request.url
+    return f"{request.url} {hashlib.sha256(authorization.encode('utf-8')).hexdigest()[:16]}"
+
+
+class CachingAdapter(HTTPAdapter):
+    """Disk keš GET odgovora sa validatorima - revalidacija preko If-None-Match/If-Modified-Since
+
+    Čuvaju se samo odgovori koji imaju ETag ili Last-Modified. Sledeći GET istog URL-a šalje
+    uslovni zahtev; na 304 telo se služi sa diska kao 200 (response.from_cache = True).
+    Keš je ograničen na max_bytes - kada ga pređe, brišu se najdavnije korišćeni unosi.
+    Stream zahtevi, GET sa telom i zahtevi sa sopstvenim uslovnim zaglavljima idu mimo keša, a
+    PUT/POST/DELETE na URL briše njegov unos. Odgovori sa no-store ili private se ne čuvaju.
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'http_cache.sqlite'), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                status INTEGER NOT NULL,
+                reason TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            DROP INDEX IF EXISTS responses_access;
+            -- LRU redosled sa ključem i veličinom u indeksu - eviction ne čita BLOB stranice
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access, key, size);
+        """)
+        # Ukupna veličina se računa jednom i dalje vodi pri upisu/brisanju
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        def forward():
+            return super(CachingAdapter, self).send(request, stream=stream, timeout=timeout, verify=verify,
+                                                    cert=cert, proxies=proxies)
+
+        if request.method != 'GET':
+            if request.method in ('PUT', 'POST', 'PATCH', 'DELETE'):
+                self.invalidate(request)
+            return forward()
+        # Ključ je samo URL - GET sa telom bi delio unos sa zahtevom koji šalje drugo telo
+        if stream or request.body or any(name in request.headers for name in _CONDITIONAL_HEADERS):
+            return forward()
+
+        key = cache_key(request)
+        entry = self.lookup(key)
+        if entry:
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = forward()
+
+        if response.status_code == 304 and entry:
+            response.close()
+            with self.lock:
+                self.stats['hits'] += 1
+                self.stats['bytes_saved'] += entry['size']
+            cached = self.build_cached_response(request, entry, response)
+            cached.from_cache = True
+            return cached
+
+        with self.lock:
+            self.stats['misses'] += 1
+        response.from_cache = False
+        if response.status_code == 200 and self.cacheable(response):
+            self.store(key, response)
+        return response
+
+    @staticmethod
+    def cacheable(response):
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control or 'private' in cache_control:
+            return False
+        return bool(response.headers.get('ETag') or response.headers.get('Last-Modified'))
+
+    def lookup(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, status, reason, headers, body, size FROM responses WHERE key = ?",
+                (key,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, status, reason, headers, body, size = row
+        return {'key': key, 'etag': etag, 'last_modified': last_modified, 'status': status, 'reason': reason,
+                'headers': json.loads(headers), 'body': body, 'size': size}
+
+    def store(self, key, response):
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+        with self.lock, self.conn:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, status, reason, headers, body, size, "
+                "last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.headers.get('ETag'), response.headers.get('Last-Modified'), response.status_code,
+                 response.reason, json.dumps(headers), content, len(content), time.time()))
+            self.total_bytes += len(content) - (previous[0] if previous else 0)
+            self.stats['stored'] += 1
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """LRU: briše najdavnije korišćene unose dok keš ne stane u max_bytes (poziva se pod lock-om)"""
+        evicted = []
+        total = self.total_bytes
+        for key, size in self.conn.execute(
+                "SELECT key, size FROM responses INDEXED BY responses_lru ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.stats['evicted'] += len(evicted)
+        self.total_bytes = total
+
+    def invalidate(self, request):
+        where = "key = ? OR substr(key, 1, ?) = ?"
+        params = (request.url, len(request.url) + 1, request.url + ' ')
+        with self.lock, self.conn:
+            removed = self.conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM responses WHERE {where}",
+                                        params).fetchone()[0]
+            self.conn.execute(f"DELETE FROM responses WHERE {where}", params)
+            self.total_bytes -= removed
+
+    def build_cached_response(self, request, entry, not_modified):
+        # 304 može da donese osvežene validatore - čuvaju se za sledeću revalidaciju
+        headers = dict(entry['headers'])
+        for name in ('ETag', 'Last-Modified', 'Date', 'Cache-Control', 'Expires'):
+            if not_modified.headers.get(name):
+                headers[name] = not_modified.headers[name]
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE responses SET last_access = ?, headers = ?, etag = ?, last_modified = ? WHERE key = ?",
+                (time.time(), json.dumps(headers), headers.get('ETag'), headers.get('Last-Modified'), entry['key']))
+
+        headers['Content-Length'] = str(entry['size'])
+        raw = HTTPResponse(body=io.BytesIO(entry['body']), headers=headers, status=entry['status'],
+                           reason=entry['reason'], preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+
+def mount_cache(session, cache_dir, max_bytes=200 * 1024 * 1024):
+    """Preusmerava sve http/https zahteve sesije kroz disk keš"""
+    adapter = CachingAdapter(cache_dir, max_bytes)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
@@ -0,0 +1,228 @@
+import atexit
+import base64
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# Zaglavlja koja više ne važe kada se telo čuva već dekodirano
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'set-cookie', 'connection'}
+# Token iz login odgovora se u kaseti zamenjuje ovom vrednošću (replay ne šalje token nikome)
+TOKEN_PLACEHOLDER = 'cassette-token'
+_TOKEN_FIELDS = ('token', 'refresh_token')
+
+
+def body_hash(body, salt):
+    """HMAC-sha256 tela zahteva sa solju kasete - samo telo se ne čuva"""
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if not isinstance(body, bytes):
+        return None  # generator / fajl - ne koristi se za poklapanje
+    return hmac.new(salt.encode('ascii'), body, hashlib.sha256).hexdigest()
+
+
+def redact_token(content):
+    """Login odgovor ({"token": ...}) -> (isti JSON sa TOKEN_PLACEHOLDER, True); ostali odgovori se ne menjaju"""
+    if b'token' not in content:
+        return content, False
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content, False
+    if not isinstance(data, dict) or not any(isinstance(data.get(field), str) for field in _TOKEN_FIELDS):
+        return content, False
+    for field in _TOKEN_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = TOKEN_PLACEHOLDER
+    return json.dumps(data).encode('utf-8'), True
+
+
+class CassetteRecorder:
+    """Jedan fajl kasete za sve sesije u procesu koje snimaju na istu putanju
+
+    Daemon (products + stock) ili webhook sa sync-om otvaraju više sesija; svaka bi
+    sa sopstvenim gzip.open(..., 'wt') skratila kasetu ostalih. Fajl se zatvara kada
+    ga otpusti poslednji adapter, a ponovno otvaranje u istom procesu dopisuje ('at').
+    salt je nasumičan po kaseti, pa se hash tela ne može porediti sa poznatim vrednostima.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.salt = secrets.token_hex(16)
+        self.lock = threading.Lock()
+        self.users = 0
+        self.recorded = 0
+        self.file = None
+        self.opened = False
+
+    def acquire(self):
+        with self.lock:
+            self.users += 1
+
+    def write(self, interaction):
+        with self.lock:
+            if self.file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self.file = gzip.open(self.path, 'at' if self.opened else 'wt', encoding='utf-8')
+                if not self.opened:
+                    atexit.register(self.close)
+                self.opened = True
+            self.file.write(json.dumps(interaction, ensure_ascii=False) + '\n')
+            self.recorded += 1
+
+    def release(self):
+        with self.lock:
+            self.users = max(self.users - 1, 0)
+            if self.users:
+                return
+        self.close()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                print(f"Kaseta sačuvana: {self.path} ({self.recorded} zahteva)")
+
+
+_RECORDERS = {}
+_RECORDERS_LOCK = threading.Lock()
+
+
+def shared_recorder(path):
+    """CassetteRecorder za putanju - isti objekat za sve sesije u procesu"""
+    key = os.path.abspath(path)
+    with _RECORDERS_LOCK:
+        if key not in _RECORDERS:
+            _RECORDERS[key] = CassetteRecorder(path)
+        return _RECORDERS[key]
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Snima sve HTTP odgovore u gz JSON lines kasetu ili ih pušta sa diska
+
+    U replay modu zahtev se poklapa po metodi i URL-u (sa query parametrima);
+    ako isti zahtev postoji više puta, odgovori se vraćaju redom kojim su snimljeni.
+    Telo zahteva (npr. Remiks payload) služi samo da se izabere tačan snimak ako
+    postoji - promenjen payload posle izmene mapiranja i dalje dobija odgovor.
+    Login se snima bez hash-a tela (lozinka) i sa TOKEN_PLACEHOLDER umesto JWT tokena.
+    Sa simulate_latency=True replay čeka onoliko koliko je trajao originalni zahtev.
+    """
+
+    def __init__(self, path, mode=REPLAY, simulate_latency=False, **kwargs):
+        super().__init__(**kwargs)
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Nepoznat mod kasete: {mode}")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.lock = threading.Lock()
+        self.recorder = None
+        self.interactions = defaultdict(list)  # (metoda, url) -> neiskorišćeni snimci
+
+        if mode == REPLAY:
+            self.load()
+        else:
+            self.recorder = shared_recorder(path)
+            self.recorder.acquire()
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self.interactions[(interaction['method'], interaction['url'])].append(interaction)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.mode == RECORD:
+            return self.record(request, stream, timeout, verify, cert, proxies)
+        return self.replay(request)
+
+    def record(self, request, stream, timeout, verify, cert, proxies):
+        started = time.perf_counter()
+        response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        content = response.content  # čita i stream odgovore; requests ih posle služi iz memorije
+        elapsed = time.perf_counter() - started
+
+        content, is_login = redact_token(content)
+        salt = self.recorder.salt
+        interaction = {
+            'method': request.method,
+            'url': request.url,
+            'body_salt': salt,
+            'body_hmac': None if is_login else body_hash(request.body, salt),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in _DROPPED_HEADERS},
+            'body': base64.b64encode(content).decode('ascii'),
+            'elapsed': round(elapsed, 4),
+        }
+
+        self.recorder.write(interaction)
+        return response
+
+    def replay(self, request):
+        interaction = self.take(request)
+        if interaction is None:
+            raise requests.ConnectionError(f"Kaseta {self.path} nema odgovor za {request.method} {request.url}",
+                                           request=request)
+
+        if self.simulate_latency:
+            time.sleep(interaction['elapsed'])
+
+        content = base64.b64decode(interaction['body'])
+        headers = dict(interaction['headers'])
+        headers['Content-Length'] = str(len(content))
+        raw = HTTPResponse(body=io.BytesIO(content), headers=headers, status=interaction['status'],
+                           reason=interaction.get('reason'), preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+    def take(self, request):
+        """Uzima sledeći snimak za zahtev - prednost ima snimak sa istim telom"""
+        with self.lock:
+            candidates = self.interactions.get((request.method, request.url))
+            if not candidates:
+                return None
+
+            # Snimci jedne kasete dele salt - hash tela se računa jednom po soli
+            wanted = {}
+            for c in candidates:
+                if c.get('body_salt') and c['body_salt'] not in wanted:
+                    wanted[c['body_salt']] = body_hash(request.body, c['body_salt'])
+            index = next((i for i, c in enumerate(candidates)
+                          if c.get('body_hmac') and c['body_hmac'] == wanted.get(c.get('body_salt'))), 0)
+            # Poslednji snimak ostaje za ponovljene zahteve (npr. retry ili drugi run u daemon-u)
+            if len(candidates) == 1:
+                return candidates[0]
+            return candidates.pop(index)
+
+    def close(self):
+        with self.lock:
+            recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.release()
+        super().close()
+
+
+def mount_cassette(session, path, mode=REPLAY, simulate_latency=False):
+    """Preusmerava sve http/https zahteve sesije kroz kasetu"""
+    adapter = CassetteAdapter(path, mode, simulate_latency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
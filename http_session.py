@@ -0,0 +1,73 @@
+import base64
+import json
+import os
+import time
+
+import requests
+
+
+def create_session():
+    """Kreira requests.Session - keep-alive konekcije se koriste ponovo između zahteva
+
+    Ako je podešen HTTP_CASSETTE, svi zahtevi idu kroz kasetu:
+    HTTP_CASSETTE_MODE=record snima odgovore, replay (default) ih pušta sa diska,
+    a HTTP_CASSETTE_LATENCY=1 u replay modu čeka originalno trajanje zahteva.
+    Inače, ako je podešen HTTP_CACHE_DIR, GET odgovori sa validatorima se keširaju na disku
+    (HTTP_CACHE_MAX_MB, default 200) i revalidiraju uslovnim zahtevima.
+    """
+    session = requests.Session()
+
+    cassette_path = os.getenv('HTTP_CASSETTE')
+    if cassette_path:
+        from http_cassette import mount_cassette
+        mount_cassette(session, cassette_path,
+                       mode=os.getenv('HTTP_CASSETTE_MODE', 'replay'),
+                       simulate_latency=os.getenv('HTTP_CASSETTE_LATENCY') == '1')
+        return session
+
+    cache_dir = os.getenv('HTTP_CACHE_DIR')
+    if cache_dir:
+        from http_cache import mount_cache
+        mount_cache(session, cache_dir, max_bytes=int(float(os.getenv('HTTP_CACHE_MAX_MB', '200')) * 1024 * 1024))
+    return session
+
+
+def decode_jwt_expiry(token):
+    """Vraća exp (unix timestamp) iz JWT payload-a ili None ako ga nije moguće pročitati"""
+    try:
+        payload_part = token.split('.')[1]
+        # JWT koristi base64url bez paddinga
+        payload_part += '=' * (-len(payload_part) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_part))
+        return float(payload['exp'])
+    except Exception:
+        return None
+
+
+class JwtTokenCache:
+    """Čuva JWT token u memoriji i obnavlja ga tek kada istekne
+
+    Ako token nema exp polje, koristi se fallback_ttl od trenutka dobijanja tokena.
+    """
+
+    def __init__(self, fetch_token, fallback_ttl=600, leeway=60):
+        self.fetch_token = fetch_token
+        self.fallback_ttl = fallback_ttl
+        self.leeway = leeway
+        self.token = None
+        self.expires_at = 0
+
+    def get(self):
+        """Vraća važeći token - novi login samo ako keširani ne postoji ili ističe"""
+        if self.token and time.time() < self.expires_at - self.leeway:
+            return self.token
+
+        self.token = self.fetch_token()
+        if self.token:
+            self.expires_at = decode_jwt_expiry(self.token) or time.time() + self.fallback_ttl
+        return self.token
+
+    def invalidate(self):
+        """Briše keširani token (npr. posle neuspešnog slanja)"""
+        self.token = None
+        self.expires_at = 0
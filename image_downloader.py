@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_session import create_session
+
+MANIFEST_NAME = '.image_manifest.json'
+STORE_DIR = '.store'
+INDEX_NAME = 'image_index.json'
+
+
+def link_file(source, destination):
+    """Postavlja destination kao hard link na source - symlink ili kopija ako hard link nije moguć"""
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return
+    folder = os.path.dirname(destination) or '.'
+    os.makedirs(folder, exist_ok=True)
+
+    tmp_path = destination + '.link'
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        try:
+            os.symlink(os.path.relpath(source, folder), tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ImageDownloader:
+    """Paralelno preuzimanje slika u content-addressed store sa manifestom za ponovne run-ove
+
+    Svaka slika se čuva jednom, pod sha256 sadržaja u .store/, a folderi proizvoda dobijaju
+    hard linkove na nju - isti URL se preuzima jednom po run-u, a isti bajtovi sa različitih
+    URL-ova zauzimaju disk jednom. Telo se upisuje u delovima u .part fajl pa se preimenuje.
+    Manifest pamti URL -> ETag/Last-Modified/veličina/sha256; sledeći run šalje uslovni zahtev
+    i za 304 ne preuzima ništa (sa revalidate=False poznati URL-ovi se preskaču bez zahteva).
+    image_index.json mapira SKU -> listu hash-eva slika, pa se vidi kome su se slike promenile.
+    """
+
+    def __init__(self, download_folder, session=None, workers=8, per_host=4, revalidate=True, timeout=(5, 30),
+                 chunk_size=64 * 1024, save_every=50):
+        self.download_folder = download_folder
+        self.workers = workers
+        self.per_host = per_host
+        self.revalidate = revalidate
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.save_every = save_every
+        self.session = session or create_session()
+        self.widen_connection_pool()
+
+        self.store_dir = os.path.join(download_folder, STORE_DIR)
+        self.manifest_path = os.path.join(download_folder, MANIFEST_NAME)
+        self.index_path = os.path.join(download_folder, INDEX_NAME)
+        self.manifest = self.load_json(self.manifest_path)
+        self.lock = threading.Lock()
+        self.host_limits = {}
+        self.completed_since_save = 0
+
+    def widen_connection_pool(self):
+        """Podrazumevani pool drži 10 konekcija po hostu - proširuje se na broj niti"""
+        for prefix in ('http://', 'https://'):
+            # Kaseta (HTTP_CASSETTE) ostaje montirana - ona ne drži konekcije
+            if type(self.session.get_adapter(prefix)) is HTTPAdapter:
+                self.session.mount(prefix, HTTPAdapter(pool_maxsize=max(self.workers, 10)))
+
+    @staticmethod
+    def load_json(path):
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        with self.lock:
+            data = dict(self.manifest)
+            self.completed_since_save = 0
+        os.makedirs(self.download_folder, exist_ok=True)
+        write_json(self.manifest_path, data)
+
+    def host_limit(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_limits[host]
+
+    def blob_path(self, digest, url):
+        ext = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
+        return os.path.join(self.store_dir, digest[:2], digest + ext)
+
+    def known_blob(self, url):
+        """Putanja sačuvane slike za URL iz manifesta ili None ako je nema"""
+        entry = self.manifest.get(url)
+        if not entry or not entry.get('sha256'):
+            return None
+        path = self.blob_path(entry['sha256'], url)
+        if not os.path.exists(path) or os.path.getsize(path) != entry.get('size'):
+            return None
+        return path
+
+    def download_all(self, jobs):
+        """Preuzima listu (url, putanja[, sku]) i vraća statistiku run-a
+
+        Svaki URL se preuzima jednom i linkuje na sve svoje putanje.
+        """
+        stats = {'downloaded': 0, 'not_modified': 0, 'skipped': 0, 'failed': 0, 'bytes': 0,
+                 'deduplicated': 0, 'changed_skus': []}
+        if not jobs:
+            return stats
+
+        paths_by_url = {}
+        urls_by_sku = {}
+        for job in jobs:
+            url, path = job[0], job[1]
+            paths_by_url.setdefault(url, []).append(path)
+            if len(job) > 2 and job[2]:
+                urls_by_sku.setdefault(job[2], []).append(url)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self.download, url, paths): url for url, paths in paths_by_url.items()}
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        status, size, deduplicated = future.result()
+                    except Exception as e:
+                        stats['failed'] += 1
+                        print(f"Error downloading {url}: {e}")
+                        continue
+
+                    stats[status] += 1
+                    stats['bytes'] += size
+                    stats['deduplicated'] += deduplicated
+                    if status == 'downloaded':
+                        print(f"Downloaded: {url}")
+
+                    if self.completed_since_save >= self.save_every:
+                        self.save_manifest()
+        finally:
+            # Manifest se čuva i kada se run prekine - sledeći run nastavlja odatle
+            self.save_manifest()
+
+        if urls_by_sku:
+            stats['changed_skus'] = self.update_index(urls_by_sku)
+
+        print(f"Slike: {stats['downloaded']} preuzeto ({stats['deduplicated']} već u store-u), "
+              f"{stats['not_modified']} nepromenjeno, {stats['skipped']} preskočeno, {stats['failed']} grešaka "
+              f"({stats['bytes'] / 1024 / 1024:.1f} MB), {len(paths_by_url)} jedinstvenih URL-ova za {len(jobs)} slika")
+        if urls_by_sku:
+            print(f"Promenjene slike za {len(stats['changed_skus'])} od {len(urls_by_sku)} SKU")
+        return stats
+
+    def update_index(self, urls_by_sku):
+        """Upisuje SKU -> hash-evi slika i vraća SKU čije su se slike promenile od prošlog run-a"""
+        previous = self.load_json(self.index_path)
+        index = dict(previous)
+        changed = []
+        for sku, urls in urls_by_sku.items():
+            hashes = [self.manifest[url]['sha256'] for url in urls if self.manifest.get(url, {}).get('sha256')]
+            if previous.get(sku) != hashes:
+                changed.append(sku)
+            index[sku] = hashes
+        write_json(self.index_path, index)
+        return changed
+
+    def download(self, url, paths):
+        """Preuzima jednu sliku i linkuje je na sve putanje - vraća (status, broj bajtova, deduplicirano)"""
+        blob = self.known_blob(url)
+        if blob and not self.revalidate:
+            self.link_all(blob, paths)
+            return 'skipped', 0, 0
+
+        headers = {}
+        if blob:
+            entry = self.manifest[url]
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with self.host_limit(url):
+            response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+            try:
+                if response.status_code == 304 and blob:
+                    self.link_all(blob, paths)
+                    return 'not_modified', 0, 0
+                response.raise_for_status()
+                digest, size, deduplicated = self.store(url, response)
+            finally:
+                response.close()
+
+        with self.lock:
+            self.manifest[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': size,
+                'sha256': digest,
+            }
+            self.completed_since_save += 1
+        self.link_all(self.blob_path(digest, url), paths)
+        return 'downloaded', size, deduplicated
+
+    def store(self, url, response):
+        """Upisuje telo odgovora u store pod sha256 sadržaja - vraća (hash, veličina, deduplicirano)"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        fd, part_path = tempfile.mkstemp(suffix='.part', dir=self.store_dir)
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    size += len(chunk)
+
+            expected = response.headers.get('Content-Length')
+            if expected is not None and 'Content-Encoding' not in response.headers and int(expected) != size:
+                raise requests.ConnectionError(f"nepotpun odgovor ({size} od {expected} bajtova)")
+
+            digest = sha256.hexdigest()
+            blob = self.blob_path(digest, url)
+            if os.path.exists(blob):
+                os.remove(part_path)
+                return digest, size, 1
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.chmod(part_path, 0o644)  # mkstemp pravi fajl samo za vlasnika
+            os.replace(part_path, blob)
+            return digest, size, 0
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    @staticmethod
+    def link_all(blob, paths):
+        for path in paths:
+            link_file(blob, path)
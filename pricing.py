@@ -0,0 +1,106 @@
+import math
+import os
+
+import numpy as np
+
+DEFAULT_VAT = 20.0
+DEFAULT_INVOICE_FACTOR = 0.8
+DEFAULT_DECIMALS = 2
+
+# Pravila po izvoru podataka koja odstupaju od podrazumevanih - menjaju se sa PRICE_<IZVOR>_<PRAVILO>
+SOURCE_DEFAULTS = {
+    'excel': {},
+    # Informix logika: net_retail_price zaokružen na ceo dinar
+    'excel_stock': {'net_decimals': 0},
+    # Faktor koji WooCommerce sync šalje Remiks-u (0.8333 * 0.82) dok se ne potvrdi zajednički
+    'woocommerce': {'invoice_factor': 0.82},
+}
+
+
+class PricingRules:
+    """PDV, faktor nabavne cene i zaokruživanje
+
+    Podrazumevane vrednosti se mogu promeniti sa PRICE_VAT, PRICE_INVOICE_FACTOR, PRICE_DECIMALS
+    i PRICE_NET_DECIMALS; for_source() dodaje pravila izvora (SOURCE_DEFAULTS i PRICE_<IZVOR>_*).
+    """
+
+    def __init__(self, vat=None, invoice_factor=None, decimals=None, net_decimals=None, source=None):
+        defaults = SOURCE_DEFAULTS.get(source, {}) if source else {}
+
+        def setting(name, value, default):
+            if value is not None:
+                return value
+            if source and os.getenv(f'PRICE_{source.upper()}_{name.upper()}') is not None:
+                return os.getenv(f'PRICE_{source.upper()}_{name.upper()}')
+            if name in defaults:
+                return defaults[name]
+            return os.getenv(f'PRICE_{name.upper()}', default)
+
+        self.source = source
+        self.vat = float(setting('vat', vat, DEFAULT_VAT))
+        self.invoice_factor = float(setting('invoice_factor', invoice_factor, DEFAULT_INVOICE_FACTOR))
+        self.decimals = int(setting('decimals', decimals, DEFAULT_DECIMALS))
+        self.net_decimals = int(setting('net_decimals', net_decimals, self.decimals))
+
+    @classmethod
+    def for_source(cls, source):
+        """Pravila za 'excel', 'excel_stock' ili 'woocommerce'"""
+        if source not in SOURCE_DEFAULTS:
+            raise ValueError(f"Nepoznat izvor cena: {source} (dozvoljeno: {', '.join(SOURCE_DEFAULTS)})")
+        return cls(source=source)
+
+
+def to_float(value):
+    """Cena iz Excel-a ili WooCommerce-a ('1990', 1990, '', None, NaN) -> float ili NaN"""
+    if value is None or value == '':
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def as_float_array(values):
+    """Kolona, lista ili skalar -> float niz; prazne i neispravne vrednosti postaju NaN"""
+    array = np.asarray(values)
+    if array.dtype.kind in 'biuf':
+        return array.astype(float)
+    return np.array([to_float(value) for value in array.ravel()], dtype=float).reshape(array.shape)
+
+
+def compute_prices(retail, special=None, vat=None, rules=None):
+    """Računa (net_retail_price, sale_price, invoice_price) za celu kolonu odjednom
+
+    - net_retail_price = retail (prazno -> 0), zaokružen na rules.net_decimals
+    - sale_price = special ako je > 0, inače retail
+    - invoice_price = sale_price / (1 + PDV/100) * invoice_factor
+    vat može biti kolona (PDV po redu) ili None (rules.vat). Sale i invoice se zaokružuju na rules.decimals.
+    """
+    rules = rules or PricingRules()
+    retail = np.nan_to_num(as_float_array(retail), nan=0.0)
+    special = as_float_array(special) if special is not None else np.full(retail.shape, np.nan)
+    vat = as_float_array(vat) if vat is not None else np.full(retail.shape, np.nan)
+    vat = np.where(np.isnan(vat), rules.vat, vat)
+
+    sale = np.where(special > 0, special, retail)
+    invoice = sale / (1 + vat / 100) * rules.invoice_factor
+
+    return (np.round(retail, rules.net_decimals), np.round(sale, rules.decimals),
+            np.round(invoice, rules.decimals))
+
+
+def price_list(retail, special=None, vat=None, rules=None):
+    """Isto kao compute_prices, ali kao lista (net, sale, invoice) Python float torki - za JSON payload"""
+    net, sale, invoice = compute_prices(retail, special, vat, rules)
+    return list(zip(net.tolist(), sale.tolist(), invoice.tolist()))
+
+
+def frame_prices(df, retail='RETAIL_PRICE', special='SPECIAL_PRICE', vat=None, rules=None):
+    """price_list za sve redove Excel DataFrame-a (kolona koja ne postoji se preskače)
+
+    PDV je rules.vat za sve redove - payload šalje 'vat': 20, pa VAT kolona iz sheet-a ne menja
+    invoice_price dok se ne šalje i u payload-u (vat='VAT' je uključuje).
+    """
+    return price_list(df[retail] if retail in df.columns else [0] * len(df),
+                      df[special] if special in df.columns else None,
+                      df[vat] if vat and vat in df.columns else None, rules)
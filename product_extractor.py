@@ -0,0 +1,207 @@
+import html as html_lib
+import json
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+# Regex-i se kompajliraju jednom po procesu, ne pri svakom pozivu
+LINK_RE = re.compile(r'<a\s[^>]*?href\s*=\s*["\']([^"\']+)["\']', re.I)
+PRODUCT_LINK_RE = re.compile(r'/proizvod/')
+PAGINATION_LINK_RE = re.compile(r'page|strana')
+JSON_LD_RE = re.compile(r'<script[^>]+type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.I | re.S)
+META_RE = re.compile(r'<meta\s[^>]*>', re.I)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+# WooCommerce omotač proizvoda: <div id="product-123" class="product type-product ...">
+PRODUCT_CONTAINER = SoupStrainer('div', id=re.compile(r'^product-\d+$'))
+PRODUCT_CONTAINER_START_RE = re.compile(r'<div\s[^>]*id\s*=\s*["\']product-\d+["\']', re.I)
+TITLE_CLASS_RE = re.compile(r'product|title')
+SKU_CLASS_RE = re.compile(r'^(sku|code)$')
+SKU_LABEL_RE = re.compile(r'SKU|šifra|kod', re.I)
+SKU_VALUE_RE = re.compile(r'(?:SKU|šifra|kod)\s*:?\s*([A-Z0-9][A-Z0-9-]*)', re.I)
+PRICE_CLASS_RE = re.compile(r'price|cena')
+PRICE_TEXT_RE = re.compile(r'\d+[.,]\d+.*RSD')
+DESCRIPTION_CLASS_RE = re.compile(r'description|content')
+IMAGE_KEYWORDS = ('product', 'upload', 'wp-content')
+
+
+def empty_product(url):
+    return {
+        'url': url,
+        'title': '',
+        'sku': '',
+        'price': '',
+        'description': '',
+        'images': [],
+        'categories': []
+    }
+
+
+def extract_links(html, base_url, pattern):
+    """href-ovi <a> tagova koji odgovaraju pattern-u, bez duplikata, redom kojim se javljaju"""
+    links = {}
+    for match in LINK_RE.finditer(html):
+        href = html_lib.unescape(match.group(1))
+        if pattern.search(href):
+            links[urljoin(base_url, href)] = None
+    return list(links)
+
+
+def extract_product_links(html, base_url):
+    return extract_links(html, base_url, PRODUCT_LINK_RE)
+
+
+def extract_pagination_links(html, base_url):
+    return extract_links(html, base_url, PAGINATION_LINK_RE)
+
+
+def json_ld_product(html):
+    """Product objekat iz JSON-LD blokova (i iz @graph) ili None"""
+    for match in JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        for item in list(candidates):
+            if isinstance(item, dict) and isinstance(item.get('@graph'), list):
+                candidates.extend(item['@graph'])
+
+        for item in candidates:
+            if not isinstance(item, dict):
+                continue
+            types = item.get('@type')
+            if types == 'Product' or (isinstance(types, list) and 'Product' in types):
+                return item
+    return None
+
+
+def meta_properties(html):
+    """og:* i product:* meta tagovi - vrednosti po property-ju redom kojim se javljaju"""
+    properties = {}
+    head_end = html.find('</head>')
+    for tag in META_RE.findall(html, 0, head_end if head_end != -1 else len(html)):
+        attrs = {name.lower(): html_lib.unescape(double or single) for name, double, single in ATTR_RE.findall(tag)}
+        key = attrs.get('property') or attrs.get('name')
+        if key and 'content' in attrs and key.startswith(('og:', 'product:')):
+            properties.setdefault(key, []).append(attrs['content'])
+    return properties
+
+
+def image_urls(value):
+    """JSON-LD image može biti string, lista ili ImageObject"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return image_urls(value.get('url') or value.get('contentUrl'))
+    urls = []
+    for item in value:
+        urls.extend(image_urls(item))
+    return urls
+
+
+def apply_json_ld(product, data):
+    product['title'] = data.get('name') or product['title']
+    product['sku'] = str(data.get('sku') or product['sku'])
+    product['description'] = data.get('description') or product['description']
+    product['images'] = image_urls(data.get('image')) or product['images']
+
+    offers = data.get('offers')
+    if isinstance(offers, list):
+        offers = offers[0] if offers else None
+    if isinstance(offers, dict):
+        price = offers.get('price') or offers.get('lowPrice')
+        if price is None and isinstance(offers.get('priceSpecification'), dict):
+            price = offers['priceSpecification'].get('price')
+        if price is not None:
+            product['price'] = f"{price} {offers.get('priceCurrency', '')}".strip()
+
+    category = data.get('category')
+    if category:
+        product['categories'] = [category] if isinstance(category, str) else list(category)
+
+
+def apply_meta(product, properties):
+    def first(key):
+        values = properties.get(key)
+        return values[0] if values else ''
+
+    product['title'] = product['title'] or first('og:title')
+    product['sku'] = product['sku'] or first('product:retailer_item_id')
+    product['description'] = product['description'] or first('og:description')
+    if not product['price'] and first('product:price:amount'):
+        product['price'] = f"{first('product:price:amount')} {first('product:price:currency')}".strip()
+
+
+def apply_dom(product, html, base_url):
+    """Fallback kada strukturisanih podataka nema - parsira se samo omotač proizvoda"""
+    # Tokenizer ne mora da prolazi kroz header i meni pre omotača
+    start = PRODUCT_CONTAINER_START_RE.search(html)
+    soup = BeautifulSoup(html[start.start():], PARSER, parse_only=PRODUCT_CONTAINER) if start else None
+    if not soup or not soup.contents:
+        soup = BeautifulSoup(html, PARSER)
+
+    if not product['title']:
+        title_elem = soup.find(['h1', 'h2'], class_=TITLE_CLASS_RE) or soup.find('h1')
+        if title_elem:
+            product['title'] = title_elem.get_text(strip=True)
+
+    if not product['sku']:
+        sku_elem = soup.find('span', class_=SKU_CLASS_RE)
+        if sku_elem:
+            product['sku'] = sku_elem.get_text(strip=True)
+        else:
+            label = soup.find(string=SKU_LABEL_RE)
+            match = SKU_VALUE_RE.search(str(label)) if label else None
+            if match:
+                product['sku'] = match.group(1)
+
+    if not product['price']:
+        price_elem = soup.find(['span', 'div'], class_=PRICE_CLASS_RE)
+        if price_elem:
+            product['price'] = price_elem.get_text(strip=True)
+        else:
+            price_text = soup.find(string=PRICE_TEXT_RE)
+            if price_text:
+                product['price'] = str(price_text).strip()
+
+    if not product['images']:
+        for img in soup.find_all('img'):
+            src = img.get('src') or img.get('data-src')
+            if src and any(keyword in src.lower() for keyword in IMAGE_KEYWORDS):
+                product['images'].append(urljoin(base_url, src))
+
+    if not product['description']:
+        desc_elem = soup.find(['div', 'p'], class_=DESCRIPTION_CLASS_RE)
+        if desc_elem:
+            product['description'] = desc_elem.get_text(strip=True)
+
+
+def extract_product(html, url, base_url):
+    """Detalji proizvoda: prvo JSON-LD, pa og/product meta, pa HTML samo za ono što nedostaje"""
+    product = empty_product(url)
+
+    data = json_ld_product(html)
+    if data:
+        apply_json_ld(product, data)
+    properties = meta_properties(html)
+    apply_meta(product, properties)
+
+    if not (product['title'] and product['sku'] and product['price'] and product['images']):
+        apply_dom(product, html, base_url)
+
+    # og:image je obično samo glavna slika - koristi se tek kada galerije nema
+    product['images'] = product['images'] or properties.get('og:image', [])
+
+    product['images'] = list(dict.fromkeys(urljoin(base_url, src) for src in product['images']))
+    return product
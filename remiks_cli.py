@@ -0,0 +1,189 @@
+"""Jedinstveni neinteraktivni CLI za sve sinhronizacije
+
+Teške biblioteke (pandas, requests) i skripte se učitavaju tek unutar
+podkomande koja ih koristi, tako da je start brz. Vreme učitavanja se meri sa:
+
+    python -X importtime remiks_cli.py sync stock 2> importtime.log
+"""
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EXCEL_FILE = os.path.join(SCRIPT_DIR, 'podaci', 'podaci.xlsx')
+
+
+def resolve_files_or_exit(path_or_pattern):
+    """Vraća listu Excel fajlova ili prekida sa greškom - nikad ne pita korisnika"""
+    from batch_sync import resolve_excel_paths
+
+    excel_files = resolve_excel_paths(path_or_pattern)
+    if not excel_files:
+        print(f"Fajl nije pronađen: {path_or_pattern}")
+        sys.exit(1)
+    return excel_files
+
+
+def cmd_sync_products(args):
+    from WooCommerceToRemiks import WooCommerceToRemiks
+
+    sync = WooCommerceToRemiks()
+    if args.workers:
+        sync.transform_workers = args.workers
+    sys.exit(0 if sync.run_sync() else 1)
+
+
+def cmd_sync_wc_stock(args):
+    from WooCommerceToRemiks import WooCommerceToRemiks
+
+    sys.exit(0 if WooCommerceToRemiks().run_stock_sync() else 1)
+
+
+def cmd_sync_stock(args):
+    from stock_update import StockUpdateScript
+
+    sys.exit(0 if StockUpdateScript().run_stock_update() else 1)
+
+
+def cmd_sync_excel(args):
+    from excel_to_remiks import ExcelToRemiks
+
+    excel_files = resolve_files_or_exit(args.file)
+    sync = ExcelToRemiks()
+    if len(excel_files) > 1:
+        ok = sync.run_batch_sync(excel_files, workers=args.workers)
+    else:
+        ok = sync.run_sync(excel_files[0])
+    sys.exit(0 if ok else 1)
+
+
+def cmd_sync_excel_stock(args):
+    from ExcelToRemiksStock import ExcelToRemiksStock
+
+    excel_files = resolve_files_or_exit(args.file)
+    sync = ExcelToRemiksStock()
+    if len(excel_files) > 1:
+        ok = sync.run_batch_stock_sync(excel_files, workers=args.workers)
+    else:
+        ok = sync.run_stock_sync(excel_files[0])
+    sys.exit(0 if ok else 1)
+
+
+def cmd_export(args):
+    from WooCommerceToRemiks import WooCommerceToRemiks
+
+    excel_file = WooCommerceToRemiks().convert_json_to_excel(args.json)
+    if not excel_file:
+        sys.exit(1)
+
+
+def cmd_analyze(args):
+    excel_files = resolve_files_or_exit(args.file)
+
+    if args.stock:
+        from ExcelToRemiksStock import ExcelToRemiksStock
+
+        analyzer = ExcelToRemiksStock()
+        for excel_file in excel_files:
+            analyzer.analyze_stock_data(excel_file)
+    else:
+        from excel_to_remiks import ExcelToRemiks
+
+        analyzer = ExcelToRemiks()
+        for excel_file in excel_files:
+            analyzer.analyze_excel_file(excel_file)
+
+
+def cmd_watch(args):
+    from stock_update import StockUpdateScript
+
+    StockUpdateScript().watch_stock_folder(interval=args.interval, debounce=args.debounce)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Bambini -> Remiks sinhronizacija (neinteraktivni CLI)')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile po fazi: profiles/<run>_<vreme>/<faza>.pstats i .collapsed (flamegraph)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='tracemalloc peak i top mesta alokacija po fazi (profiles/.../memory.json)')
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='KASETA',
+                          help='Snimi sve HTTP zahteve i odgovore u kasetu (npr. cassettes/prod.jsonl.gz)')
+    cassette.add_argument('--replay', metavar='KASETA', help='Pusti HTTP odgovore iz kasete - bez mreže')
+    parser.add_argument('--replay-latency', action='store_true',
+                        help='U replay modu čekaj onoliko koliko je trajao originalni zahtev')
+    parser.add_argument('--http-cache', metavar='DIR',
+                        help='Disk keš GET odgovora sa ETag/Last-Modified (uslovni zahtevi, 304 sa diska)')
+    parser.add_argument('--http-cache-size', type=float, default=200, metavar='MB',
+                        help='Maksimalna veličina HTTP keša u MB (LRU), default 200')
+    parser.add_argument('--columnar', choices=['parquet', 'csv'],
+                        help='export i sync stock pored Excel-a upisuju i Parquet/csv.gz tabele '
+                             '(proizvodi, zalihe sku/size/warehouse/qty, slike, varijante)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # sync <cilj>
+    sync_parser = subparsers.add_parser('sync', help='Pokreni sinhronizaciju')
+    sync_targets = sync_parser.add_subparsers(dest='target', required=True)
+
+    products_parser = sync_targets.add_parser('products', help='WooCommerce -> Remiks proizvodi')
+    products_parser.add_argument('--workers', '-w', type=int, default=None,
+                                 help='Broj procesa za transformaciju kataloga (default WC_TRANSFORM_WORKERS ili 1)')
+    products_parser.set_defaults(func=cmd_sync_products)
+    sync_targets.add_parser('wc-stock', help='WooCommerce -> Remiks stock (samo zalihe i cene, _fields projekcija)'
+                            ).set_defaults(func=cmd_sync_wc_stock)
+    sync_targets.add_parser('stock', help='zalihe/zalihe.xlsx -> Remiks stock').set_defaults(func=cmd_sync_stock)
+
+    for name, func, help_text in (
+            ('excel', cmd_sync_excel, 'Excel (UPISATI) -> Remiks proizvodi'),
+            ('excel-stock', cmd_sync_excel_stock, 'Excel (UPISATI) -> Remiks stock')):
+        target = sync_targets.add_parser(name, help=help_text)
+        target.add_argument('--file', '-f', default=DEFAULT_EXCEL_FILE,
+                            help='Excel fajl, direktorijum ili glob pattern')
+        target.add_argument('--workers', '-w', type=int, default=None, help='Broj procesa za batch obradu')
+        target.set_defaults(func=func)
+
+    # export
+    export_parser = subparsers.add_parser('export', help='Konvertuj WooCommerce JSON payload u Excel')
+    export_parser.add_argument('--json', default=None, help='JSON fajl (default: najnoviji payload_wc_to_remiks_*)')
+    export_parser.set_defaults(func=cmd_export)
+
+    # analyze
+    analyze_parser = subparsers.add_parser('analyze', help='Analiziraj Excel fajl')
+    analyze_parser.add_argument('--file', '-f', default=DEFAULT_EXCEL_FILE,
+                                help='Excel fajl, direktorijum ili glob pattern')
+    analyze_parser.add_argument('--stock', action='store_true', help='Analiza stock podataka umesto proizvoda')
+    analyze_parser.set_defaults(func=cmd_analyze)
+
+    # watch
+    watch_parser = subparsers.add_parser('watch', help='Prati zalihe/ i šalji promenjene SKU')
+    watch_parser.add_argument('--interval', type=float, default=2.0, help='Interval provere u sekundama')
+    watch_parser.add_argument('--debounce', type=float, default=3.0, help='Sekundi mirovanja fajla pre obrade')
+    watch_parser.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Čitaju ih SyncMetrics i create_session pri kreiranju sync objekta, pa moraju biti postavljene pre importa skripti
+    if args.profile:
+        os.environ['SYNC_PROFILE'] = '1'
+    if args.trace_memory:
+        os.environ['SYNC_TRACE_MEMORY'] = '1'
+    if args.record or args.replay:
+        os.environ['HTTP_CASSETTE'] = args.record or args.replay
+        os.environ['HTTP_CASSETTE_MODE'] = 'record' if args.record else 'replay'
+    if args.replay_latency:
+        os.environ['HTTP_CASSETTE_LATENCY'] = '1'
+    if args.columnar:
+        os.environ['EXPORT_COLUMNAR'] = args.columnar
+    if args.http_cache:
+        os.environ['HTTP_CACHE_DIR'] = args.http_cache
+        os.environ['HTTP_CACHE_MAX_MB'] = str(args.http_cache_size)
+
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import json
+import sys
+from dataclasses import dataclass
+
+
+def intern(value):
+    """Ponovljene vrednosti (nazivi kategorija, veličine, magacini) dele jedan string objekat"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class Term:
+    """Kategorija ili tag proizvoda"""
+    id: int
+    name: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(data.get('id'), intern(data.get('name', '')))
+
+
+@dataclass(slots=True)
+class Attribute:
+    """Atribut proizvoda (options) ili varijante (option)"""
+    name: str
+    option: str = ''
+    options: tuple = ()
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(intern(data.get('name', '')), intern(data.get('option', '')),
+                   tuple(intern(option) for option in data.get('options', [])))
+
+
+@dataclass(slots=True)
+class WcVariation:
+    """Polja WooCommerce varijante koja koristi sinhronizacija"""
+    id: int
+    sku: str
+    stock_quantity: int
+    attributes: tuple
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(data.get('id'), data.get('sku'), data.get('stock_quantity'),
+                   tuple(Attribute.from_api(attribute) for attribute in data.get('attributes', [])))
+
+
+@dataclass(slots=True)
+class WcProduct:
+    """Polja WooCommerce proizvoda koja koristi sinhronizacija (ostatak API odgovora se odbacuje)"""
+    id: int
+    sku: str
+    name: str
+    type: str
+    status: str
+    price: str
+    regular_price: str
+    sale_price: str
+    stock_quantity: int
+    categories: tuple
+    tags: tuple
+    attributes: tuple
+    images: tuple
+    description: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            id=data.get('id'),
+            sku=data.get('sku'),
+            name=data.get('name', ''),
+            type=intern(data.get('type', '')),
+            status=intern(data.get('status', '')),
+            price=data.get('price', ''),
+            regular_price=data.get('regular_price', ''),
+            sale_price=data.get('sale_price', ''),
+            stock_quantity=data.get('stock_quantity'),
+            categories=tuple(Term.from_api(category) for category in data.get('categories', [])),
+            tags=tuple(Term.from_api(tag) for tag in data.get('tags', [])),
+            attributes=tuple(Attribute.from_api(attribute) for attribute in data.get('attributes', [])),
+            images=tuple(image['src'] for image in data.get('images', [])),
+            description=data.get('description', ''),
+        )
+
+
+def stock_levels(stock_data):
+    """{veličina: {magacin: količina}} -> ((veličina, magacin, količina), ...) sa deljenim stringovima"""
+    return tuple((intern(str(size)), intern(warehouse), qty)
+                 for size, warehouses in stock_data.items()
+                 for warehouse, qty in warehouses.items())
+
+
+def stock_dict(levels):
+    """Obrnuto od stock_levels - Remiks format"""
+    stock = {}
+    for size, warehouse, qty in levels:
+        stock.setdefault(size, {})[warehouse] = qty
+    return stock
+
+
+@dataclass(slots=True)
+class RemiksProduct:
+    sku: str
+    gender: str
+    product_name: str
+    stock: tuple
+    type: str
+    net_retail_price: float
+    active: int
+    brand: str
+    category_code: str
+    product_category_name: str
+    product_variation: str
+    product_variations: tuple
+    sale_price: float
+    invoice_price: float
+    weight: str
+    vat: str
+    vat_symbol: str
+    season: str
+    images: tuple
+    description: str
+
+    def to_remiks(self):
+        """Remiks product payload (isti ključevi i redosled kao ranije pravljeni dict)"""
+        return {
+            'sku': self.sku,
+            'gender': self.gender,
+            'product_name': self.product_name,
+            'stock': stock_dict(self.stock),
+            'type': self.type,
+            'net_retail_price': self.net_retail_price,
+            'active': self.active,
+            'brand': self.brand,
+            'category_code': self.category_code,
+            'product_category_name': self.product_category_name,
+            'product_variation': self.product_variation,
+            'product_variations': list(self.product_variations),
+            'sale_price': self.sale_price,
+            'invoice_price': self.invoice_price,
+            'weight': self.weight,
+            'vat': self.vat,
+            'vat symbol': self.vat_symbol,
+            'season': self.season,
+            'images': list(self.images),
+            'description': self.description,
+        }
+
+
+@dataclass(slots=True)
+class StockEntry:
+    sku: str
+    stock: tuple
+    type: str
+    net_retail_price: float
+    sale_price: float
+    invoice_price: float
+
+    def to_remiks(self):
+        """Remiks stock payload (isti format kao StockUpdateScript)"""
+        return {
+            'sku': self.sku,
+            'stock': stock_dict(self.stock),
+            'type': self.type,
+            'net_retail_price': self.net_retail_price,
+            'sale_price': self.sale_price,
+            'invoice_price': self.invoice_price,
+        }
+
+
+def iter_payload(records, indent=None, ensure_ascii=True):
+    """JSON lista Remiks dict-ova deo po deo - isti tekst kao json.dumps(lista), bez liste svih dict-ova"""
+    pad = ' ' * indent if indent is not None else None
+    separator = ', ' if pad is None else ',\n'
+    first = True
+
+    for record in records:
+        part = json.dumps(record.to_remiks(), indent=indent, ensure_ascii=ensure_ascii)
+        if pad is not None:
+            part = pad + part.replace('\n', '\n' + pad)
+        yield ('[' if pad is None else '[\n') if first else separator
+        yield part
+        first = False
+
+    if first:
+        yield '[]'
+    else:
+        yield ']' if pad is None else '\n]'
+
+
+def dumps_payload(records, indent=None, ensure_ascii=True):
+    return ''.join(iter_payload(records, indent, ensure_ascii))
@@ -1,203 +1,176 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import csv
 import os
-import time
 import re
+import sys
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
+import product_extractor
+from http_session import create_session
+from crawler import PENDING, CrawlFrontier, HostPoliteness, crawl, discover_sitemap_urls
+from image_downloader import ImageDownloader
 
 
 class BambiniScraper:
-    def __init__(self, base_url="https://www.bambini.rs", delay=2):
+    def __init__(self, base_url="https://www.bambini.rs", delay=0.5, workers=4, per_host=2):
         self.base_url = base_url
-        self.delay = delay  # Pauza između zahteva u sekundama
-        self.session = requests.Session()
+        self.delay = delay  # Najmanji razmak između zahteva ka istom hostu u sekundama
+        self.workers = workers
+        self.politeness = HostPoliteness(delay, per_host)
+        self.session = create_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.products = []
 
-    def get_page(self, url):
-        """Dobija sadržaj stranice sa error handling-om"""
+    def fetch(self, url):
+        """GET sa poštovanjem servera - vraća response ili None"""
         try:
             print(f"Fetching: {url}")
-            response = self.session.get(url, timeout=10)
+            host = self.politeness.acquire(url)  # Poštovanje servera
+            try:
+                response = self.session.get(url, timeout=10)
+            finally:
+                self.politeness.release(host)
             response.raise_for_status()
-            time.sleep(self.delay)  # Poštovanje servera
-            return response.text
+            return response
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}")
             return None
 
-    def extract_product_links(self, html):
-        """Izvlači linkove do proizvoda sa stranice"""
-        soup = BeautifulSoup(html, 'html.parser')
-        product_links = []
-
-        # Traži linkove do proizvoda - možda treba prilagoditi selektor
-        product_elements = soup.find_all('a', href=re.compile(r'/proizvod/'))
+    def get_page(self, url):
+        """Dobija sadržaj stranice sa error handling-om"""
+        response = self.fetch(url)
+        return response.text if response is not None else None
 
-        for element in product_elements:
-            href = element.get('href')
-            if href:
-                full_url = urljoin(self.base_url, href)
-                product_links.append(full_url)
+    def fetch_bytes(self, url):
+        response = self.fetch(url)
+        return response.content if response is not None else None
 
-        return list(set(product_links))  # Uklanja duplikate
+    def extract_product_links(self, html):
+        """Izvlači linkove do proizvoda sa stranice"""
+        return product_extractor.extract_product_links(html, self.base_url)
 
     def extract_product_details(self, product_url):
-        """Izvlači detalje proizvoda sa stranice proizvoda"""
+        """Izvlači detalje proizvoda sa stranice proizvoda (JSON-LD, og meta, pa HTML)"""
         html = self.get_page(product_url)
         if not html:
             return None
+        return product_extractor.extract_product(html, product_url, self.base_url)
 
-        soup = BeautifulSoup(html, 'html.parser')
-
-        product = {
-            'url': product_url,
-            'title': '',
-            'sku': '',
-            'price': '',
-            'description': '',
-            'images': [],
-            'categories': []
-        }
-
-        # Naslov proizvoda
-        title_elem = soup.find(['h1', 'h2'], class_=re.compile(r'product|title'))
-        if not title_elem:
-            title_elem = soup.find('h1')
-        if title_elem:
-            product['title'] = title_elem.get_text(strip=True)
-
-        # SKU - može biti u različitim mestima
-        sku_patterns = [
-            soup.find(text=re.compile(r'SKU|šifra|kod', re.I)),
-            soup.find('span', class_=re.compile(r'sku|code')),
-            soup.find('meta', {'property': 'product:retailer_item_id'})
-        ]
-
-        for pattern in sku_patterns:
-            if pattern:
-                if hasattr(pattern, 'get'):
-                    sku = pattern.get('content', '')
-                else:
-                    sku_text = str(pattern)
-                    sku_match = re.search(r'[A-Z0-9-]+', sku_text)
-                    sku = sku_match.group() if sku_match else ''
-                if sku:
-                    product['sku'] = sku
-                    break
-
-        # Cena
-        price_elem = soup.find(['span', 'div'], class_=re.compile(r'price|cena'))
-        if not price_elem:
-            price_elem = soup.find(text=re.compile(r'\d+[.,]\d+.*RSD'))
-        if price_elem:
-            product['price'] = price_elem.get_text(strip=True) if hasattr(price_elem, 'get_text') else str(
-                price_elem).strip()
-
-        # Slike proizvoda
-        img_elements = soup.find_all('img')
-        for img in img_elements:
-            src = img.get('src') or img.get('data-src')
-            if src and any(keyword in src.lower() for keyword in ['product', 'upload', 'wp-content']):
-                full_img_url = urljoin(self.base_url, src)
-                product['images'].append(full_img_url)
-
-        # Opis
-        desc_elem = soup.find(['div', 'p'], class_=re.compile(r'description|content'))
-        if desc_elem:
-            product['description'] = desc_elem.get_text(strip=True)
-
-        return product
-
-    def get_all_products_from_page(self, page_url):
-        """Dobija sve proizvode sa jedne stranice kataloga"""
+    def crawl_listing_page(self, page_url):
+        """Stranica kataloga: proizvodi i dalja paginacija idu u frontier"""
         html = self.get_page(page_url)
         if not html:
-            return []
+            return False, None
 
-        product_links = self.extract_product_links(html)
-        products = []
+        new_products = self.frontier.add(self.same_site(self.extract_product_links(html)), 'product')
+        # Paginacija se prati sa svake stranice, ne samo sa prve
+        new_pages = self.frontier.add(self.same_site(self.find_pagination_urls(html)), 'listing')
+        print(f"Listing {page_url}: {new_products} novih proizvoda, {new_pages} novih stranica")
+        return True, None
 
-        for link in product_links:
-            product = self.extract_product_details(link)
-            if product:
-                products.append(product)
-                print(f"Scraped: {product['title'][:50]}...")
+    def crawl_product_page(self, product_url):
+        product = self.extract_product_details(product_url)
+        if not product:
+            return False, None
+        print(f"Scraped: {product['title'][:50]}...")
+        return True, product
 
-        return products
+    def same_site(self, urls):
+        host = urlparse(self.base_url).netloc
+        return [url for url in urls if urlparse(url).netloc == host]
 
     def find_pagination_urls(self, html):
         """Pronalazi stranice za paginaciju"""
-        soup = BeautifulSoup(html, 'html.parser')
-        pagination_urls = []
-
-        # Traži pagination linkove
-        pagination_elements = soup.find_all('a', href=re.compile(r'page|strana'))
-        for elem in pagination_elements:
-            href = elem.get('href')
-            if href:
-                pagination_urls.append(urljoin(self.base_url, href))
+        return product_extractor.extract_pagination_links(html, self.base_url)
 
-        return pagination_urls
+    def scrape_all_products(self, start_url="/prodavnica/", state_file="bambini_crawl.sqlite", resume=True):
+        """Glavna funkcija za scraping svih proizvoda
 
-    def scrape_all_products(self, start_url="/prodavnica/"):
-        """Glavna funkcija za scraping svih proizvoda"""
-        full_start_url = urljoin(self.base_url, start_url)
+        Stanje crawl-a (red URL-ova i već scrape-ovani proizvodi) se čuva u state_file,
+        pa prekinut crawl sa resume=True nastavlja gde je stao. Ako je prethodni crawl
+        završen (nema URL-ova u redu), kreće se iznova.
+        """
+        if not resume and os.path.exists(state_file):
+            os.remove(state_file)
 
-        # Počinje sa prvom stranicom
-        html = self.get_page(full_start_url)
-        if not html:
-            print("Nije moguće dobiti početnu stranicu")
+        self.frontier = CrawlFrontier(state_file)
+        try:
+            # Nedovršeni URL-ovi iz prekinutog run-a su već vraćeni u red pri otvaranju
+            if self.frontier.counts().get(PENDING):
+                print("Nastavlja se prekinut crawl")
+            else:
+                self.frontier.reset()
+            self.frontier.add([urljoin(self.base_url, start_url)], 'listing')
+            counts = crawl(self.frontier, {
+                'listing': self.crawl_listing_page,
+                'product': self.crawl_product_page,
+            }, workers=self.workers)
+            self.products = self.frontier.results()
+        finally:
+            self.frontier.close()
+
+        if counts.get('failed'):
+            print(f"Neuspešno posle više pokušaja: {counts['failed']} URL-ova")
+
+    def find_sitemaps(self):
+        """Sitemap-i iz robots.txt, pa podrazumevani WordPress (Yoast i core) index-i"""
+        sitemaps = []
+        robots = self.get_page(urljoin(self.base_url, '/robots.txt'))
+        if robots:
+            sitemaps = [line.split(':', 1)[1].strip() for line in robots.splitlines()
+                        if line.lower().startswith('sitemap:')]
+        return sitemaps or [urljoin(self.base_url, path) for path in ('/sitemap_index.xml', '/wp-sitemap.xml')]
+
+    def scrape_from_sitemap(self, sitemap_urls=None, state_file="bambini_sitemap.sqlite"):
+        """Scraping proizvoda iz XML sitemap-a - ponovo se scrape-uju samo proizvodi kojima se pomerio lastmod
+
+        Neizmenjeni proizvodi ostaju iz prethodnih run-ova u state_file. State_file je odvojen od
+        scrape_all_products, jer završen crawl kataloga briše svoj red i time i scraped_lastmod.
+        """
+        sitemap_urls = sitemap_urls or self.find_sitemaps()
+        lastmods = discover_sitemap_urls(self.fetch_bytes, sitemap_urls,
+                                         include=product_extractor.PRODUCT_LINK_RE.search)
+        if not lastmods:
+            print("Sitemap nema nijedan proizvod")
             return
 
-        # Dobija proizvode sa prve stranice
-        self.products.extend(self.get_all_products_from_page(full_start_url))
+        self.frontier = CrawlFrontier(state_file)
+        try:
+            new, changed = self.frontier.schedule(lastmods, 'product')
+            print(f"Sitemap: {len(lastmods)} proizvoda, {new} novih, {changed} izmenjenih od poslednjeg scrape-a")
+            counts = crawl(self.frontier, {'product': self.crawl_product_page}, workers=self.workers)
+            self.products = self.frontier.results()
+        finally:
+            self.frontier.close()
 
-        # Pronalazi dodatne stranice
-        pagination_urls = self.find_pagination_urls(html)
+        if counts.get('failed'):
+            print(f"Neuspešno posle više pokušaja: {counts['failed']} URL-ova")
 
-        for page_url in pagination_urls:
-            if page_url not in [full_start_url]:  # Izbegava duplikate
-                products_from_page = self.get_all_products_from_page(page_url)
-                self.products.extend(products_from_page)
+    def download_images(self, download_folder="downloaded_images", workers=8, per_host=4):
+        """Download-uje sve slike proizvoda - paralelno, sa najviše per_host zahteva ka jednom hostu"""
 
-    def download_images(self, download_folder="downloaded_images"):
-        """Download-uje sve slike proizvoda"""
         Path(download_folder).mkdir(exist_ok=True)
 
+        jobs = []
         for product in self.products:
             if not product['images']:
                 continue
 
-            # Kreira folder za proizvod
+            # Folder za proizvod
             safe_name = re.sub(r'[^\w\s-]', '', product['title']).strip()[:50]
             product_folder = Path(download_folder) / safe_name
-            product_folder.mkdir(exist_ok=True)
 
             for i, img_url in enumerate(product['images']):
-                try:
-                    response = self.session.get(img_url, timeout=10)
-                    response.raise_for_status()
-
-                    # Određuje ekstenziju
-                    parsed_url = urlparse(img_url)
-                    ext = Path(parsed_url.path).suffix or '.jpg'
-
-                    # Čuva sliku
-                    filename = product_folder / f"image_{i + 1}{ext}"
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-
-                    print(f"Downloaded: {filename}")
-                    time.sleep(0.5)  # Kratka pauza između download-a
+                # Određuje ekstenziju
+                parsed_url = urlparse(img_url)
+                ext = Path(parsed_url.path).suffix or '.jpg'
+                jobs.append((img_url, str(product_folder / f"image_{i + 1}{ext}"), product['sku'] or safe_name))
 
-                except Exception as e:
-                    print(f"Error downloading {img_url}: {e}")
+        downloader = ImageDownloader(download_folder, session=self.session, workers=workers, per_host=per_host)
+        return downloader.download_all(jobs)
 
     def save_to_csv(self, filename="bambini_products.csv"):
         """Čuva podatke u CSV fajl"""
@@ -229,11 +202,15 @@ class BambiniScraper:
 
 # Kako se koristi:
 if __name__ == "__main__":
-    # Kreira scraper sa 2 sekunde pauze između zahteva
-    scraper = BambiniScraper(delay=2)
+    # Kreira scraper sa 4 paralelna zahteva i najmanje 0.5s između zahteva ka istom hostu
+    scraper = BambiniScraper(delay=0.5, workers=4)
 
     print("Početak scraping-a...")
-    scraper.scrape_all_products()
+    if '--sitemap' in sys.argv:
+        # Inkrementalno: samo novi proizvodi i proizvodi kojima se pomerio lastmod u sitemap-u
+        scraper.scrape_from_sitemap()
+    else:
+        scraper.scrape_all_products()
 
     print(f"Ukupno proizvoda: {len(scraper.products)}")
 
@@ -0,0 +1,175 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StackSampler:
+    """Periodično uzorkuje stek jedne niti i broji collapsed stack-ove po fazi (za flamegraph)"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.current_stage = None
+        self.samples = {}  # faza -> Counter(collapsed_stack -> broj uzoraka)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            stage = self.current_stage
+            if stage is None:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.samples.setdefault(stage, Counter())[';'.join(reversed(stack))] += 1
+
+
+class StageProfiler:
+    """cProfile i tracemalloc po fazi sync pipeline-a
+
+    Uključuje se preko SyncMetrics: svaka `metrics.stage(...)` faza dobija svoj
+    cProfile (ugnježdene faze pauziraju roditeljsku, pa je profil ekskluzivan),
+    collapsed stack uzorke za flamegraph i, opciono, tracemalloc peak i mesta
+    sa najviše alokacija (mesta samo za faze najvišeg nivoa).
+    """
+
+    def __init__(self, cpu=True, memory=False, output_dir=None, top_allocations=10):
+        self.cpu = cpu
+        self.memory = memory
+        self.output_dir = output_dir or os.getenv('PROFILE_DIR', os.path.join(SCRIPT_DIR, 'profiles'))
+        self.top_allocations = top_allocations
+        self.reset()
+
+    def reset(self):
+        self.profiles = {}  # faza -> cProfile.Profile
+        self.memory_stats = {}  # faza -> {'calls', 'peak_bytes', 'allocated_bytes', 'top': Counter}
+        self.stack = []
+        self.sampler = None
+
+    def start_stage(self, name):
+        if not self.stack:
+            self._start_run()
+
+        if self.cpu:
+            if self.stack:
+                self.profiles[self.stack[-1]['name']].disable()
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+            self.sampler.current_stage = name
+
+        frame = {'name': name, 'peak': 0}
+        if self.memory:
+            if self.stack:
+                parent = self.stack[-1]
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+            else:
+                # Snapshot je skup (ceo heap) - samo za faze najvišeg nivoa, ugnježdene dobijaju
+                # samo razliku get_traced_memory() (fetch_variations se poziva po proizvodu)
+                frame['snapshot'] = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            frame['start_bytes'] = tracemalloc.get_traced_memory()[0]
+        self.stack.append(frame)
+
+        if self.cpu:
+            profile.enable()
+
+    def stop_stage(self, name):
+        if self.cpu:
+            self.profiles[name].disable()
+
+        frame = self.stack.pop()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            frame['peak'] = max(frame['peak'], peak)
+            stats = self.memory_stats.setdefault(name, {
+                'calls': 0, 'peak_bytes': 0, 'allocated_bytes': 0, 'top': Counter()})
+            stats['calls'] += 1
+            stats['peak_bytes'] = max(stats['peak_bytes'], frame['peak'])
+            stats['allocated_bytes'] += current - frame['start_bytes']
+            if 'snapshot' in frame:
+                for diff in tracemalloc.take_snapshot().compare_to(frame['snapshot'],
+                                                                   'lineno')[:self.top_allocations]:
+                    stats['top'][str(diff.traceback)] += diff.size_diff
+
+            if self.stack:
+                parent = self.stack[-1]
+                parent['peak'] = max(parent['peak'], frame['peak'])
+
+        if self.cpu:
+            if self.stack:
+                parent_name = self.stack[-1]['name']
+                self.sampler.current_stage = parent_name
+                self.profiles[parent_name].enable()
+            else:
+                self.sampler.current_stage = None
+
+    def _start_run(self):
+        if self.cpu and self.sampler is None:
+            self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def write_reports(self, run_name):
+        """Upisuje .pstats i .collapsed po fazi i memory.json u profiles/<run>_<timestamp>/"""
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        if not self.profiles and not self.memory_stats:
+            self.reset()
+            return None
+
+        run_dir = os.path.join(self.output_dir, f"{run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(run_dir, exist_ok=True)
+
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(run_dir, f'{name}.pstats'))
+        if self.sampler is not None:
+            for name, counter in self.sampler.samples.items():
+                with open(os.path.join(run_dir, f'{name}.collapsed'), 'w', encoding='utf-8') as f:
+                    for stack, count in counter.most_common():
+                        f.write(f"{stack} {count}\n")
+
+        if self.memory_stats:
+            report = {}
+            print("\n🧠 Memorija po fazama (tracemalloc):")
+            for name, stats in self.memory_stats.items():
+                top = [{'site': site, 'size_diff_bytes': size}
+                       for site, size in stats['top'].most_common(self.top_allocations)]
+                report[name] = {
+                    'calls': stats['calls'],
+                    'peak_bytes': stats['peak_bytes'],
+                    'allocated_bytes': stats['allocated_bytes'],
+                    'top_allocations': top,
+                }
+                print(f"  - {name}: peak {stats['peak_bytes'] / 1024 / 1024:.1f} MB, "
+                      f"zadržano {stats['allocated_bytes'] / 1024 / 1024:.1f} MB"
+                      + (f", najviše: {top[0]['site']}" if top else ""))
+            with open(os.path.join(run_dir, 'memory.json'), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+        print(f"📊 Profili sačuvani u {run_dir}")
+        self.reset()
+        return run_dir
@@ -2,11 +2,20 @@ from datetime import datetime
 import requests
 import json
 import os
-import pandas as pd
+import re
+import time
+import argparse
 from dotenv import load_dotenv
+from http_session import create_session, JwtTokenCache
+from sync_metrics import SyncMetrics, timed_run
 
 load_dotenv()
 
+# Ključ u snapshot-u sa SKU po praćenom fajlu (ostali ključevi su SKU)
+SNAPSHOT_FILES_KEY = '_files'
+# Delovi teksta greške koji mogu biti SKU - razdvojeni razmakom, navodnicima, zagradama i interpunkcijom
+_ERROR_TOKEN = re.compile(r"[^\s'\"`,;:()\[\]{}]+")
+
 
 class StockUpdateScript:
     def __init__(self):
@@ -21,10 +30,24 @@ class StockUpdateScript:
         self.excel_file_path = "zalihe/zalihe.xlsx"
         self.project_root = os.path.dirname(os.path.abspath(__file__))
 
-    def read_stock_excel(self):
+        # Stanje koje ostaje u memoriji između obrada (watch mod)
+        self.session = create_session()
+        self.token_cache = JwtTokenCache(self.get_jwt_token)
+        self.metrics = SyncMetrics()
+        self.metrics.attach(self.session)
+        self.products_cache = None  # (json_putanja, mtime, products_dict)
+        self.snapshot_path = os.path.join(self.project_root, 'zalihe', '.stock_snapshot.json')
+        self.columnar_format = os.getenv('EXPORT_COLUMNAR')  # 'parquet' / 'csv' - tabele pored Excel izveštaja
+        self.save_artifacts = True  # payload JSON i Excel izveštaj po run-u (daemon ih isključuje)
+
+    def read_stock_excel(self, excel_path=None):
         """Čita podatke o zalihama iz Excel fajla"""
+        # pandas se učitava tek kada je potreban - brži start za watch/daemon i --help
+        import pandas as pd
+
         try:
-            excel_path = os.path.join(self.project_root, self.excel_file_path)
+            if excel_path is None:
+                excel_path = os.path.join(self.project_root, self.excel_file_path)
 
             if not os.path.exists(excel_path):
                 print(f"❌ Excel fajl nije pronađen: {excel_path}")
@@ -156,7 +179,7 @@ class StockUpdateScript:
         }
 
         try:
-            response = requests.request("GET", self.remiks_url_login, headers=headers, data=payload)
+            response = self.session.request("GET", self.remiks_url_login, headers=headers, data=payload)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get('token')
@@ -178,7 +201,7 @@ class StockUpdateScript:
         send_data = json.dumps(payload)
 
         try:
-            response = requests.request("POST", self.remiks_url_stock, headers=headers, data=send_data)
+            response = self.session.request("POST", self.remiks_url_stock, headers=headers, data=send_data)
             if response.status_code == 200:
                 data = response.json()
                 return data
@@ -228,6 +251,8 @@ class StockUpdateScript:
 
     def create_excel_report(self, combined_data):
         """Kreira Excel izvештај o ažuriranim zalihama"""
+        import pandas as pd
+
         try:
             # Priprema podatke za Excel
             excel_data = []
@@ -249,77 +274,74 @@ class StockUpdateScript:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             excel_filename = os.path.join(self.project_root, f'stock_update_report_{timestamp}.xlsx')
 
-            # Eksportuje u Excel
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Stock_Update', index=False)
-
-                # Auto-adjust kolona width
-                worksheet = writer.sheets['Stock_Update']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            # Eksportuje u Excel (write-only, širine kolona iz DataFrame-a)
+            from excel_export import write_dataframe
+            write_dataframe(df, excel_filename, 'Stock_Update')
 
             print(f"✅ Excel izvešataj kreiran: {excel_filename}")
+
+            if self.columnar_format:
+                from columnar_export import product_table, stock_table, write_tables
+                tables = {'products': product_table(combined_data), 'stock': stock_table(combined_data)}
+                for path in write_tables(tables, os.path.splitext(excel_filename)[0], self.columnar_format):
+                    print(f"✅ Kolonarni fajl kreiran: {path}")
             return excel_filename
 
         except Exception as e:
             print(f"❌ Greška pri kreiranju Excel izveštaja: {e}")
             return None
 
+    @timed_run('stock_update')
     def run_stock_update(self):
-        """Glavna funkcija za pokretanje stock update-a"""
+        """Glavna funkcija za pokretanje stock update-a - vraća True ako je Remiks prihvatio sve zalihe"""
         print("🔄 POKRETANJE STOCK UPDATE SINHRONIZACIJE")
         print("=" * 50)
 
         # 1. Čita Excel fajl sa zalihama
-        stock_df = self.read_stock_excel()
+        with self.metrics.stage('read_excel'):
+            stock_df = self.read_stock_excel()
         if stock_df is None:
-            return
+            return False
 
-        # 2. Pronalazi najnoviji JSON fajl
-        json_file_path = self.find_latest_json_product_file()
-        if json_file_path is None:
-            return
-
-        # 3. Učitava podatke o proizvodima
-        products_dict = self.load_product_data_from_json(json_file_path)
+        # 2-3. Pronalazi najnoviji JSON fajl i učitava podatke o proizvodima (keš dok se fajl ne promeni)
+        with self.metrics.stage('load_products'):
+            products_dict = self.load_latest_products_cached()
         if products_dict is None:
-            return
+            return False
 
         # 4. Kombinuje podatke
-        combined_data = self.combine_stock_with_product_data(stock_df, products_dict)
+        with self.metrics.stage('combine'):
+            combined_data = self.combine_stock_with_product_data(stock_df, products_dict)
         if not combined_data:
             print("❌ Nema podataka za slanje")
-            return
+            return False
 
-        # 5. Čuva JSON payload
-        json_filename = self.save_json_payload(combined_data)
+        # 5-6. Čuva JSON payload i kreira Excel izveštaj
+        json_filename = excel_filename = None
+        if self.save_artifacts:
+            with self.metrics.stage('json_dump'):
+                json_filename = self.save_json_payload(combined_data)
 
-        # 6. Kreira Excel izveštaj
-        excel_filename = self.create_excel_report(combined_data)
+            with self.metrics.stage('excel_report'):
+                excel_filename = self.create_excel_report(combined_data)
 
-        # 7. Dobija JWT token
-        jwt_token = self.get_jwt_token()
+        # 7. Dobija JWT token (ponovo koristi keširani ako nije istekao)
+        with self.metrics.stage('login'):
+            jwt_token = self.token_cache.get()
         if not jwt_token:
             print("❌ Nije moguće dobiti JWT token")
-            return
+            return False
 
         # 8. Šalje podatke na remiks
         print(f"📤 Slanje {len(combined_data)} proizvoda na remiks servis...")
-        response = self.send_request_to_remiks(combined_data, jwt_token)
+        with self.metrics.stage('upload'):
+            response = self.send_request_to_remiks(combined_data, jwt_token)
+        if not response:
+            self.token_cache.invalidate()
 
+        success = bool(response) and not response.get('errors', [])
         if response:
-            if not response.get('errors', []):
+            if success:
                 print("✅ Uspešno poslano na remiks servis!")
             else:
                 print("❌ Remiks servis vratio greške:")
@@ -334,14 +356,218 @@ class StockUpdateScript:
         print(f"  - Poslano proizvoda: {len(combined_data)}")
         print(f"  - JSON saved: {json_filename}")
         print(f"  - Excel report: {excel_filename}")
+        return success
 
     def send_request_to_remiks(self, payload, token):
         """Wrapper za send_stock_to_remiks"""
         return self.send_stock_to_remiks(payload, token)
 
+    def load_latest_products_cached(self):
+        """Vraća proizvode iz najnovijeg JSON fajla - ponovo čita samo ako se fajl promenio"""
+        json_file_path = self.find_latest_json_product_file()
+        if json_file_path is None:
+            return None
+
+        mtime = os.path.getmtime(json_file_path)
+        if self.products_cache and self.products_cache[:2] == (json_file_path, mtime):
+            return self.products_cache[2]
+
+        products_dict = self.load_product_data_from_json(json_file_path)
+        if products_dict is not None:
+            self.products_cache = (json_file_path, mtime, products_dict)
+        return products_dict
+
+    def load_snapshot(self):
+        """Učitava poslednje poslato stanje po SKU (prazno ako snapshot ne postoji)"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_snapshot(self, snapshot):
+        """Čuva snapshot atomično (temp fajl + rename)"""
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def diff_against_snapshot(self, combined_data, snapshot):
+        """Vraća samo proizvode čije se zalihe ili cene razlikuju od poslednjeg slanja"""
+        return [product for product in combined_data if snapshot.get(product['sku']) != product]
+
+    def removed_products(self, excel_path, current_skus, snapshot):
+        """SKU koji su bili u prethodnoj verziji istog fajla, a sada ih nema - šalju se sa qty 0
+
+        SKU koji se u međuvremenu pojavio u drugom praćenom fajlu se ne dira.
+        """
+        files = snapshot.get(SNAPSHOT_FILES_KEY, {})
+        name = os.path.basename(excel_path)
+        in_other_files = {sku for other, skus in files.items() if other != name for sku in skus}
+
+        removed = []
+        for sku in files.get(name, []):
+            if sku in current_skus or sku in in_other_files or sku not in snapshot:
+                continue
+            product = dict(snapshot[sku])
+            product['stock'] = {size: {warehouse: 0 for warehouse in warehouses}
+                                for size, warehouses in product['stock'].items()}
+            removed.append(product)
+        return removed
+
+    def rejected_skus(self, response, products):
+        """SKU koje Remiks navodi u greškama; ako greška ne navodi SKU, ceo batch se smatra odbijenim
+
+        SKU se traži kao cela reč teksta greške - 'AB-1' ne odbija i 'AB-10'.
+        """
+        skus = {product['sku'] for product in products}
+        rejected = set()
+        for error in response.get('errors', []):
+            if isinstance(error, dict) and error.get('sku') in skus:
+                rejected.add(error['sku'])
+                continue
+            named = skus & {token.rstrip('.') for token in _ERROR_TOKEN.findall(str(error))}
+            if not named:
+                return skus
+            rejected |= named
+        return rejected
+
+    @timed_run('stock_watch')
+    def push_stock_changes(self, excel_path, snapshot):
+        """Obrađuje jedan Excel fajl i šalje samo promenjene SKU - vraća False ako treba pokušati ponovo"""
+        with self.metrics.stage('read_excel'):
+            stock_df = self.read_stock_excel(excel_path)
+        if stock_df is None:
+            # Fajl je možda još uvek u procesu upisa
+            return False
+
+        with self.metrics.stage('load_products'):
+            products_dict = self.load_latest_products_cached()
+        if products_dict is None:
+            return False
+
+        with self.metrics.stage('combine'):
+            combined_data = self.combine_stock_with_product_data(stock_df, products_dict)
+            current_skus = {str(sku) for sku in stock_df['SKU'].unique()}
+            removed = self.removed_products(excel_path, current_skus, snapshot)
+            changed = self.diff_against_snapshot(combined_data + removed, snapshot)
+
+        if removed:
+            print(f"🗑️  {os.path.basename(excel_path)}: {len(removed)} SKU više nije u fajlu - šalje se qty 0")
+        if not changed:
+            self.remember_file_skus(excel_path, current_skus, snapshot)
+            self.save_snapshot(snapshot)
+            print(f"✅ {os.path.basename(excel_path)}: nema promena zaliha")
+            return True
+
+        print(f"📤 {os.path.basename(excel_path)}: slanje {len(changed)} promenjenih od {len(combined_data)} proizvoda...")
+        with self.metrics.stage('json_dump'):
+            self.save_json_payload(changed)
+
+        with self.metrics.stage('login'):
+            jwt_token = self.token_cache.get()
+        if not jwt_token:
+            print("❌ Nije moguće dobiti JWT token")
+            return False
+
+        with self.metrics.stage('upload'):
+            response = self.send_request_to_remiks(changed, jwt_token)
+        if not response:
+            # Token je možda istekao pre roka - sledeći pokušaj radi novi login
+            self.token_cache.invalidate()
+            print("❌ Greška pri slanju na remiks servis")
+            return False
+
+        rejected = set()
+        if response.get('errors', []):
+            print("❌ Remiks servis vratio greške:")
+            self.log_errors(response)
+            for error in response.get('errors', []):
+                print(f"  - {error}")
+            rejected = self.rejected_skus(response, changed)
+            print(f"⚠️  {len(rejected)} SKU ostaje van snapshot-a i šalje se ponovo pri sledećoj obradi")
+        else:
+            print("✅ Uspešno poslano na remiks servis!")
+
+        # Odbijeni SKU se ne upisuju, pa se i dalje razlikuju od snapshot-a
+        for product in changed:
+            if product['sku'] not in rejected:
+                snapshot[product['sku']] = product
+        # Odbijeni uklonjeni SKU ostaju vezani za fajl, da bi se qty 0 poslao ponovo
+        removed_skus = {product['sku'] for product in removed}
+        self.remember_file_skus(excel_path, current_skus | (removed_skus & rejected), snapshot)
+        self.save_snapshot(snapshot)
+        return True
+
+    def remember_file_skus(self, excel_path, skus, snapshot):
+        """Pamti koje SKU fajl sadrži (za removed_products pri sledećoj verziji fajla)"""
+        snapshot.setdefault(SNAPSHOT_FILES_KEY, {})[os.path.basename(excel_path)] = sorted(skus)
+
+    def get_watched_files(self, watch_dir):
+        """Vraća potpis (mtime, size) za sve Excel fajlove u direktorijumu"""
+        signatures = {}
+        for filename in os.listdir(watch_dir):
+            if filename.startswith(('~$', '.')) or not filename.endswith(('.xlsx', '.xls')):
+                continue
+            path = os.path.join(watch_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (stat.st_mtime, stat.st_size)
+        return signatures
+
+    def watch_stock_folder(self, interval=2.0, debounce=3.0, max_cycles=None):
+        """Prati zalihe/ folder i šalje samo promenjene SKU čim se novi fajl završi sa upisom
+
+        Fajl se obrađuje tek kada mu se mtime i veličina ne menjaju `debounce` sekundi,
+        tako da se delimično upisani fajlovi iz ERP-a ne čitaju.
+        """
+        watch_dir = os.path.dirname(os.path.join(self.project_root, self.excel_file_path))
+        os.makedirs(watch_dir, exist_ok=True)
+
+        print(f"👀 Praćenje foldera {watch_dir} (interval {interval}s, debounce {debounce}s) - Ctrl+C za izlaz")
+
+        snapshot = self.load_snapshot()
+        processed = {}  # putanja -> potpis poslednje uspešne obrade
+        pending = {}  # putanja -> (potpis, vreme poslednje promene)
+        cycles = 0
+
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                cycles += 1
+                now = time.monotonic()
+
+                for path, signature in self.get_watched_files(watch_dir).items():
+                    if processed.get(path) == signature:
+                        continue
+
+                    if path not in pending or pending[path][0] != signature:
+                        pending[path] = (signature, now)
+                        continue
+
+                    if now - pending[path][1] < debounce:
+                        continue
+
+                    started = time.monotonic()
+                    if self.push_stock_changes(path, snapshot):
+                        processed[path] = signature
+                        del pending[path]
+                        print(f"⏱️  Obrada završena za {time.monotonic() - started:.2f}s")
+                    else:
+                        # Pokušava ponovo posle novog debounce perioda
+                        pending[path] = (signature, now)
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nPraćenje zaustavljeno")
+
 
 def create_sample_excel():
     """Kreira primer Excel fajla za testiranje"""
+    import pandas as pd
+
     sample_data = [
         {'SKU': 'TEST001', 'SIZE': '6', 'WAREHOUSE': '10-GLAVNI MAGACIN', 'QTY': 5},
         {'SKU': 'TEST001', 'SIZE': '8', 'WAREHOUSE': '10-GLAVNI MAGACIN', 'QTY': 3},
@@ -362,28 +588,45 @@ def create_sample_excel():
 
 
 if __name__ == "__main__":
-    print("STOCK UPDATE SCRIPT")
-    print("=" * 30)
-    print("1. Pokreni stock update")
-    print("2. Kreiraj primer Excel fajla")
-    print("3. Exit")
+    parser = argparse.ArgumentParser(description='Stock Update Script')
+    parser.add_argument('--watch', action='store_true',
+                        help='Prati zalihe/ folder i šalje samo promenjene SKU')
+    parser.add_argument('--interval', type=float, default=2.0, help='Interval provere foldera u sekundama')
+    parser.add_argument('--debounce', type=float, default=3.0,
+                        help='Koliko sekundi fajl mora biti nepromenjen pre obrade')
+    parser.add_argument('--columnar', choices=['parquet', 'csv'],
+                        help='Pored Excel izveštaja upiši i Parquet/csv.gz tabele (proizvodi, zalihe)')
+    args = parser.parse_args()
+
+    if args.columnar:
+        os.environ['EXPORT_COLUMNAR'] = args.columnar
+
+    if args.watch:
+        # Dugotrajni watch mod - proces i keš ostaju aktivni između fajlova
+        StockUpdateScript().watch_stock_folder(interval=args.interval, debounce=args.debounce)
+    else:
+        print("STOCK UPDATE SCRIPT")
+        print("=" * 30)
+        print("1. Pokreni stock update")
+        print("2. Kreiraj primer Excel fajla")
+        print("3. Exit")
 
-    choice = input("\nIzaberite opciju (1-3): ").strip()
+        choice = input("\nIzaberite opciju (1-3): ").strip()
 
-    if choice == "1":
-        # Stock update
-        updater = StockUpdateScript()
-        updater.run_stock_update()
+        if choice == "1":
+            # Stock update
+            updater = StockUpdateScript()
+            updater.run_stock_update()
 
-    elif choice == "2":
-        # Kreiranje primer fajla
-        try:
-            create_sample_excel()
-        except Exception as e:
-            print(f"❌ Greška pri kreiranju primer fajla: {e}")
+        elif choice == "2":
+            # Kreiranje primer fajla
+            try:
+                create_sample_excel()
+            except Exception as e:
+                print(f"❌ Greška pri kreiranju primer fajla: {e}")
 
-    elif choice == "3":
-        print("Izlaz...")
+        elif choice == "3":
+            print("Izlaz...")
 
-    else:
-        print("❌ Nevalidna opcija")
\ No newline at end of file
+        else:
+            print("❌ Nevalidna opcija")
\ No newline at end of file
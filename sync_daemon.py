@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class SingleInstanceLock:
+    """Lock fajl sa PID-om - sprečava da dva daemon-a rade istovremeno
+
+    Na POSIX sistemima koristi flock (lock se automatski oslobađa ako proces padne),
+    a na ostalim ekskluzivno kreiranje fajla uz proveru da li je stari PID još živ.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def acquire(self):
+        """Vraća True ako je lock dobijen, False ako već radi druga instanca"""
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self.fd)
+                self.fd = None
+                return False
+            os.ftruncate(self.fd, 0)
+            os.write(self.fd, str(os.getpid()).encode('ascii'))
+            return True
+
+        try:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            if self._lock_owner_alive():
+                return False
+            # Zaostali lock od procesa koji više ne postoji
+            os.remove(self.path)
+            return self.acquire()
+        os.write(self.fd, str(os.getpid()).encode('ascii'))
+        return True
+
+    def _lock_owner_alive(self):
+        try:
+            with open(self.path, 'r') as f:
+                pid = int(f.read().strip() or 0)
+            os.kill(pid, 0)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def release(self):
+        if self.fd is None:
+            return
+        os.close(self.fd)
+        self.fd = None
+        if fcntl is not None:
+            # flock lock fajl ostaje - brisanje bi dozvolilo da dva procesa drže lock nad različitim inode-ima
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SyncJob:
+    """Jedan periodični posao (npr. sinhronizacija proizvoda) sa statistikom poslednjeg izvršavanja"""
+
+    def __init__(self, name, interval, run):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.next_run = time.monotonic()
+        self.runs = 0
+        self.failures = 0
+        self.last_started_at = None
+        self.last_duration = None
+        self.last_error = None
+
+    def execute(self):
+        self.last_started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        started = time.monotonic()
+        try:
+            # run_* metode same hvataju greške i vraćaju False kada sinhronizacija nije uspela
+            if self.run() is False:
+                self.failures += 1
+                self.last_error = 'sinhronizacija nije uspela (detalji u logu)'
+                print(f"❌ Posao {self.name} nije uspeo")
+            else:
+                self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"❌ Greška u poslu {self.name}: {e}")
+        finally:
+            self.runs += 1
+            self.last_duration = round(time.monotonic() - started, 3)
+            # Ako je posao trajao duže od intervala, ne pokušava da nadoknadi propuštene cikluse
+            self.next_run = max(self.next_run + self.interval, time.monotonic())
+
+    def status(self):
+        return {
+            'interval_seconds': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_started_at': self.last_started_at,
+            'last_duration_seconds': self.last_duration,
+            'last_error': self.last_error,
+            'next_run_in_seconds': round(max(self.next_run - time.monotonic(), 0), 1),
+        }
+
+
+class SyncDaemon:
+    """Pokreće sinhronizacije u zadatim intervalima u jednom procesu
+
+    Objekti za sinhronizaciju se kreiraju jednom, tako da HTTP sesije, JWT token
+    i učitani JSON ostaju u memoriji između ciklusa. Poslovi se izvršavaju
+    redom u jednoj niti, pa se sinhronizacija proizvoda i zaliha nikad ne preklapaju.
+    """
+
+    def __init__(self, product_interval=None, stock_interval=None, status_file='sync_daemon_status.json',
+                 keep_stock_artifacts=False):
+        self.status_file = status_file
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.stop_event = threading.Event()
+        self.jobs = []
+
+        if product_interval:
+            from WooCommerceToRemiks import WooCommerceToRemiks
+            product_sync = WooCommerceToRemiks()
+            self.jobs.append(SyncJob('products', product_interval, product_sync.run_sync))
+
+        if stock_interval:
+            from stock_update import StockUpdateScript
+            stock_sync = StockUpdateScript()
+            # Payload JSON i Excel izveštaj na svakih nekoliko minuta samo pune root folder
+            stock_sync.save_artifacts = keep_stock_artifacts
+            self.jobs.append(SyncJob('stock', stock_interval, stock_sync.run_stock_update))
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'jobs': {job.name: job.status() for job in self.jobs},
+        }
+
+    def write_status(self):
+        """Upisuje status atomično da ga spoljni alati nikad ne pročitaju napola upisanog"""
+        tmp_path = self.status_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.status(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.status_file)
+
+    def run(self):
+        print(f"🔄 Sync daemon pokrenut (PID {os.getpid()}): "
+              + ", ".join(f"{job.name} svakih {job.interval}s" for job in self.jobs))
+        self.write_status()
+
+        while not self.stop_event.is_set():
+            job = min(self.jobs, key=lambda j: j.next_run)
+            wait = job.next_run - time.monotonic()
+            if wait > 0:
+                self.stop_event.wait(wait)
+                continue
+
+            print(f"\n▶️  Pokretanje posla: {job.name}")
+            job.execute()
+            print(f"⏱️  Posao {job.name} završen za {job.last_duration}s")
+            self.write_status()
+
+        print("Sync daemon zaustavljen")
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def serve_status(self, port, host='127.0.0.1'):
+        """Pokreće mali HTTP endpoint koji vraća status kao JSON (GET /status)"""
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                out = json.dumps(daemon.status(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), StatusHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Status endpoint: http://{host}:{server.server_port}/status")
+        return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sync daemon - periodična sinhronizacija u jednom procesu')
+    parser.add_argument('--product-interval', type=float, default=3600,
+                        help='Interval sinhronizacije proizvoda u sekundama (0 = isključeno)')
+    parser.add_argument('--stock-interval', type=float, default=300,
+                        help='Interval stock update-a u sekundama (0 = isključeno)')
+    parser.add_argument('--lock-file', default='sync_daemon.lock', help='Putanja do lock fajla')
+    parser.add_argument('--status-file', default='sync_daemon_status.json', help='Putanja do status fajla')
+    parser.add_argument('--status-port', type=int, default=None, help='Port za HTTP status endpoint (opciono)')
+    parser.add_argument('--keep-stock-artifacts', action='store_true',
+                        help='Čuvaj payload_stock_update_*.json i stock_update_report_*.xlsx pri svakom stock ciklusu')
+    args = parser.parse_args()
+
+    lock = SingleInstanceLock(args.lock_file)
+    if not lock.acquire():
+        print(f"❌ Druga instanca daemon-a već radi (lock: {args.lock_file})")
+        sys.exit(1)
+
+    try:
+        sync_daemon = SyncDaemon(args.product_interval, args.stock_interval, args.status_file,
+                                 args.keep_stock_artifacts)
+        if not sync_daemon.jobs:
+            print("❌ Nijedan posao nije uključen")
+            sys.exit(1)
+
+        signal.signal(signal.SIGTERM, sync_daemon.stop)
+        signal.signal(signal.SIGINT, sync_daemon.stop)
+
+        if args.status_port is not None:
+            sync_daemon.serve_status(args.status_port)
+
+        sync_daemon.run()
+    finally:
+        lock.release()
@@ -0,0 +1,253 @@
+import functools
+import json
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PERCENTILES = (50, 90, 95, 99)
+
+# Numerički delovi putanje (/products/123/variations) se spajaju u jedan endpoint
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_name(method, url):
+    """Normalizuje URL u ime endpoint-a: 'GET www.bambini.rs/wp-json/wc/v3/products/{id}/variations'"""
+    parsed = urlparse(url)
+    return f"{method} {parsed.netloc}{_ID_SEGMENT.sub('/{id}', parsed.path)}"
+
+
+def percentile(sorted_values, p):
+    """Percentil metodom najbližeg ranga (vrednosti moraju biti sortirane)"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def timed_run(run_name):
+    """Dekorator za glavne run_* metode - meri ceo run i upisuje metrike na kraju"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.run(run_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SyncMetrics:
+    """Meri trajanje imenovanih faza i HTTP zahteve po endpoint-u za jedan sync run
+
+    Faze mogu biti ugnježdene (npr. fetch_variations unutar transform) - za svaku
+    se beleži ukupno vreme i sopstveno vreme bez ugnježdenih faza. Rezultat svakog
+    run-a se dodaje u JSON lines fajl i upisuje u Prometheus textfile format.
+    """
+
+    def __init__(self, metrics_dir=None):
+        self.run_name = None
+        self.metrics_dir = metrics_dir or os.getenv('METRICS_DIR', os.path.join(SCRIPT_DIR, 'metrics'))
+        self.profiler = None
+        self.lock = threading.Lock()
+
+        # Profilisanje po fazama se uključuje preko --profile / --trace-memory (remiks_cli.py)
+        profile_cpu = os.getenv('SYNC_PROFILE') == '1'
+        trace_memory = os.getenv('SYNC_TRACE_MEMORY') == '1'
+        if profile_cpu or trace_memory:
+            from stage_profiler import StageProfiler
+            self.profiler = StageProfiler(cpu=profile_cpu, memory=trace_memory)
+
+        self.reset()
+
+    def reset(self):
+        self.started_at = None
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.endpoints = {}
+        self.cache = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        """Meri jednu fazu; ponovljeni pozivi iste faze se sabiraju"""
+        frame = [name, time.perf_counter(), 0.0]  # ime, početak, vreme ugnježdenih faza
+        self._stack.append(frame)
+        if self.profiler is not None:
+            self.profiler.start_stage(name)
+        try:
+            yield
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop_stage(name)
+            elapsed = time.perf_counter() - frame[1]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+            stats = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            stats['self_seconds'] += elapsed - frame[2]
+
+    @contextmanager
+    def run(self, run_name):
+        """Obuhvata ceo sync run - resetuje brojače na početku i upisuje metrike na kraju"""
+        self.reset()
+        self.run_name = run_name
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            yield self
+        finally:
+            self.finish()
+
+    def attach(self, session):
+        """Dodaje response hook na requests.Session tako da se svaki zahtev automatski broji"""
+        session.hooks['response'].append(self.record_response)
+
+    def record_response(self, response, *args, **kwargs):
+        request = response.request
+        name = endpoint_name(request.method, request.url)
+        body = request.body or b''
+        bytes_sent = len(body.encode('utf-8') if isinstance(body, str) else body)
+
+        # HTTP keš (http_cache.py): telo pogotka je stiglo sa diska, mrežom je prošao samo 304
+        from_cache = getattr(response, 'from_cache', None)
+        # Kod stream=True telo se ne čita ovde da ne bi poremetili streaming
+        if kwargs.get('stream'):
+            bytes_received = int(response.headers.get('Content-Length', 0) or 0)
+        elif not from_cache:
+            bytes_received = len(response.content)
+        else:
+            bytes_received = 0
+        bytes_saved = len(response.content) if from_cache else 0
+
+        # Hook se poziva i iz thread pool-a (image_downloader) - brojači se menjaju pod lock-om
+        with self.lock:
+            stats = self.endpoints.setdefault(name, {
+                'requests': 0, 'errors': 0,
+                'bytes_sent': 0, 'bytes_received': 0, 'latencies': [],
+            })
+            stats['requests'] += 1
+            if response.status_code >= 400:
+                stats['errors'] += 1
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+            stats['latencies'].append(response.elapsed.total_seconds())
+
+            if from_cache:
+                self.cache['hits'] += 1
+                self.cache['bytes_saved'] += bytes_saved
+            elif from_cache is False:
+                self.cache['misses'] += 1
+        return response
+
+    def summary(self):
+        with self.lock:
+            snapshot = {name: dict(stats, latencies=list(stats['latencies'])) for name, stats in self.endpoints.items()}
+            cache = dict(self.cache)
+        endpoints = {}
+        for name, stats in snapshot.items():
+            latencies = sorted(stats['latencies'])
+            endpoint = {key: value for key, value in stats.items() if key != 'latencies'}
+            for p in PERCENTILES:
+                endpoint[f'latency_p{p}'] = round(percentile(latencies, p), 4)
+            endpoint['latency_max'] = round(latencies[-1], 4) if latencies else 0.0
+            endpoints[name] = endpoint
+
+        return {
+            'run': self.run_name,
+            'started_at': self.started_at,
+            'duration_seconds': round(time.perf_counter() - self.started, 4),
+            'stages': {name: {key: round(value, 4) if isinstance(value, float) else value
+                              for key, value in stats.items()}
+                       for name, stats in self.stages.items()},
+            'http': endpoints,
+            'http_cache': cache,
+        }
+
+    def finish(self):
+        """Ispisuje kratak pregled i upisuje JSON lines + Prometheus fajl"""
+        summary = self.summary()
+        self.print_summary(summary)
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            self.write_jsonl(summary)
+            self.write_prometheus(summary)
+        except OSError as e:
+            print(f"Greška pri upisu metrika: {e}")
+        if self.profiler is not None:
+            self.profiler.write_reports(self.run_name)
+        return summary
+
+    def print_summary(self, summary):
+        print(f"\n⏱️  Trajanje po fazama ({summary['run']}, ukupno {summary['duration_seconds']:.2f}s):")
+        for name, stats in summary['stages'].items():
+            print(f"  - {name}: {stats['seconds']:.3f}s (sopstveno {stats['self_seconds']:.3f}s, poziva {stats['calls']})")
+        for name, stats in summary['http'].items():
+            print(f"  - {name}: {stats['requests']} zahteva, {stats['bytes_received']} B, "
+                  f"p50 {stats['latency_p50']:.3f}s, p95 {stats['latency_p95']:.3f}s")
+        cache = summary['http_cache']
+        if cache['hits'] or cache['misses']:
+            print(f"  - HTTP keš: {cache['hits']} pogodaka, {cache['misses']} promašaja, "
+                  f"{cache['bytes_saved']} B nije preneto")
+
+    def write_jsonl(self, summary):
+        path = os.path.join(self.metrics_dir, 'sync_runs.jsonl')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+
+    def write_prometheus(self, summary):
+        """Upisuje metrike za node_exporter textfile collector (atomično, temp + rename)"""
+        run = summary['run']
+        lines = [
+            '# HELP remiks_sync_run_duration_seconds Trajanje poslednjeg sync run-a',
+            '# TYPE remiks_sync_run_duration_seconds gauge',
+            f'remiks_sync_run_duration_seconds{{run="{run}"}} {summary["duration_seconds"]}',
+            '# HELP remiks_sync_last_run_timestamp_seconds Vreme završetka poslednjeg sync run-a',
+            '# TYPE remiks_sync_last_run_timestamp_seconds gauge',
+            f'remiks_sync_last_run_timestamp_seconds{{run="{run}"}} {int(time.time())}',
+            '# HELP remiks_sync_stage_seconds Trajanje faze u poslednjem run-u',
+            '# TYPE remiks_sync_stage_seconds gauge',
+        ]
+        for name, stats in summary['stages'].items():
+            lines.append(f'remiks_sync_stage_seconds{{run="{run}",stage="{name}"}} {stats["seconds"]}')
+
+        http_metrics = (
+            ('requests', 'remiks_sync_http_requests', 'Broj HTTP zahteva po endpoint-u'),
+            ('errors', 'remiks_sync_http_errors', 'Broj HTTP odgovora sa statusom >= 400'),
+            ('bytes_sent', 'remiks_sync_http_bytes_sent', 'Poslati bajtovi'),
+            ('bytes_received', 'remiks_sync_http_bytes_received', 'Primljeni bajtovi'),
+        )
+        for key, metric, help_text in http_metrics:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for endpoint, stats in summary['http'].items():
+                lines.append(f'{metric}{{run="{run}",endpoint="{endpoint}"}} {stats[key]}')
+
+        lines.append('# HELP remiks_sync_http_latency_seconds Latencija HTTP zahteva po endpoint-u')
+        lines.append('# TYPE remiks_sync_http_latency_seconds gauge')
+        for endpoint, stats in summary['http'].items():
+            for p in PERCENTILES:
+                lines.append(f'remiks_sync_http_latency_seconds{{run="{run}",endpoint="{endpoint}",'
+                             f'quantile="{p / 100}"}} {stats[f"latency_p{p}"]}')
+
+        cache_metrics = (
+            ('hits', 'remiks_sync_http_cache_hits', 'Odgovori posluženi iz HTTP keša posle 304'),
+            ('misses', 'remiks_sync_http_cache_misses', 'GET zahtevi koji nisu pogodili HTTP keš'),
+            ('bytes_saved', 'remiks_sync_http_cache_bytes_saved', 'Bajtovi tela koji nisu preneti zahvaljujući kešu'),
+        )
+        for key, metric, help_text in cache_metrics:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric}{{run="{run}"}} {summary["http_cache"][key]}')
+
+        path = os.path.join(self.metrics_dir, f'remiks_sync_{run}.prom')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
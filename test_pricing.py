@@ -0,0 +1,66 @@
+import pytest
+
+from pricing import PricingRules, compute_prices, frame_prices, price_list
+
+RULE_VARIABLES = ('PRICE_VAT', 'PRICE_INVOICE_FACTOR', 'PRICE_DECIMALS', 'PRICE_NET_DECIMALS')
+
+
+@pytest.fixture(autouse=True)
+def default_rules(monkeypatch):
+    """Testovi proveravaju podrazumevana pravila - PRICE_* iz okruženja se ne koriste"""
+    for source in ('', 'EXCEL_', 'EXCEL_STOCK_', 'WOOCOMMERCE_'):
+        for variable in RULE_VARIABLES:
+            monkeypatch.delenv(variable.replace('PRICE_', 'PRICE_' + source), raising=False)
+
+
+def test_source_rules():
+    excel = PricingRules.for_source('excel')
+    assert (excel.vat, excel.invoice_factor, excel.decimals, excel.net_decimals) == (20.0, 0.8, 2, 2)
+    stock = PricingRules.for_source('excel_stock')
+    assert (stock.vat, stock.invoice_factor, stock.decimals, stock.net_decimals) == (20.0, 0.8, 2, 0)
+    woocommerce = PricingRules.for_source('woocommerce')
+    assert (woocommerce.vat, woocommerce.invoice_factor, woocommerce.decimals) == (20.0, 0.82, 2)
+
+
+def test_source_override(monkeypatch):
+    monkeypatch.setenv('PRICE_INVOICE_FACTOR', '0.85')
+    monkeypatch.setenv('PRICE_WOOCOMMERCE_INVOICE_FACTOR', '0.8')
+    assert PricingRules.for_source('excel').invoice_factor == 0.85
+    assert PricingRules.for_source('woocommerce').invoice_factor == 0.8
+
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        PricingRules.for_source('informix')
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('excel', [(1990.6, 1490.0, 993.33), (2490.0, 2490.0, 1660.0)]),
+    ('excel_stock', [(1991.0, 1490.0, 993.33), (2490.0, 2490.0, 1660.0)]),
+    ('woocommerce', [(1990.6, 1490.0, 1018.17), (2490.0, 2490.0, 1701.5)]),
+])
+def test_baseline_prices(source, expected):
+    assert price_list(['1990.6', 2490], ['1490', None], rules=PricingRules.for_source(source)) == expected
+
+
+def test_compute_prices_empty_and_invalid():
+    net, sale, invoice = compute_prices(['', None, 'abc', 1200], [None, '0', '', float('nan')],
+                                        rules=PricingRules.for_source('excel'))
+    assert net.tolist() == [0.0, 0.0, 0.0, 1200.0]
+    assert sale.tolist() == [0.0, 0.0, 0.0, 1200.0]
+    assert invoice.tolist() == [0.0, 0.0, 0.0, 800.0]
+
+
+def test_vat_column():
+    rules = PricingRules.for_source('excel')
+    assert price_list([1500], vat=[10], rules=rules) == [(1500.0, 1500.0, 1090.91)]
+    assert price_list([1500], rules=rules) == [(1500.0, 1500.0, 1000.0)]
+
+
+def test_frame_prices_ignores_sheet_vat():
+    import pandas as pd
+
+    df = pd.DataFrame({'RETAIL_PRICE': [1500, 1990], 'SPECIAL_PRICE': [None, 1490], 'VAT': [10, 20]})
+    rules = PricingRules.for_source('excel')
+    assert frame_prices(df, rules=rules) == [(1500.0, 1500.0, 1000.0), (1990.0, 1490.0, 993.33)]
+    assert frame_prices(df, vat='VAT', rules=rules)[0] == (1500.0, 1500.0, 1090.91)
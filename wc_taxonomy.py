@@ -0,0 +1,126 @@
+import re
+import time
+
+# Nazivi se porede bez dijakritika i velikih slova: 'Dečaci', 'DECACI' i 'decaci' su isto
+_TRANSLITERATION = str.maketrans({'š': 's', 'đ': 'dj', 'č': 'c', 'ć': 'c', 'ž': 'z'})
+
+# Korenovi reči, tako da se prepoznaju i jednina/množina ('Majica', 'Majice', 'Šorc', 'Šorcevi')
+GENDER_PATTERNS = (
+    ('M', re.compile(r'(?<![a-z])(decak|decac|boys?\b|musk)')),
+    ('F', re.compile(r'(?<![a-z])(devojcic|girls?\b|zensk)')),
+)
+CATEGORY_PATTERNS = (
+    ('SETOVI', re.compile(r'(?<![a-z])(set|komplet)')),
+    ('DUKSEVI', re.compile(r'(?<![a-z])(duks|dzemper|hoodie)')),
+    ('MAJICE', re.compile(r'(?<![a-z])(majic|t-?shirt)')),
+    ('ŠORCEVI', re.compile(r'(?<![a-z])(sorc|bermud|shorts)')),
+    ('PANTALONE', re.compile(r'(?<![a-z])(pantalon|farmerk|pants)')),
+    ('JAKNE', re.compile(r'(?<![a-z])(jakn|jacket)')),
+    ('TRENERKE', re.compile(r'(?<![a-z])trenerk')),
+)
+SEASON_TERMS = (
+    ('LETO 2025', ('leto', 'summer', 'spring', 'prolece')),
+    ('ZIMA 2025', ('zima', 'winter', 'jesen', 'autumn')),
+)
+
+# Redosled prioriteta kada proizvod ima više kategorija (isti kao u map_product_category)
+CATEGORY_PRIORITY = [name for name, _ in CATEGORY_PATTERNS]
+SEASON_PRIORITY = [name for name, _ in SEASON_TERMS]
+
+
+def normalize_term(name):
+    return (name or '').lower().translate(_TRANSLITERATION)
+
+
+def classify_term(name):
+    """(pol, kategorija, sezona) iz naziva jedne kategorije ili taga - None za ono što naziv ne određuje"""
+    text = normalize_term(name)
+    gender = next((code for code, pattern in GENDER_PATTERNS if pattern.search(text)), None)
+    category = next((code for code, pattern in CATEGORY_PATTERNS if pattern.search(text)), None)
+    season = next((code for code, terms in SEASON_TERMS if any(term in text for term in terms)), None)
+    return gender, category, season
+
+
+def build_category_table(categories):
+    """ID kategorije -> (pol, kategorija, sezona), sa nasleđivanjem od roditelja
+
+    Podkategorija bez sopstvenog pola/kategorije/sezone preuzima vrednost najbližeg pretka
+    (npr. 'Kratki rukav' ispod 'Dečaci > Majice' postaje ('M', 'MAJICE', None)).
+    """
+    by_id = {category['id']: category for category in categories}
+    own = {category_id: classify_term(category.get('name')) for category_id, category in by_id.items()}
+    table = {}
+
+    def resolve(category_id, visiting=()):
+        if category_id in table:
+            return table[category_id]
+        values = own[category_id]
+        parent_id = by_id[category_id].get('parent')
+        if parent_id in by_id and parent_id not in visiting and None in values:
+            inherited = resolve(parent_id, visiting + (category_id,))
+            values = tuple(value if value is not None else parent_value
+                           for value, parent_value in zip(values, inherited))
+        table[category_id] = values
+        return values
+
+    for category_id in by_id:
+        resolve(category_id)
+    return table
+
+
+class Taxonomy:
+    """Unapred izračunato mapiranje WooCommerce kategorija i tagova po ID-u"""
+
+    def __init__(self, categories, tags):
+        self.categories = build_category_table(categories)
+        self.tag_seasons = {tag['id']: classify_term(tag.get('name'))[2] for tag in tags}
+
+    def covers(self, categories, tags):
+        """Da li su svi ID-jevi proizvoda poznati (nova kategorija posle keširanja -> False)"""
+        return (all(category.id in self.categories for category in categories)
+                and all(tag.id in self.tag_seasons for tag in tags))
+
+    def gender(self, category_ids):
+        genders = {self.categories[category_id][0] for category_id in category_ids}
+        if 'M' in genders:
+            return 'M'
+        if 'F' in genders:
+            return 'F'
+        return 'U'
+
+    def category(self, category_ids):
+        found = {self.categories[category_id][1] for category_id in category_ids}
+        return next((name for name in CATEGORY_PRIORITY if name in found), 'OSTALO')
+
+    def season(self, category_ids, tag_ids):
+        found = {self.categories[category_id][2] for category_id in category_ids}
+        found.update(self.tag_seasons[tag_id] for tag_id in tag_ids)
+        return next((name for name in SEASON_PRIORITY if name in found), 'UNIVERZALNO')
+
+
+class TaxonomyCache:
+    """Čuva Taxonomy u memoriji i ponovo dobija kategorije/tagove tek kada istekne ttl
+
+    fetch_taxonomy() vraća (kategorije, tagovi) ili None; ako osvežavanje ne uspe,
+    koristi se prethodna taksonomija (ili nijedna), a novi pokušaj je tek posle ttl.
+    """
+
+    def __init__(self, fetch_taxonomy, ttl=3600):
+        self.fetch_taxonomy = fetch_taxonomy
+        self.ttl = ttl
+        self.taxonomy = None
+        self.expires_at = 0
+
+    def get(self):
+        if time.time() < self.expires_at:
+            return self.taxonomy
+
+        fetched = self.fetch_taxonomy()
+        if fetched:
+            self.taxonomy = Taxonomy(*fetched)
+        self.expires_at = time.time() + self.ttl
+        return self.taxonomy
+
+    def invalidate(self):
+        self.taxonomy = None
+        self.expires_at = 0
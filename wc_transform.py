@@ -0,0 +1,294 @@
+from batch_sync import map_in_chunks
+from pricing import PricingRules, price_list
+from remiks_model import RemiksProduct, stock_levels
+
+
+class ProductMapper:
+    """Mapiranje WooCommerce proizvoda u Remiks format - bez mreže i stanja, pa radi i u worker procesima"""
+
+    def map_product_taxonomy(self, product_name, categories, tags, taxonomy=None):
+        """(pol, kategorija, sezona) proizvoda - po ID-u iz taksonomije, inače po nazivima"""
+        if taxonomy is None or not taxonomy.covers(categories, tags):
+            gender = self.map_gender_from_categories(categories)
+            return (gender, self.map_product_category(product_name, categories),
+                    self.extract_season_from_categories_or_tags(categories, tags))
+
+        category_ids = [category.id for category in categories]
+        tag_ids = [tag.id for tag in tags]
+        return (taxonomy.gender(category_ids),
+                self.map_category_from_name(product_name) or taxonomy.category(category_ids),
+                taxonomy.season(category_ids, tag_ids))
+
+    def map_gender_from_categories(self, categories):
+        """Mapira pol na osnovu kategorija - precizno za srpski"""
+        # Kombinuje sve kategorije u jedan string
+        all_categories = '; '.join([cat.name for cat in categories])
+        category_text = all_categories.lower()
+
+        print(f"Debug - kategorije: {all_categories}")
+
+        if 'dečaci' in category_text or 'decaci' in category_text:
+            return 'M'  # Muško
+        elif 'devojčice' in category_text or 'devojcice' in category_text:
+            return 'F'  # Žensko
+        elif any(term in category_text for term in ['unisex', 'baby', 'bebe', 'novorođenče', 'novorodenche']):
+            return 'U'  # Unisex
+        else:
+            return 'U'  # Default unisex
+
+    def extract_brand_from_name(self, product_name):
+        """Izvlači brend iz naziva proizvoda - precizno za bambini.rs"""
+        name_upper = product_name.upper()
+
+        print(f"Debug - naziv proizvoda: {product_name}")
+
+        # Lista brendova sa tačnim formatom
+        brand_patterns = [
+            'JACK & JONES',
+            'REEBOK',
+            'MESSI',
+            'VINGINO'
+        ]
+
+        # Traži brendove u redosledu (duži prvi)
+        for brand in brand_patterns:
+            if brand in name_upper:
+                print(f"Debug - pronađen brend: {brand}")
+                return brand
+
+        print(f"Debug - brend nije pronađen, koristi se GENERIC")
+        return 'GENERIC'  # Default brend
+
+    def map_category_from_name(self, product_name):
+        """Kategorija iz naziva proizvoda ili None"""
+        product_name_lower = product_name.lower()
+
+        if any(term in product_name_lower for term in ['set', 'komplet']):
+            return 'SETOVI'
+        elif any(term in product_name_lower for term in ['duks', 'hoodie', 'džemper', 'dzemper']):
+            return 'DUKSEVI'
+        elif any(term in product_name_lower for term in ['majica', 't-shirt', 'tshirt']):
+            return 'MAJICE'
+        elif any(term in product_name_lower for term in ['šorc', 'sorc', 'shorts', 'bermude']):
+            return 'ŠORCEVI'
+        elif any(term in product_name_lower for term in ['pantalone', 'pants', 'farmerke']):
+            return 'PANTALONE'
+        elif any(term in product_name_lower for term in ['jakna', 'jacket']):
+            return 'JAKNE'
+        elif any(term in product_name_lower for term in ['trenerk', 'komplet']):
+            return 'TRENERKE'
+        return None
+
+    def map_product_category(self, product_name, categories):
+        """Mapira kategoriju na osnovu naziva proizvoda i kategorija"""
+        all_categories = '; '.join([cat.name for cat in categories])
+        categories_lower = all_categories.lower()
+
+        print(f"Debug - kategorije za mapiranje: {all_categories}")
+        print(f"Debug - naziv za mapiranje: {product_name}")
+
+        # Mapiranje na osnovu naziva proizvoda (prioritet)
+        category_from_name = self.map_category_from_name(product_name)
+        if category_from_name:
+            return category_from_name
+
+        # Ako nije pronađeno u nazivu, traži u kategorijama
+        if any(term in categories_lower for term in ['setovi', 'kompleti']):
+            return 'SETOVI'
+        elif any(term in categories_lower for term in ['duksevi', 'džemperi', 'dzemper']):
+            return 'DUKSEVI'
+        elif 'majice' in categories_lower:
+            return 'MAJICE'
+        elif any(term in categories_lower for term in ['šorcevi', 'sorcevi', 'bermude']):
+            return 'ŠORCEVI'
+        elif 'pantalone' in categories_lower:
+            return 'PANTALONE'
+        elif 'jakne' in categories_lower:
+            return 'JAKNE'
+        elif any(term in categories_lower for term in ['trenerke', 'kompleti']):
+            return 'TRENERKE'
+
+        print(f"Debug - kategorija nije prepoznata, koristi se OSTALO")
+        return 'OSTALO'  # Default kategorija
+
+    def map_category_to_code(self, category_name, gender):
+        """Mapira kategoriju i pol u numerički kod"""
+        category_mapping = {
+            # Muške kategorije (1xxx)
+            'M': {
+                'TRENERKE': '1001',
+                'DUKSEVI': '1002',
+                'MAJICE': '1003',
+                'ŠORCEVI': '1004',
+                'PANTALONE': '1005',
+                'JAKNE': '1006',
+                'SETOVI': '1007',
+                'OSTALO': '1099'
+            },
+            # Ženske kategorije (2xxx)
+            'F': {
+                'TRENERKE': '2001',
+                'DUKSEVI': '2002',
+                'MAJICE': '2003',
+                'ŠORCEVI': '2004',
+                'PANTALONE': '2005',
+                'JAKNE': '2006',
+                'SETOVI': '2007',
+                'OSTALO': '2099'
+            },
+            # Unisex kategorije (3xxx)
+            'U': {
+                'TRENERKE': '3001',
+                'DUKSEVI': '3002',
+                'MAJICE': '3003',
+                'ŠORCEVI': '3004',
+                'PANTALONE': '3005',
+                'JAKNE': '3006',
+                'SETOVI': '3007',
+                'OSTALO': '3099'
+            }
+        }
+
+        code = category_mapping.get(gender, {}).get(category_name, '9999')
+        print(f"Debug - mapiranje kategorije: {category_name} + {gender} -> {code}")
+        return code
+
+    def extract_size_from_variation_attributes(self, variation):
+        """Izvlači veličinu iz atributa varijacije - format 'Veličina: 6' -> '6'"""
+        for attribute in variation.attributes:
+            attr_name = attribute.name.lower()
+            attr_option = attribute.option
+
+            # Proverava da li je atribut veličina
+            if any(size_term in attr_name for size_term in ['veličina', 'velicina', 'size']):
+                # Čisti veličinu - uklanja sve što nije broj/slovo
+                size_clean = attr_option.strip()
+                print(f"Debug - pronađena veličina: '{attr_option}' -> '{size_clean}'")
+                return size_clean
+
+        return None
+
+    def get_product_sizes_from_variations(self, variations):
+        """Dobija sve veličine iz varijanti proizvoda"""
+        sizes = []
+
+        for variation in variations:
+            size = self.extract_size_from_variation_attributes(variation)
+            if size and size not in sizes:
+                sizes.append(size)
+
+        print(f"Debug - sve pronađene veličine: {sizes}")
+        return sizes
+
+    def get_stock_data_from_variations(self, variations):
+        """Dobija podatke o stanju zaliha iz varijanti"""
+        stock_data = {}
+
+        for variation in variations:
+            # Dobija veličinu pomoću nove funkcije
+            size = self.extract_size_from_variation_attributes(variation)
+
+            if size:
+                stock_qty = variation.stock_quantity or 0
+                # Simulira magacin (možete prilagoditi prema vašim potrebama)
+                stock_data[size] = {
+                    '10-GLAVNI MAGACIN': stock_qty
+                }
+                print(f"Debug - stock za veličinu {size}: {stock_qty}")
+
+        return stock_data
+
+    def extract_season_from_categories_or_tags(self, categories, tags):
+        """Izvlači sezonu iz kategorija ili tagova"""
+        all_terms = [cat.name.lower() for cat in categories] + [tag.name.lower() for tag in tags]
+
+        if any('leto' in term or 'summer' in term or 'spring' in term or 'proleće' in term for term in all_terms):
+            return 'LETO 2025'
+        elif any('zima' in term or 'winter' in term or 'jesen' in term or 'autumn' in term for term in all_terms):
+            return 'ZIMA 2025'
+        else:
+            return 'UNIVERZALNO'
+
+    def build_product_info(self, wc_product, variations, taxonomy=None, prices=None):
+        """Pretvara jedan WcProduct (sa već dobijenim varijantama) u RemiksProduct - bez mreže
+
+        prices je (net_retail, sale, invoice) već izračunat za ceo deo kataloga (wc_prices);
+        bez njega se cene računaju samo za ovaj proizvod.
+        """
+        net_retail_price, sale_price, invoice_price = prices or wc_prices([wc_product])[0]
+        product_sizes = []
+        stock_data = {}
+
+        if wc_product.type == 'variable':
+            product_sizes = self.get_product_sizes_from_variations(variations)
+            stock_data = self.get_stock_data_from_variations(variations)
+        else:
+            # Jednostavan proizvod - pokušava da pronađe veličinu u atributima
+            for attribute in wc_product.attributes:
+                if 'size' in attribute.name.lower():
+                    product_sizes = list(attribute.options)
+                    break
+
+            # Stock za jednostavan proizvod
+            if product_sizes:
+                stock_qty = wc_product.stock_quantity or 0
+                for size in product_sizes:
+                    stock_data[size] = {'10-GLAVNI MAGACIN': stock_qty}
+
+        # Mapiranje pomoću novih funkcija
+        gender, product_category, season = self.map_product_taxonomy(wc_product.name, wc_product.categories,
+                                                                     wc_product.tags, taxonomy)
+        brand = self.extract_brand_from_name(wc_product.name)
+        category_code = self.map_category_to_code(product_category, gender)
+
+        # Dodaje placeholder slike ako nema dovoljno
+        images = wc_product.images[:4] + ('',) * (4 - len(wc_product.images))
+
+        return RemiksProduct(
+            sku=wc_product.sku,
+            gender=gender,
+            product_name=wc_product.name.replace('š', 's').replace('ž', 'z').replace('č', 'c').replace('ć', 'c'),
+            stock=stock_levels(stock_data),
+            type='configurable' if wc_product.type == 'variable' else 'simple',
+            net_retail_price=net_retail_price,
+            active=1 if wc_product.status == 'publish' else 0,
+            brand=brand,
+            category_code=category_code,
+            product_category_name=product_category,  # Dodano za debug
+            product_variation='size' if product_sizes else 'none',
+            product_variations=tuple(product_sizes),
+            sale_price=sale_price,
+            invoice_price=invoice_price,
+            weight="0.2",
+            vat="20",
+            vat_symbol="Đ",
+            season=season,
+            images=images,
+            description=wc_product.description,
+        )
+
+_MAPPER = ProductMapper()
+
+
+def wc_prices(wc_products):
+    """(net_retail, sale, invoice) za listu WcProduct-a odjednom - retail je regular_price, akcija sale_price"""
+    return price_list([wc_product.regular_price or wc_product.price for wc_product in wc_products],
+                      [wc_product.sale_price or wc_product.price for wc_product in wc_products],
+                      rules=PricingRules.for_source('woocommerce'))
+
+
+def transform_product(wc_product, variations, taxonomy=None, prices=None):
+    """Remiks proizvod iz WooCommerce proizvoda i njegovih varijanti"""
+    return _MAPPER.build_product_info(wc_product, variations, taxonomy, prices)
+
+
+def transform_chunk(chunk, taxonomy=None):
+    """Transformiše deo kataloga: lista (wc_product, varijante) -> lista Remiks proizvoda"""
+    prices = wc_prices([wc_product for wc_product, _ in chunk])
+    return [transform_product(wc_product, variations, taxonomy, product_prices)
+            for (wc_product, variations), product_prices in zip(chunk, prices)]
+
+
+def transform_products(items, taxonomy=None, workers=1, chunk_size=500):
+    """Transformiše (wc_product, varijante) parove, sa workers > 1 u process pool-u - redosled ostaje isti"""
+    return map_in_chunks(transform_chunk, items, workers, chunk_size, taxonomy)
@@ -4,6 +4,9 @@ import csv
 from requests.auth import HTTPBasicAuth
 import time
 
+from http_session import create_session
+from image_downloader import ImageDownloader
+
 
 class WooCommerceExtractor:
     def __init__(self, site_url, consumer_key, consumer_secret):
@@ -11,6 +14,7 @@ class WooCommerceExtractor:
         self.api_url = f"{self.site_url}/wp-json/wc/v3"
         self.auth = HTTPBasicAuth(consumer_key, consumer_secret)
         self.products = []
+        self.session = create_session()
 
     def get_products(self, per_page=100):
         """Dobija sve proizvode preko API-ja"""
@@ -27,7 +31,7 @@ class WooCommerceExtractor:
             }
 
             try:
-                response = requests.get(url, auth=self.auth, params=params)
+                response = self.session.get(url, auth=self.auth, params=params)
                 response.raise_for_status()
 
                 products = response.json()
@@ -91,7 +95,7 @@ class WooCommerceExtractor:
         url = f"{self.api_url}/products/{product_id}/variations"
 
         try:
-            response = requests.get(url, auth=self.auth)
+            response = self.session.get(url, auth=self.auth)
             response.raise_for_status()
             variations = response.json()
 
@@ -178,44 +182,40 @@ class WooCommerceExtractor:
             json.dump(self.products, f, ensure_ascii=False, indent=2)
         print(f"JSON podaci sačuvani u {filename}")
 
-    def download_images(self, download_folder="product_images"):
-        """Download-uje sve slike"""
+    def download_images(self, download_folder="product_images", workers=8, per_host=4):
+        """Download-uje sve slike proizvoda i varijanti - svaka slika se čuva jednom (image_downloader.py)"""
         import os
         from urllib.parse import urlparse
 
         os.makedirs(download_folder, exist_ok=True)
 
+        jobs = []
         for product in self.products:
-            if not product['all_images']:
-                continue
-
-            # Kreira folder za proizvod
+            # Folder za proizvod
             safe_name = "".join(c for c in product['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()[:50]
             product_folder = os.path.join(download_folder, f"{product['id']}_{safe_name}")
-            os.makedirs(product_folder, exist_ok=True)
+            sku = product['sku'] or str(product['id'])
 
-            images = product['all_images'].split('; ')
+            images = product['all_images'].split('; ') if product['all_images'] else []
             for i, img_url in enumerate(images):
                 if not img_url:
                     continue
 
-                try:
-                    response = requests.get(img_url, timeout=10)
-                    response.raise_for_status()
-
-                    # Određuje ekstenziju
-                    parsed_url = urlparse(img_url)
-                    ext = os.path.splitext(parsed_url.path)[1] or '.jpg'
+                # Određuje ekstenziju
+                parsed_url = urlparse(img_url)
+                ext = os.path.splitext(parsed_url.path)[1] or '.jpg'
+                jobs.append((img_url, os.path.join(product_folder, f"image_{i + 1}{ext}"), sku))
 
-                    filename = os.path.join(product_folder, f"image_{i + 1}{ext}")
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-
-                    print(f"Downloaded: {filename}")
-                    time.sleep(0.3)
+            # Slike varijanti su često iste kao slike proizvoda - store ih čuva jednom
+            for variation in product.get('variations') or []:
+                if not variation.get('image'):
+                    continue
+                ext = os.path.splitext(urlparse(variation['image']).path)[1] or '.jpg'
+                jobs.append((variation['image'], os.path.join(product_folder, f"variation_{variation['id']}{ext}"),
+                             variation['sku'] or str(variation['id'])))
 
-                except Exception as e:
-                    print(f"Error downloading {img_url}: {e}")
+        downloader = ImageDownloader(download_folder, session=self.session, workers=workers, per_host=per_host)
+        return downloader.download_all(jobs)
 
 
 # Kako se koristi:
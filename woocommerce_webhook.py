@@ -0,0 +1,303 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from dotenv import load_dotenv
+
+from WooCommerceToRemiks import STOCK_PRODUCT_FIELDS, WooCommerceToRemiks
+from remiks_model import WcProduct, dumps_payload
+
+load_dotenv()
+
+PRODUCT_TOPICS = ('product.created', 'product.updated')
+ORDER_TOPICS = ('order.created',)
+
+
+def sign_payload(body, secret):
+    """Računa WooCommerce potpis: base64(HMAC-SHA256(secret, body))"""
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def verify_signature(body, signature, secret):
+    """Proverava X-WC-Webhook-Signature header u konstantnom vremenu"""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature)
+
+
+class WebhookCoalescer:
+    """Skuplja webhook događaje po ID-u proizvoda i šalje ih u paketima
+
+    Paket se šalje kada `window` sekundi ne stigne nijedan novi događaj ili najkasnije
+    `max_delay` sekundi posle prvog događaja, tako da nalet izmena istog proizvoda
+    (npr. bulk edit u WP adminu) završi kao jedan Remiks zahtev.
+    """
+
+    def __init__(self, sync, window=2.0, max_delay=10.0, dry_run=False):
+        self.sync = sync
+        self.window = window
+        self.max_delay = max_delay
+        self.dry_run = dry_run
+        self.token_cache = sync.token_cache
+        self.pending = {}  # product_id -> ('product', wc_product) ili ('stock', None)
+        self.first_event_at = None
+        self.last_event_at = None
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def add_product(self, wc_product):
+        """Dodaje pun proizvod iz product.* webhook-a - uvek ima prednost nad stock događajem"""
+        self._add(wc_product['id'], ('product', wc_product))
+
+    def add_stock(self, product_id):
+        """Dodaje stock-only izmenu (npr. iz porudžbine) ako proizvod već nije u redu za slanje"""
+        with self.condition:
+            self.pending.setdefault(product_id, ('stock', None))
+            self._touch()
+
+    def _add(self, product_id, entry):
+        with self.condition:
+            self.pending[product_id] = entry
+            self._touch()
+
+    def _touch(self):
+        now = time.monotonic()
+        if self.first_event_at is None:
+            self.first_event_at = now
+        self.last_event_at = now
+        self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+
+                now = time.monotonic()
+                quiet_until = self.last_event_at + self.window
+                deadline = self.first_event_at + self.max_delay
+                if now < min(quiet_until, deadline):
+                    self.condition.wait(min(quiet_until, deadline) - now)
+                    continue
+
+                batch = self.pending
+                self.pending = {}
+                self.first_event_at = None
+                self.last_event_at = None
+
+            try:
+                with self.sync.metrics.run('wc_webhook'):
+                    self.flush(batch)
+            except Exception as e:
+                print(f"Greška pri slanju webhook paketa: {e}")
+
+    def flush(self, batch):
+        """Pretvara skupljene događaje u Remiks proizvode i šalje ih"""
+        products = []
+        stock_entries = []
+
+        for product_id, (kind, wc_product) in batch.items():
+            if kind == 'stock':
+                # Za stock izmenu dovoljni su zalihe i cene - bez kategorija i slika
+                wc_product = self.sync.fetch_product(product_id, fields=STOCK_PRODUCT_FIELDS)
+                if not wc_product:
+                    continue
+            else:
+                wc_product = WcProduct.from_api(wc_product)
+
+            if not wc_product.sku:
+                print(f"Proizvod {wc_product.name or product_id} nema SKU - preskače se")
+                continue
+
+            if kind == 'product':
+                products.append(self.sync.build_remiks_product(wc_product))
+            else:
+                stock_entries.append(self.sync.build_stock_product(wc_product))
+
+        print(f"Webhook paket: {len(products)} proizvoda, {len(stock_entries)} stock izmena")
+
+        if self.dry_run:
+            if products:
+                print(dumps_payload(products, indent=2, ensure_ascii=False))
+            if stock_entries:
+                print(dumps_payload(stock_entries, indent=2, ensure_ascii=False))
+            return
+
+        if products:
+            self._send(self.sync.send_request_to_remiks, products)
+        if stock_entries:
+            self._send(self.sync.send_stock_to_remiks, stock_entries)
+
+    def _send(self, send, payload):
+        token = self.token_cache.get()
+        if not token:
+            print("Nije moguće dobiti JWT token")
+            return
+
+        response = send(payload, token)
+        if not response:
+            self.token_cache.invalidate()
+            print("Greška pri slanju na remiks servis")
+        elif response.get('errors', []):
+            print("Remiks servis vratio greške:")
+            self.sync.log_errors(response)
+            for error in response.get('errors', []):
+                print(f"  - {error}")
+        else:
+            print(f"Uspešno poslano {len(payload)} proizvoda na remiks servis!")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Prima WooCommerce webhook-ove, proverava potpis i prosleđuje ih coalescer-u"""
+
+    secret = None
+    coalescer = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        topic = self.headers.get('X-WC-Webhook-Topic', '')
+
+        # WooCommerce pri kreiranju webhook-a šalje ping bez potpisa: webhook_id=123
+        if not topic and body.startswith(b'webhook_id='):
+            self._respond(200, {'status': 'pong'})
+            return
+
+        if not verify_signature(body, self.headers.get('X-WC-Webhook-Signature'), self.secret):
+            print(f"Odbijen webhook sa nevalidnim potpisom ({topic or 'bez topic-a'})")
+            self._respond(401, {'error': 'invalid signature'})
+            return
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            self._respond(400, {'error': 'invalid json'})
+            return
+
+        if not isinstance(data, dict):
+            self._respond(400, {'error': 'invalid payload'})
+            return
+
+        if topic in PRODUCT_TOPICS:
+            if data.get('id') is None:
+                print(f"Odbijen webhook {topic} bez ID-a proizvoda")
+                self._respond(400, {'error': 'missing product id'})
+                return
+            self.coalescer.add_product(data)
+        elif topic in ORDER_TOPICS:
+            line_items = data.get('line_items', [])
+            if not isinstance(line_items, list) or not all(isinstance(item, dict) for item in line_items):
+                print(f"Odbijen webhook {topic} sa neispravnim line_items")
+                self._respond(400, {'error': 'invalid line_items'})
+                return
+            for item in line_items:
+                if item.get('product_id'):
+                    self.coalescer.add_stock(item['product_id'])
+        else:
+            self._respond(200, {'status': 'ignored', 'topic': topic})
+            return
+
+        print(f"Primljen webhook {topic}")
+        self._respond(202, {'status': 'queued'})
+
+    def _respond(self, status, data):
+        out = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_server(host, port, secret, window=2.0, max_delay=10.0, dry_run=False):
+    """Pokreće webhook server - blokira dok se ne prekine sa Ctrl+C"""
+    WebhookHandler.secret = secret
+    WebhookHandler.coalescer = WebhookCoalescer(WooCommerceToRemiks(), window, max_delay, dry_run)
+
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    print(f"Webhook server sluša na http://{host}:{server.server_port}/ (dry-run: {'DA' if dry_run else 'NE'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nWebhook server zaustavljen")
+    finally:
+        server.server_close()
+
+
+def simulate_webhook(url, topic, payload, secret):
+    """Šalje potpisan webhook kao WooCommerce - za lokalno testiranje servera"""
+    body = json.dumps(payload).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json',
+        'X-WC-Webhook-Topic': topic,
+        'X-WC-Webhook-Source': 'http://localhost/',
+        'X-WC-Webhook-Signature': sign_payload(body, secret),
+    }
+    response = requests.post(url, data=body, headers=headers, timeout=10)
+    print(f"Simulacija {topic}: {response.status_code} {response.text}")
+    return response
+
+
+def sample_payload(topic):
+    """Minimalan primer payload-a za simulator"""
+    if topic in ORDER_TOPICS:
+        return {'id': 1, 'status': 'processing', 'line_items': [{'product_id': 1, 'variation_id': 0, 'quantity': 1}]}
+
+    return {
+        'id': 1,
+        'name': 'REEBOK Majica za dečake',
+        'sku': 'TEST001',
+        'type': 'simple',
+        'status': 'publish',
+        'price': '1990',
+        'regular_price': '2490',
+        'sale_price': '1990',
+        'stock_quantity': 5,
+        'attributes': [{'name': 'Size', 'options': ['6', '8']}],
+        'categories': [{'id': 1, 'name': 'Dečaci'}, {'id': 2, 'name': 'Majice'}],
+        'tags': [],
+        'images': [],
+        'description': '',
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='WooCommerce webhook -> Remiks sync')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresa na kojoj server sluša')
+    parser.add_argument('--port', type=int, default=8088, help='Port servera')
+    parser.add_argument('--window', type=float, default=2.0,
+                        help='Sekundi bez novih događaja pre slanja paketa')
+    parser.add_argument('--max-delay', type=float, default=10.0,
+                        help='Maksimalno čekanje od prvog događaja u paketu')
+    parser.add_argument('--dry-run', action='store_true', help='Ne šalje na Remiks, samo ispisuje payload')
+    parser.add_argument('--simulate', metavar='TOPIC',
+                        help='Pošalji potpisan test webhook (npr. product.updated) na --host/--port')
+    parser.add_argument('--payload-file', help='JSON fajl sa payload-om za --simulate')
+    args = parser.parse_args()
+
+    webhook_secret = os.getenv('WC_WEBHOOK_SECRET')
+    if not webhook_secret:
+        print("WC_WEBHOOK_SECRET nije podešen u .env fajlu")
+        sys.exit(1)
+
+    if args.simulate:
+        if args.payload_file:
+            with open(args.payload_file, 'r', encoding='utf-8') as f:
+                simulated_payload = json.load(f)
+        else:
+            simulated_payload = sample_payload(args.simulate)
+        simulate_webhook(f"http://{args.host}:{args.port}/", args.simulate, simulated_payload, webhook_secret)
+    else:
+        run_server(args.host, args.port, webhook_secret, args.window, args.max_delay, args.dry_run)